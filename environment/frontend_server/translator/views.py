@@ -199,8 +199,17 @@ def replay_persona_state(request, sim_code, step, persona_name):
   with open(memory + "/spatial_memory.json") as json_file:  
     spatial = json.load(json_file)
 
-  with open(memory + "/associative_memory/nodes.json") as json_file:  
-    associative = json.load(json_file)
+  if os.path.exists(memory + "/associative_memory/nodes.jsonl"): 
+    # Binary layout: a line of field names, then one line per node (as read 
+    # by binary_memory.read_node_table, which the frontend cannot import). 
+    with open(memory + "/associative_memory/nodes.jsonl") as json_file: 
+      fields = json.loads(json_file.readline())
+      rows = [json.loads(line) for line in json_file if line.strip()]
+      associative = {f"node_{count + 1}": dict(zip(fields, row))
+                     for count, row in enumerate(rows)}
+  else: 
+    with open(memory + "/associative_memory/nodes.json") as json_file:  
+      associative = json.load(json_file)
 
   a_mem_event = []
   a_mem_chat = []
@@ -7,6 +7,7 @@ This module exports all actor types:
 - Consumer: End user who subscribes to models
 - Policymaker: Regulator who can issue requirements
 - Funder: Capital allocator who influences provider development
+- ActorMemory: Indexed, optionally bounded memory stream used by actors
 
 Each actor has:
 - PublicState: Visible to all actors
@@ -14,8 +15,9 @@ Each actor has:
 - GroundTruth: Held externally by simulation (invisible to actors)
 """
 
+from .memory import ActorMemory
 from .model_provider import ModelProvider, ModelProviderScratch
-from .evaluator import Evaluator, Benchmark, Regulation
+from .evaluator import Evaluator, Benchmark, Regulation, ScoreSeries, StreamingCorrelation
 from .consumer import Consumer
 from .policymaker import Policymaker
 from .funder import Funder, get_default_funder_configs, get_multi_funder_configs
@@ -27,6 +29,8 @@ __all__ = [
     "Evaluator",
     "Benchmark",
     "Regulation",
+    "ScoreSeries",
+    "StreamingCorrelation",
     # New actors
     "Consumer",
     "Policymaker",
@@ -34,4 +38,6 @@ __all__ = [
     # Funder configs
     "get_default_funder_configs",
     "get_multi_funder_configs",
+    # Shared infrastructure
+    "ActorMemory",
 ]
@@ -17,7 +17,6 @@ Visibility:
 - INVISIBLE: true_capability (held by simulation)
 """
 import json
-import math
 import os
 from dataclasses import dataclass, field
 from typing import Optional
@@ -331,66 +330,75 @@ class ConsumerMarket:
             published_scores: {provider_name: composite_score}
             media_coverage: Media coverage dict with sentiment and provider_attention
         """
-        for seg in self.segments:
-            for provider_name in self.provider_names:
-                if provider_name not in ground_truth:
-                    continue
-
-                gt = ground_truth[provider_name]
-                true_capability = gt.true_capability
-
-                # Base satisfaction: use-case weighted perceived quality
-                # This is what the segment actually experiences in their domain
-                base_satisfaction = seg.believed_quality.get(provider_name, true_capability)
+        names = self.provider_names
+        if not self.segments or not names:
+            return
+        in_gt = [p in ground_truth for p in names]
+        true_cap = np.array([
+            ground_truth[p].true_capability if known else 0.0
+            for p, known in zip(names, in_gt)
+        ])
+
+        # Base satisfaction: use-case weighted perceived quality
+        # This is what the segment actually experiences in their domain.
+        # If no believed_quality yet (early rounds), use true_capability.
+        believed = _segment_matrix(self.segments, "believed_quality", names, 0.0)
+        has_belief = np.array([
+            [p in seg.believed_quality for p in names] for seg in self.segments
+        ])
+        base_satisfaction = np.where(has_belief, believed, true_cap[None, :])
+
+        # Factor 1: Gaming Detection Penalty
+        # If score >> true_capability, consumer experiences disappointment
+        # (high scores attracted them, but actual performance disappoints)
+        gaming_penalty = np.zeros(len(names))
+        if published_scores:
+            for j, p in enumerate(names):
+                if in_gt[j] and p in published_scores:
+                    gap = max(0, published_scores[p] - true_cap[j])
+                    gaming_penalty[j] = 0.20 * gap  # 20% penalty per unit of inflation
+
+        # Factor 2: Safety Alignment Match
+        # Segments with high safety preferences value safety investment;
+        # bonus scales with both provider investment and segment preference
+        safety_bonus = np.zeros((len(self.segments), len(names)))
+        if provider_strategies:
+            has_strategy = np.array([p in provider_strategies for p in names])
+            safety_investment = np.array([
+                provider_strategies[p].get("safety_alignment", 0.0) if has else 0.0
+                for p, has in zip(names, has_strategy)
+            ])
+            safety_pref = np.array([_safety_preference(seg.use_case) for seg in self.segments])
+            safety_bonus = np.where(
+                has_strategy[None, :],
+                (0.12 * safety_investment)[None, :] * safety_pref[:, None],
+                0.0,
+            )
 
-                # If no believed_quality yet (early rounds), use true_capability
-                if provider_name not in seg.believed_quality:
-                    base_satisfaction = true_capability
-
-                # Factor 1: Gaming Detection Penalty
-                # If score >> true_capability, consumer experiences disappointment
-                # (high scores attracted them, but actual performance disappoints)
-                gaming_penalty = 0.0
-                if published_scores and provider_name in published_scores:
-                    score = published_scores[provider_name]
-                    gap = max(0, score - true_capability)
-                    gaming_penalty = 0.20 * gap  # 20% penalty per unit of inflation
-
-                # Factor 2: Safety Alignment Match
-                # Segments with high safety preferences value safety investment
-                safety_bonus = 0.0
-                if provider_strategies and provider_name in provider_strategies:
-                    strategy = provider_strategies[provider_name]
-                    safety_investment = strategy.get("safety_alignment", 0.0)
-                    # Get segment's safety preference weight
-                    safety_pref = 0.0
-                    for cat, weight in USE_CASE_PROFILES.get(seg.use_case, {}).get("benchmark_prefs", {}).items():
-                        if "safety" in cat.lower():
-                            safety_pref = weight
-                            break
-                    # Bonus scales with both provider investment and segment preference
-                    safety_bonus = 0.12 * safety_investment * safety_pref
-
-                # Factor 3: Media Sentiment Influence
-                # Negative media coverage reduces satisfaction beyond objective metrics
-                media_penalty = 0.0
-                if media_coverage:
-                    sentiment = media_coverage.get("sentiment", 0.0)
-                    provider_attention = media_coverage.get("provider_attention", {}).get(provider_name, 0.0)
-                    # Only negative sentiment creates penalty
-                    if sentiment < 0:
-                        media_penalty = 0.10 * abs(sentiment) * provider_attention
-
-                # Compute final satisfaction
-                satisfaction = (
-                    base_satisfaction
-                    - gaming_penalty
-                    + safety_bonus
-                    - media_penalty
-                )
+        # Factor 3: Media Sentiment Influence
+        # Negative media coverage reduces satisfaction beyond objective metrics
+        media_penalty = np.zeros(len(names))
+        if media_coverage:
+            sentiment = media_coverage.get("sentiment", 0.0)
+            # Only negative sentiment creates penalty
+            if sentiment < 0:
+                attention = media_coverage.get("provider_attention", {})
+                for j, p in enumerate(names):
+                    media_penalty[j] = 0.10 * abs(sentiment) * attention.get(p, 0.0)
+
+        # Compute final satisfaction, clamped to [0, 1]
+        satisfaction = (
+            base_satisfaction
+            - gaming_penalty[None, :]
+            + safety_bonus
+            - media_penalty[None, :]
+        )
+        satisfaction = np.clip(satisfaction, 0.0, 1.0).tolist()
 
-                # Clamp to [0, 1]
-                seg.satisfaction[provider_name] = max(0.0, min(1.0, satisfaction))
+        for seg, row in zip(self.segments, satisfaction):
+            for p, known, value in zip(names, in_gt, row):
+                if known:
+                    seg.satisfaction[p] = value
 
     def compute_switching(self):
         """Compute switching proportions within each segment.
@@ -402,99 +410,119 @@ class ConsumerMarket:
         Returns:
             Total switching rate (fraction of total market that switched)
         """
-        total_switching = 0.0
-
-        # Track per-segment switching for analysis
-        segment_switching_rates = {}
+        names = self.provider_names
 
+        # Segments are switched together as segment x provider matrices, with
+        # columns in provider_names order
         for seg in self.segments:
-            seg_switching = 0.0
-
-            for provider in list(seg.provider_shares.keys()):
-                share = seg.provider_shares.get(provider, 0.0)
-                if share < 0.001:  # skip negligible shares
-                    continue
-
-                tenure_bonus = min(0.1, seg.tenure.get(provider, 0) * 0.02)
-                should_switch_prob = 0.0
-                best_alternative = None
-                best_alt_score = -1.0
-
-                # --- Trigger 1: Dissatisfaction ---
-                believed = seg.believed_quality.get(provider, 0.5)
-                actual_sat = seg.satisfaction.get(provider, 0.5)
-                gap = believed - actual_sat
-
-                threshold = seg.switching_threshold + tenure_bonus + seg.switching_cost
-                if gap > 0:
-                    # Sigmoid-based probability: smooth transition
-                    should_switch_prob = max(
-                        should_switch_prob,
-                        _switching_probability(gap, threshold),
-                    )
-
-                # --- Trigger 2: Better alternative ---
-                current_blended = self._blended_score(seg, provider)
-                opportunity_threshold = seg.switching_cost + tenure_bonus
-
-                for alt_provider in self.provider_names:
-                    if alt_provider == provider:
-                        continue
-                    alt_blended = self._blended_score(seg, alt_provider)
-                    improvement = alt_blended - current_blended
-                    if improvement > 0:
-                        opp_prob = _switching_probability(
-                            improvement, opportunity_threshold
-                        )
-                        if opp_prob > should_switch_prob:
-                            should_switch_prob = opp_prob
-                        if alt_blended > best_alt_score:
-                            best_alt_score = alt_blended
-                            best_alternative = alt_provider
-
-                # Apply switching
-                if should_switch_prob > 0.01 and best_alternative:
-                    switching_fraction = should_switch_prob * share
-                    switching_fraction = min(switching_fraction, share)  # can't exceed current share
-
-                    seg.provider_shares[provider] -= switching_fraction
-                    seg.provider_shares[best_alternative] = (
-                        seg.provider_shares.get(best_alternative, 0.0) + switching_fraction
-                    )
-                    seg_switching += switching_fraction
-
-                    # Reset tenure for switchers
-                    seg.tenure[provider] = max(0, seg.tenure.get(provider, 0) - 1)
-
-            # Update tenure for remaining subscribers
-            for provider in self.provider_names:
-                if seg.provider_shares.get(provider, 0) > 0.01:
-                    seg.tenure[provider] = seg.tenure.get(provider, 0) + 1
+            if list(seg.provider_shares) != names:
+                seg.provider_shares = {p: seg.provider_shares.get(p, 0.0) for p in names}
+        seg_switching = [0.0] * len(self.segments)
+        if names and self.segments:
+            seg_switching = self._switch_segments(self.segments)
 
-            # Normalize shares to prevent drift
-            total_share = sum(seg.provider_shares.values())
-            if total_share > 0:
-                seg.provider_shares = {
-                    k: v / total_share for k, v in seg.provider_shares.items()
-                }
-
-            total_switching += seg_switching * seg.market_fraction
+        total_switching = 0.0
 
-            # Store per-segment switching rate
-            segment_switching_rates[seg.name] = seg_switching
+        # Track per-segment switching for analysis
+        segment_switching_rates = {}
+        for seg, rate in zip(self.segments, seg_switching):
+            total_switching += rate * seg.market_fraction
+            segment_switching_rates[seg.name] = rate
 
         # Store for later retrieval
         self._last_segment_switching = segment_switching_rates
 
         return total_switching
 
-    def _blended_score(self, seg: MarketSegment, provider: str) -> float:
-        """Compute blended perceived quality for a provider within a segment."""
-        trust = seg.leaderboard_trust
-        believed = seg.believed_quality.get(provider, 0.5)
-        actual_sat = seg.satisfaction.get(provider, 0.5)
+    def _switch_segments(self, segments: list[MarketSegment]) -> list[float]:
+        """Apply switching to segments as (n_segments, n_providers) arrays.
+
+        Each segment's provider_shares must follow provider_names. Switching
+        probabilities and best alternatives do not depend on shares, so they
+        are computed for all cells at once; only the share transfers run
+        provider by provider, in order, since each can add to a later
+        provider's share. Because the sigmoid is monotonic, the strongest
+        opportunity is the one with the largest improvement, so one
+        probability per cell is enough.
+
+        Returns:
+            Per-segment switching fraction, in segment order
+        """
+        names = self.provider_names
+        n_seg, n_prov = len(segments), len(names)
+
+        shares = np.array([list(seg.provider_shares.values()) for seg in segments])
+        believed = _segment_matrix(segments, "believed_quality", names, 0.5)
+        actual_sat = _segment_matrix(segments, "satisfaction", names, 0.5)
+        tenure = _segment_matrix(segments, "tenure", names, 0)
+        trust = np.array([seg.leaderboard_trust for seg in segments])[:, None]
+        switching_cost = np.array([seg.switching_cost for seg in segments])[:, None]
+        switching_threshold = np.array([seg.switching_threshold for seg in segments])[:, None]
+
+        tenure_bonus = np.minimum(0.1, tenure * 0.02)
+
+        # --- Trigger 1: Dissatisfaction ---
+        gap = believed - actual_sat
+        threshold = switching_threshold + tenure_bonus + switching_cost
+        should_switch_prob = np.zeros((n_seg, n_prov))
+        dissatisfied = gap > 0
+        should_switch_prob[dissatisfied] = _switching_probability(
+            gap[dissatisfied], threshold[dissatisfied]
+        )
+
+        # --- Trigger 2: Better alternative ---
         # Blend leaderboard-derived belief with actual experience
-        return trust * believed + (1 - trust) * actual_sat
+        blended = trust * believed + (1 - trust) * actual_sat
+        alternatives = np.broadcast_to(blended[:, None, :], (n_seg, n_prov, n_prov)).copy()
+        alternatives[:, np.arange(n_prov), np.arange(n_prov)] = -np.inf
+        best_alternative = alternatives.argmax(axis=2)
+        best_alt_score = np.take_along_axis(alternatives, best_alternative[:, :, None], axis=2)[:, :, 0]
+        improvement = best_alt_score - blended
+        has_better = improvement > 0
+        opportunity_threshold = switching_cost + tenure_bonus
+        opp_prob = np.zeros((n_seg, n_prov))
+        opp_prob[has_better] = _switching_probability(
+            improvement[has_better], opportunity_threshold[has_better]
+        )
+        should_switch_prob = np.where(
+            has_better & (opp_prob > should_switch_prob), opp_prob, should_switch_prob
+        )
+
+        # Apply switching, provider by provider (shares move as we go)
+        seg_switching = np.zeros(n_seg)
+        rows = np.arange(n_seg)
+        for j in range(n_prov):
+            share = shares[:, j].copy()
+            # skip negligible shares
+            switch = (share >= 0.001) & (should_switch_prob[:, j] > 0.01) & has_better[:, j]
+            if not switch.any():
+                continue
+            switching_fraction = np.minimum(should_switch_prob[:, j] * share, share)
+            switching_fraction = np.where(switch, switching_fraction, 0.0)
+
+            shares[switch, j] = share[switch] - switching_fraction[switch]
+            target = best_alternative[switch, j]
+            shares[rows[switch], target] += switching_fraction[switch]
+            seg_switching[switch] += switching_fraction[switch]
+
+            # Reset tenure for switchers
+            tenure[switch, j] = np.maximum(0, tenure[switch, j] - 1)
+
+        # Update tenure for remaining subscribers
+        tenure = np.where(shares > 0.01, tenure + 1, tenure)
+
+        # Normalize shares to prevent drift
+        total_share = np.zeros(n_seg)
+        for j in range(n_prov):
+            total_share = total_share + shares[:, j]
+        positive = total_share > 0
+        shares[positive] = shares[positive] / total_share[positive, None]
+
+        for seg, share_row, tenure_row in zip(segments, shares.tolist(), tenure.tolist()):
+            seg.provider_shares = dict(zip(names, share_row))
+            seg.tenure.update(zip(names, tenure_row))
+
+        return seg_switching.tolist()
 
     def get_consumer_data(self) -> dict:
         """Return consumer_data dict compatible with downstream systems.
@@ -584,22 +612,45 @@ class ConsumerMarket:
 #  Helper Functions
 # ============================================================
 
-def _switching_probability(gap: float, threshold: float,
-                           steepness: float = 10.0) -> float:
-    """Sigmoid-based switching probability.
+def _switching_probability(gap: np.ndarray, threshold: np.ndarray,
+                           steepness: float = 10.0) -> np.ndarray:
+    """Sigmoid-based switching probability, element-wise.
 
     Args:
-        gap: The dissatisfaction or improvement gap
-        threshold: The switching threshold
+        gap: The dissatisfaction or improvement gaps
+        threshold: The switching thresholds
         steepness: How sharp the sigmoid transition is (default 10)
 
     Returns:
-        Probability of switching (0-1)
+        Probabilities of switching (0-1)
     """
     x = steepness * (gap - threshold)
     # Clamp to avoid overflow
-    x = max(-20.0, min(20.0, x))
-    return 1.0 / (1.0 + math.exp(-x))
+    x = np.clip(x, -20.0, 20.0)
+    return 1.0 / (1.0 + np.exp(-x))
+
+
+def _segment_matrix(segments: list, attr: str, names: list, default) -> np.ndarray:
+    """Gather a per-provider dict attribute of each segment into an array.
+
+    Rows follow segments, columns follow names; missing entries get default.
+    """
+    rows = []
+    for seg in segments:
+        d = getattr(seg, attr)
+        if len(d) == len(names) and all(map(d.__contains__, names)):
+            rows.append(list(map(d.__getitem__, names)))
+        else:
+            rows.append([d.get(p, default) for p in names])
+    return np.array(rows)
+
+
+def _safety_preference(use_case: str) -> float:
+    """Weight of the first safety category in a use case's benchmark prefs."""
+    for cat, weight in USE_CASE_PROFILES.get(use_case, {}).get("benchmark_prefs", {}).items():
+        if "safety" in cat.lower():
+            return weight
+    return 0.0
 
 
 def create_default_segments(
@@ -9,7 +9,9 @@ Key visibility design:
 - This ensures actors cannot leak invisible information to each other
 """
 import json
+import math
 import numpy as np
+from collections import deque
 from dataclasses import dataclass, field
 from typing import Optional, TYPE_CHECKING
 
@@ -82,6 +84,222 @@ class Regulation:
         return f"{self.name} ({self.regulation_type}): {status} - {self.details}"
 
 
+class ScoreSeries:
+    """
+    Round-indexed history of {provider_name: value} dicts.
+
+    Drop-in for the list of (round, {provider_name: value}) tuples it
+    replaces: supports append, len, iteration, indexing and slicing. It also
+    keeps:
+    - a {round: position} index, so lookup by round is O(1)
+    - a preallocated (rounds x providers) array (NaN where a provider has no
+      value), so recent windows are array slices instead of dict walks
+    """
+
+    def __init__(self, entries: Optional[list] = None):
+        self._entries: list = []
+        self._position: dict[int, int] = {}
+        self.providers: list[str] = []
+        self._provider_index: dict[str, int] = {}
+        self._values = np.full((16, 0), np.nan)
+        for entry in entries or []:
+            self.append(entry)
+
+    def append(self, entry):
+        """Append a (round, {provider_name: value}) entry."""
+        round_num, values = entry
+        pos = len(self._entries)
+        self._entries.append(entry)
+        # First entry recorded for a round wins (same as a front-to-back scan)
+        self._position.setdefault(round_num, pos)
+
+        new_names = [name for name in values if name not in self._provider_index]
+        if new_names:
+            for name in new_names:
+                self._provider_index[name] = len(self.providers)
+                self.providers.append(name)
+            grown = np.full((self._values.shape[0], len(self.providers)), np.nan)
+            grown[:, :self._values.shape[1]] = self._values
+            self._values = grown
+        if pos >= self._values.shape[0]:
+            grown = np.full((2 * self._values.shape[0], self._values.shape[1]), np.nan)
+            grown[:pos] = self._values[:pos]
+            self._values = grown
+
+        row = self._values[pos]
+        for name, value in values.items():
+            row[self._provider_index[name]] = value
+
+    def get(self, round_num: int, default=None):
+        """Values recorded for a round, or default."""
+        pos = self._position.get(round_num)
+        return default if pos is None else self._entries[pos][1]
+
+    def array(self, last_n: Optional[int] = None) -> np.ndarray:
+        """
+        (rounds x providers) view of the recorded values, columns in
+        self.providers order.
+
+        Args:
+            last_n: Only the most recent last_n rounds
+        """
+        n = len(self._entries)
+        start = 0 if last_n is None else max(0, n - last_n)
+        return self._values[start:n]
+
+    def to_list(self) -> list:
+        """Plain list of (round, values) entries (for JSON)."""
+        return list(self._entries)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __iter__(self):
+        return iter(self._entries)
+
+    def __getitem__(self, index):
+        return self._entries[index]
+
+    def __bool__(self) -> bool:
+        return bool(self._entries)
+
+    def __repr__(self):
+        return f"ScoreSeries(rounds={len(self._entries)}, providers={self.providers})"
+
+
+# (n, mean_x, mean_y, m2_x, m2_y, c_xy): count, means, and sums of squared /
+# cross deviations from the means
+_EMPTY_MOMENTS = (0, 0.0, 0.0, 0.0, 0.0, 0.0)
+
+
+def _sample_moments(x: np.ndarray, y: np.ndarray) -> tuple:
+    """Moments of one batch of paired samples."""
+    n = len(x)
+    if n == 0:
+        return _EMPTY_MOMENTS
+    mean_x = x.mean()
+    mean_y = y.mean()
+    dx = x - mean_x
+    dy = y - mean_y
+    return (n, float(mean_x), float(mean_y), float(dx @ dx), float(dy @ dy), float(dx @ dy))
+
+
+def _merge_moments(a: tuple, b: tuple) -> tuple:
+    """Moments of the union of two batches (Chan et al. parallel update)."""
+    n_a, mx_a, my_a, m2x_a, m2y_a, cxy_a = a
+    n_b, mx_b, my_b, m2x_b, m2y_b, cxy_b = b
+    if n_a == 0:
+        return b
+    if n_b == 0:
+        return a
+    n = n_a + n_b
+    dx = mx_b - mx_a
+    dy = my_b - my_a
+    f = n_a * n_b / n
+    return (
+        n,
+        mx_a + dx * n_b / n,
+        my_a + dy * n_b / n,
+        m2x_a + m2x_b + dx * dx * f,
+        m2y_a + m2y_b + dy * dy * f,
+        cxy_a + cxy_b + dx * dy * f,
+    )
+
+
+def _remove_moments(total: tuple, b: tuple) -> tuple:
+    """Moments of `total` with batch `b` taken back out (inverse of _merge_moments)."""
+    n, mx, my, m2x, m2y, cxy = total
+    n_b, mx_b, my_b, m2x_b, m2y_b, cxy_b = b
+    n_a = n - n_b
+    if n_a <= 0:
+        return _EMPTY_MOMENTS
+    if n_b == 0:
+        return total
+    mx_a = (n * mx - n_b * mx_b) / n_a
+    my_a = (n * my - n_b * my_b) / n_a
+    dx = mx_b - mx_a
+    dy = my_b - my_a
+    f = n_a * n_b / n
+    return (
+        n_a,
+        mx_a,
+        my_a,
+        max(0.0, m2x - m2x_b - dx * dx * f),
+        max(0.0, m2y - m2y_b - dy * dy * f),
+        cxy - cxy_b - dx * dy * f,
+    )
+
+
+class StreamingCorrelation:
+    """
+    Online Pearson correlation between paired samples, fed a round at a time.
+
+    Keeps the count, means and co-moments of everything added, so updates and
+    reads cost O(providers) regardless of how many rounds have been seen.
+    With a window, the moments of each of the last `window` rounds are kept as
+    well, and the oldest round is subtracted back out when a new one arrives.
+    Subtraction accumulates cancellation error, so every `window` evictions
+    the moments are rebuilt from the kept rounds (amortized O(1) per round).
+    """
+
+    def __init__(self, window: Optional[int] = None):
+        self.window = window
+        self.rounds = 0  # rounds currently covered
+        self._moments = _EMPTY_MOMENTS
+        self._recent: deque = deque()
+        self._evictions = 0  # since the moments were last rebuilt
+
+    @property
+    def n(self) -> int:
+        """Number of paired samples currently covered."""
+        return self._moments[0]
+
+    def add_round(self, x, y):
+        """
+        Add one round of paired samples.
+
+        Args:
+            x: Values of the first variable (e.g. published scores)
+            y: Matching values of the second (e.g. true capabilities)
+        """
+        moments = _sample_moments(np.asarray(x, dtype=float), np.asarray(y, dtype=float))
+        self._moments = _merge_moments(self._moments, moments)
+        self.rounds += 1
+        if self.window is not None:
+            self._recent.append(moments)
+            if len(self._recent) > self.window:
+                self._moments = _remove_moments(self._moments, self._recent.popleft())
+                self.rounds -= 1
+                self._evictions += 1
+                if self._evictions >= self.window:
+                    self._rebuild_moments()
+
+    def _rebuild_moments(self):
+        """Recompute the window's moments from its kept per-round moments."""
+        moments = _EMPTY_MOMENTS
+        for round_moments in self._recent:
+            moments = _merge_moments(moments, round_moments)
+        self._moments = moments
+        self._evictions = 0
+
+    def correlation(self) -> Optional[float]:
+        """
+        Pearson r over the samples covered, or None with fewer than 2 samples.
+
+        NaN when either variable has zero variance (as np.corrcoef).
+        """
+        n, _, _, m2x, m2y, cxy = self._moments
+        if n < 2:
+            return None
+        denom = math.sqrt(m2x * m2y)
+        if denom == 0:
+            return float("nan")
+        return max(-1.0, min(1.0, cxy / denom))
+
+    def __repr__(self):
+        return f"StreamingCorrelation(window={self.window}, rounds={self.rounds}, n={self.n})"
+
+
 class Evaluator:
     """
     An Evaluator agent in the evaluation ecosystem simulation.
@@ -161,18 +379,25 @@ class Evaluator:
         # Random state for reproducibility
         self.rng = np.random.default_rng(seed)
 
-        # History of published scores
+        # History of published composite scores
         # Format: [(round, {provider_name: score}), ...]
-        # For multi-benchmark: [(round, {provider_name: {benchmark_name: score, "composite": score}}), ...]
-        self.score_history: list = []
+        self.score_history = ScoreSeries()
 
         # Per-benchmark score history
         # Format: {benchmark_name: [(round, {provider_name: score}), ...]}
-        self.benchmark_score_history: dict[str, list] = {bm.name: [] for bm in self.benchmarks}
+        self.benchmark_score_history: dict[str, ScoreSeries] = {
+            bm.name: ScoreSeries() for bm in self.benchmarks
+        }
 
         # History of true capabilities (for analysis, not visible to providers)
         # Format: [(round, {provider_name: true_capability}), ...]
-        self.capability_history: list = []
+        self.capability_history = ScoreSeries()
+
+        # Running score/capability correlations, updated by evaluate_all().
+        # Keyed by (benchmark_name or None for the composite, window or None);
+        # windowed entries are created on first use.
+        self._validity_stats: dict[tuple, StreamingCorrelation] = {}
+        self._reset_validity_stats()
 
         # Current round
         self.current_round: int = 0
@@ -194,6 +419,10 @@ class Evaluator:
         self._best_published_scores: dict[str, dict[str, float]] = {
             bm.name: {} for bm in self.benchmarks
         }
+        # Array mirror of _best_published_scores used by evaluate_all, with the
+        # (provider names, benchmark names) layout it was built for
+        self._best_scores: Optional[np.ndarray] = None
+        self._best_scores_layout: Optional[tuple] = None
 
     def evaluate(
         self,
@@ -278,55 +507,105 @@ class Evaluator:
             Dict mapping provider names to composite scores
         """
         self.current_round = round_num
-        composite_scores = {}
-        capabilities = {}
-        per_benchmark_scores = {bm.name: {} for bm in self.benchmarks}
-
-        for provider in providers:
-            # Get true capability from ground truth dict if provided
-            if ground_truth is not None and provider.name in ground_truth:
-                true_cap = ground_truth[provider.name].true_capability
-            else:
-                # Backwards compatibility: access from provider
-                true_cap = provider.true_capability
-
-            capabilities[provider.name] = true_cap
-
-            # Evaluate on each benchmark
-            weighted_sum = 0.0
-            total_weight = 0.0
-
-            for benchmark in self.benchmarks:
-                score = self.evaluate(
-                    true_capability=true_cap,
-                    evaluation_engineering=provider.evaluation_engineering,
-                    benchmark=benchmark,
-                )
-
-                # Monotonicity: providers wouldn't disclose a worse score
-                best = self._best_published_scores[benchmark.name].get(provider.name, 0.0)
-                score = max(score, best)
-                self._best_published_scores[benchmark.name][provider.name] = score
-
-                per_benchmark_scores[benchmark.name][provider.name] = score
+        names = [provider.name for provider in providers]
+
+        # Provider-side arrays (one entry per provider)
+        true_caps = np.array([
+            ground_truth[provider.name].true_capability
+            if ground_truth is not None and provider.name in ground_truth
+            # Backwards compatibility: access from provider
+            else provider.true_capability
+            for provider in providers
+        ], dtype=float)
+        eval_eng = np.array([p.evaluation_engineering for p in providers], dtype=float)
+
+        # Benchmark-side arrays (one entry per benchmark)
+        exploitability = np.array([bm.exploitability for bm in self.benchmarks], dtype=float)
+        validity = np.array([bm.validity for bm in self.benchmarks], dtype=float)
+        noise_level = np.array([bm.noise_level for bm in self.benchmarks], dtype=float)
+        weights = np.array(
+            [self.benchmark_weights.get(bm.name, 1.0) for bm in self.benchmarks], dtype=float
+        )
 
-                weight = self.benchmark_weights.get(benchmark.name, 1.0)
-                weighted_sum += score * weight
-                total_weight += weight
+        # Same scoring model as evaluate(), over a providers x benchmarks grid.
+        # All noise is drawn in one call, in row-major order (provider, then
+        # benchmark) — the same order the per-cell loop drew in.
+        mean_scores = true_caps[:, None] + eval_eng[:, None] * exploitability[None, :]
+        noise_std = np.broadcast_to(
+            noise_level / np.sqrt(np.maximum(validity, 0.05)), mean_scores.shape
+        )
+        scores = np.clip(self.rng.normal(mean_scores, noise_std), 0.0, 1.0)
+
+        # Monotonicity: providers wouldn't disclose a worse score
+        scores = np.maximum(scores, self._best_scores_array(names))
+        self._store_best_scores(names, scores)
+
+        # Composite score (weighted average). Accumulate benchmark by benchmark
+        # so the floating-point summation order matches the scalar loop.
+        total_weight = 0.0
+        weighted_sum = np.zeros(len(names))
+        for j, weight in enumerate(weights):
+            weighted_sum = weighted_sum + scores[:, j] * weight
+            total_weight += weight
+        if total_weight > 0:
+            composite = (weighted_sum / total_weight).tolist()
+        else:
+            composite = [0.0] * len(names)
 
-            # Compute composite score (weighted average)
-            composite_scores[provider.name] = weighted_sum / total_weight if total_weight > 0 else 0.0
+        composite_scores = dict(zip(names, composite))
+        capabilities = dict(zip(names, true_caps.tolist()))
 
         # Record per-benchmark history
-        for bm_name, scores in per_benchmark_scores.items():
-            self.benchmark_score_history[bm_name].append((round_num, dict(scores)))
+        for j, bm in enumerate(self.benchmarks):
+            self.benchmark_score_history[bm.name].append(
+                (round_num, dict(zip(names, scores[:, j].tolist())))
+            )
 
         # Record composite history (backwards compatible)
         self.score_history.append((round_num, dict(composite_scores)))
         self.capability_history.append((round_num, dict(capabilities)))
 
+        # Fold this round into the running validity correlations
+        composite_arr = np.array(composite)
+        bm_columns = {bm.name: j for j, bm in enumerate(self.benchmarks)}
+        for (bm_name, _), stats in self._validity_stats.items():
+            if bm_name is None:
+                stats.add_round(composite_arr, true_caps)
+            elif bm_name in bm_columns:
+                stats.add_round(scores[:, bm_columns[bm_name]], true_caps)
+
         return composite_scores
 
+    def _best_scores_array(self, provider_names: list) -> np.ndarray:
+        """
+        Best published scores as a providers x benchmarks array.
+
+        The array from the previous round is reused while the provider and
+        benchmark sets are unchanged; otherwise it is rebuilt from
+        _best_published_scores (0.0 where nothing has been published).
+        """
+        layout = (tuple(provider_names), tuple(bm.name for bm in self.benchmarks))
+        if self._best_scores_layout == layout and self._best_scores is not None:
+            return self._best_scores
+
+        best = np.zeros((len(provider_names), len(self.benchmarks)))
+        for j, bm in enumerate(self.benchmarks):
+            published = self._best_published_scores.get(bm.name, {})
+            for i, name in enumerate(provider_names):
+                best[i, j] = published.get(name, 0.0)
+        return best
+
+    def _store_best_scores(self, provider_names: list, best: np.ndarray):
+        """Cache the best-score array and mirror it into _best_published_scores."""
+        self._best_scores = best
+        self._best_scores_layout = (
+            tuple(provider_names), tuple(bm.name for bm in self.benchmarks)
+        )
+        for j, bm in enumerate(self.benchmarks):
+            self._best_published_scores.setdefault(bm.name, {}).update(
+                zip(provider_names, best[:, j].tolist())
+            )
+
     def get_per_benchmark_scores(self, round_num: int) -> dict:
         """
         Get per-benchmark scores for a specific round.
@@ -339,10 +618,9 @@ class Evaluator:
         """
         result = {}
         for bm_name, history in self.benchmark_score_history.items():
-            for r, scores in history:
-                if r == round_num:
-                    result[bm_name] = scores
-                    break
+            scores = history.get(round_num)
+            if scores is not None:
+                result[bm_name] = scores
         return result
 
     def evaluate_single(
@@ -529,7 +807,8 @@ class Evaluator:
         # Add to evaluator state
         self.benchmarks.append(new_bm)
         self.benchmark_weights[new_name] = new_weight
-        self.benchmark_score_history[new_name] = []
+        self.benchmark_score_history[new_name] = ScoreSeries()
+        self._validity_stats[(new_name, None)] = StreamingCorrelation()
         self._best_published_scores[new_name] = {}
 
         # Record introduction
@@ -542,36 +821,62 @@ class Evaluator:
 
         return new_bm
 
-    def compute_validity_correlation(self) -> Optional[float]:
+    def compute_validity_correlation(
+        self,
+        window: Optional[int] = None,
+        benchmark: Optional[str] = None,
+    ) -> Optional[float]:
         """
         Compute correlation between scores and true capabilities across history.
 
         This measures how well the benchmark is actually capturing true capability
         (i.e., is it still valid or has gaming corrupted it?).
 
+        Reads running sums kept up to date by evaluate_all(), so the cost does
+        not grow with the length of the run. The first call for a new window
+        size replays that many rounds; later calls are O(1).
+
+        Args:
+            window: Only use the most recent `window` rounds (default: all)
+            benchmark: Use this benchmark's scores instead of the composite
+
         Returns:
             Pearson correlation coefficient, or None if insufficient data
         """
-        if len(self.score_history) < 2:
+        if window is not None and window < 2:
             return None
-
-        all_scores = []
-        all_capabilities = []
-
-        for (_, scores), (_, caps) in zip(self.score_history, self.capability_history):
-            for name in scores:
-                all_scores.append(scores[name])
-                all_capabilities.append(caps[name])
-
-        if len(all_scores) < 2:
+        key = (benchmark, window)
+        stats = self._validity_stats.get(key)
+        if stats is None:
+            if benchmark is not None and benchmark not in self.benchmark_score_history:
+                return None
+            stats = self._replay_validity_stats(benchmark, window)
+            self._validity_stats[key] = stats
+
+        if stats.rounds < 2:
             return None
+        return stats.correlation()
+
+    def _replay_validity_stats(
+        self, benchmark: Optional[str], window: Optional[int]
+    ) -> StreamingCorrelation:
+        """Build a StreamingCorrelation from the recorded score history."""
+        series = self.score_history if benchmark is None else self.benchmark_score_history[benchmark]
+        stats = StreamingCorrelation(window)
+        entries = series[-window:] if window is not None else series
+        for round_num, scores in entries:
+            capabilities = self.capability_history.get(round_num, {})
+            names = [name for name in scores if name in capabilities]
+            stats.add_round(
+                [scores[name] for name in names], [capabilities[name] for name in names]
+            )
+        return stats
 
-        # Compute Pearson correlation
-        scores_arr = np.array(all_scores)
-        caps_arr = np.array(all_capabilities)
-
-        correlation = np.corrcoef(scores_arr, caps_arr)[0, 1]
-        return correlation
+    def _reset_validity_stats(self):
+        """Rebuild the composite and per-benchmark correlations from history."""
+        self._validity_stats = {(None, None): self._replay_validity_stats(None, None)}
+        for bm_name in self.benchmark_score_history:
+            self._validity_stats[(bm_name, None)] = self._replay_validity_stats(bm_name, None)
 
     def get_statistics(self) -> dict:
         """
@@ -595,6 +900,9 @@ class Evaluator:
                 "noise": bm.noise_level,
                 "weight": self.benchmark_weights.get(bm.name, 1.0),
             }
+            bm_correlation = self.compute_validity_correlation(benchmark=bm.name)
+            if bm_correlation is not None:
+                stats["benchmarks"][bm.name]["empirical_validity_correlation"] = bm_correlation
 
         # Primary benchmark for backwards compatibility
         stats["benchmark_validity"] = self.benchmark.validity
@@ -649,9 +957,11 @@ class Evaluator:
                 "validity_decay_rate": self.benchmark.validity_decay_rate,
                 "exploitability_growth_rate": self.benchmark.exploitability_growth_rate,
             },
-            "score_history": self.score_history,
-            "benchmark_score_history": self.benchmark_score_history,
-            "capability_history": self.capability_history,
+            "score_history": self.score_history.to_list(),
+            "benchmark_score_history": {
+                name: history.to_list() for name, history in self.benchmark_score_history.items()
+            },
+            "capability_history": self.capability_history.to_list(),
             "current_round": self.current_round,
             "benchmark_introduction_cooldown": self.benchmark_introduction_cooldown,
             "last_introduction_round": self.last_introduction_round,
@@ -697,13 +1007,17 @@ class Evaluator:
             evaluator.benchmark.validity_decay_rate = data["benchmark"].get("validity_decay_rate", 0.0)
             evaluator.benchmark.exploitability_growth_rate = data["benchmark"].get("exploitability_growth_rate", 0.0)
 
-        evaluator.score_history = data["score_history"]
-        evaluator.capability_history = data["capability_history"]
+        evaluator.score_history = ScoreSeries(data["score_history"])
+        evaluator.capability_history = ScoreSeries(data["capability_history"])
         evaluator.current_round = data["current_round"]
 
         # Load benchmark score history if present
         if "benchmark_score_history" in data:
-            evaluator.benchmark_score_history = data["benchmark_score_history"]
+            evaluator.benchmark_score_history = {
+                name: ScoreSeries(history)
+                for name, history in data["benchmark_score_history"].items()
+            }
+        evaluator._reset_validity_stats()
 
         # Load benchmark introduction state if present
         evaluator.benchmark_introduction_cooldown = data.get("benchmark_introduction_cooldown", 8)
@@ -26,6 +26,7 @@ from dataclasses import dataclass, field
 from typing import Optional
 
 from visibility import PublicState, FunderPrivateState, FunderGroundTruth
+from .memory import ActorMemory
 
 
 class Funder:
@@ -98,7 +99,7 @@ class Funder:
         self.funding_cooldown = funding_cooldown
 
         # Memory
-        self.memory = []
+        self.memory = ActorMemory()
 
         # Tracking for inference
         self._last_leaderboard: list = []
@@ -310,13 +311,18 @@ class Funder:
             "beliefs": dict(self.private_state.believed_provider_quality),
         })
 
-    def plan(self) -> dict:
+    def plan(self, deadline: Optional[float] = None) -> dict:
         """
         Decide funding allocations for the next round.
 
         Respects funding_cooldown: if fewer than `funding_cooldown` rounds
         have passed since last allocation, returns previous allocations.
 
+        Args:
+            deadline: LLM mode only. Absolute time.monotonic() by which the LLM
+                must answer, else the heuristic allocation is used and its
+                planning entry is tagged deadline_missed (None = wait)
+
         Returns:
             Dict mapping provider names to funding amounts
         """
@@ -328,7 +334,7 @@ class Funder:
         self._last_funding_round = current_round
 
         if self.llm_mode:
-            return self._plan_llm()
+            return self._plan_llm(deadline)
         else:
             return self._plan_heuristic()
 
@@ -536,22 +542,33 @@ class Funder:
 
         return allocations
 
-    def _plan_llm(self) -> dict:
-        """LLM-driven funding decision."""
+    def _plan_llm(self, deadline: Optional[float] = None) -> dict:
+        """LLM-driven funding decision (heuristic if the deadline is missed)."""
         try:
-            from llm import llm_plan_funding
+            from llm import llm_plan_funding, run_with_deadline
             capped_capital = self.private_state.total_capital * self.max_round_deployment
-            allocations, reasoning = llm_plan_funding(
+            finished, result = run_with_deadline(
+                llm_plan_funding,
+                deadline,
                 name=self.name,
                 funder_type=self.funder_type,
                 total_capital=capped_capital,
-                believed_provider_quality=self.private_state.believed_provider_quality,
-                believed_provider_gaming=self.private_state.believed_provider_gaming,
-                leaderboard=self._last_leaderboard,
+                # Copies, since a call that misses the deadline finishes later
+                believed_provider_quality=dict(self.private_state.believed_provider_quality),
+                believed_provider_gaming=dict(self.private_state.believed_provider_gaming),
+                leaderboard=list(self._last_leaderboard),
                 consumer_satisfaction=self._last_consumer_data.get("avg_satisfaction"),
                 recent_history=self.private_state.funding_history[-5:],
                 verbose=False,
             )
+            if not finished:
+                allocations = self._plan_heuristic()
+                planning = self.memory.latest("planning")
+                if planning and planning.get("round") == self.public_state.current_round:
+                    planning["deadline_missed"] = True
+                    planning["reason"] = f"[deadline] LLM missed the planning deadline; {planning['reason']}"
+                return allocations
+            allocations, reasoning = result
 
             self.memory.append({
                 "type": "planning_llm",
@@ -678,7 +695,7 @@ class Funder:
             json.dump(self.private_state.to_dict(), f, indent=2)
 
         with open(f"{folder}/memory.json", "w") as f:
-            json.dump(self.memory, f, indent=2)
+            json.dump(self.memory.to_list(), f, indent=2)
 
         # Save parameters
         with open(f"{folder}/params.json", "w") as f:
@@ -716,7 +733,7 @@ class Funder:
         funder.private_state = FunderPrivateState.from_dict(private_data)
 
         with open(f"{folder}/memory.json", "r") as f:
-            funder.memory = json.load(f)
+            funder.memory = ActorMemory(json.load(f))
 
         return funder
 
@@ -0,0 +1,250 @@
+"""
+Actor Memory Store for Evaluation Ecosystem Simulation
+
+Actors record what they observe, plan, reflect on and execute as a stream
+of dicts, each with a "type" and usually a "round". ActorMemory keeps that
+stream list-compatible (append, iteration, len, indexing) and adds:
+
+- per-type indices, so the latest entry of a type, the last k entries of a
+  type, or the entry of a type for a given round are O(1) lookups
+- optional retention: keep at most max_entries in RAM (oldest dropped)
+- optional spill: entries more than spill_after_rounds rounds older than
+  the newest one are appended to a JSONL file and released from RAM
+
+to_list() returns the full stream (spilled entries included), which is what
+actors write to memory.json, so saved folders look the same as before.
+"""
+import json
+import os
+from collections import deque
+from itertools import islice
+from typing import Optional
+
+
+class ActorMemory:
+    """
+    Typed, optionally bounded memory stream for one actor.
+
+    Iteration, len() and indexing cover the entries currently held in RAM,
+    oldest first. With no limits configured, that is every entry appended.
+    """
+
+    def __init__(
+        self,
+        entries: Optional[list] = None,
+        max_entries: Optional[int] = None,
+        spill_path: Optional[str] = None,
+        spill_after_rounds: Optional[int] = None,
+    ):
+        """
+        Args:
+            entries: Initial entries (e.g. a loaded memory.json list)
+            max_entries: Keep at most this many entries in RAM (None: no limit)
+            spill_path: JSONL file that entries older than spill_after_rounds
+                are moved to (None: older entries stay in RAM)
+            spill_after_rounds: Spill entries whose round is more than this
+                many rounds behind the newest entry
+        """
+        self._entries: deque = deque()
+        self._by_type: dict[str, deque] = {}  # type -> deque of (seq, entry)
+        self._by_round: dict[tuple, dict] = {}
+        self._newest_round: Optional[int] = None
+        self._seq = 0
+        self.max_entries = max_entries
+        self.spill_path = spill_path
+        self.spill_after_rounds = spill_after_rounds
+        self.n_spilled = 0
+        self.n_dropped = 0
+        for entry in entries or []:
+            self._index(entry)
+        self._enforce_limits()
+
+    def configure(
+        self,
+        max_entries: Optional[int] = None,
+        spill_path: Optional[str] = None,
+        spill_after_rounds: Optional[int] = None,
+    ):
+        """
+        Set retention limits (same meaning as the constructor arguments).
+
+        A new spill file starts empty; existing entries are trimmed at once.
+        """
+        self.max_entries = max_entries
+        self.spill_after_rounds = spill_after_rounds
+        if spill_path != self.spill_path:
+            self.spill_path = spill_path
+            self.n_spilled = 0
+            if spill_path:
+                os.makedirs(os.path.dirname(spill_path) or ".", exist_ok=True)
+                open(spill_path, "w").close()
+        self._enforce_limits()
+
+    # --- Writing ---
+
+    def append(self, entry: dict):
+        """Record an entry (a dict with a "type" and usually a "round")."""
+        self._index(entry)
+        self._enforce_limits()
+
+    def extend(self, entries):
+        for entry in entries:
+            self._index(entry)
+        self._enforce_limits()
+
+    def _index(self, entry: dict):
+        self._entries.append(entry)
+        entry_type = entry.get("type")
+        self._by_type.setdefault(entry_type, deque()).append((self._seq, entry))
+        self._seq += 1
+        round_num = entry.get("round")
+        if round_num is not None:
+            self._by_round[(entry_type, round_num)] = entry
+            if self._newest_round is None or round_num > self._newest_round:
+                self._newest_round = round_num
+
+    def _release(self, entry: dict):
+        """Drop the oldest entry from the indices (it is always at the front)."""
+        entry_type = entry.get("type")
+        of_type = self._by_type[entry_type]
+        of_type.popleft()
+        if not of_type:
+            del self._by_type[entry_type]
+        key = (entry_type, entry.get("round"))
+        if self._by_round.get(key) is entry:
+            del self._by_round[key]
+
+    def _enforce_limits(self):
+        spilled = []
+        if self.spill_path and self.spill_after_rounds is not None and self._newest_round is not None:
+            cutoff = self._newest_round - self.spill_after_rounds
+            while self._entries and self._entries[0].get("round", cutoff) < cutoff:
+                entry = self._entries.popleft()
+                self._release(entry)
+                spilled.append(entry)
+
+        while self.max_entries is not None and len(self._entries) > self.max_entries:
+            entry = self._entries.popleft()
+            self._release(entry)
+            if self.spill_path:
+                spilled.append(entry)
+            else:
+                self.n_dropped += 1
+
+        if spilled:
+            with open(self.spill_path, "a") as f:
+                for entry in spilled:
+                    f.write(json.dumps(entry) + "\n")
+            self.n_spilled += len(spilled)
+
+    # --- Queries ---
+
+    def latest(self, *types: str) -> Optional[dict]:
+        """
+        Most recent entry of any of the given types still in RAM, or None.
+
+        Args:
+            *types: Entry types, e.g. latest("planning") or
+                latest("planning", "planning_llm")
+        """
+        newest = None
+        for entry_type in types:
+            of_type = self._by_type.get(entry_type)
+            if of_type and (newest is None or of_type[-1][0] > newest[0]):
+                newest = of_type[-1]
+        return newest[1] if newest else None
+
+    def of_type(self, entry_type: str, last_n: Optional[int] = None) -> list:
+        """
+        Entries of one type still in RAM, oldest first.
+
+        Args:
+            entry_type: Entry type, e.g. "observation"
+            last_n: Only the most recent last_n entries
+        """
+        of_type = self._by_type.get(entry_type, ())
+        if last_n is None:
+            return [entry for _, entry in of_type]
+        recent = [entry for _, entry in islice(reversed(of_type), last_n)]
+        return recent[::-1]
+
+    def get(self, entry_type: str, round_num: int, default=None):
+        """Last entry of a type recorded for a round (if still in RAM), or default."""
+        return self._by_round.get((entry_type, round_num), default)
+
+    # --- Persistence ---
+
+    def to_list(self) -> list:
+        """Every entry recorded, spilled ones included, oldest first (for JSON)."""
+        entries = []
+        if self.spill_path and self.n_spilled and os.path.exists(self.spill_path):
+            with open(self.spill_path) as f:
+                entries = [json.loads(line) for line in f if line.strip()]
+        entries.extend(self._entries)
+        return entries
+
+    def __getstate__(self):
+        # Remember how much of the spill file this state accounts for, so a
+        # restored checkpoint can discard entries spilled after it was taken
+        state = self.__dict__.copy()
+        state["_spill_size"] = (
+            os.path.getsize(self.spill_path)
+            if self.spill_path and os.path.exists(self.spill_path) else 0
+        )
+        return state
+
+    def __setstate__(self, state):
+        # No filesystem side effects here: the spill file may still belong to
+        # a live simulation. Restorers call adopt_spill() to get a file that
+        # matches this state.
+        self.__dict__.update(state)
+
+    def adopt_spill(self, path: Optional[str] = None):
+        """
+        Give an unpickled memory a spill file holding exactly the entries its
+        state accounts for (the spill file's size when it was pickled).
+
+        Args:
+            path: New spill file, filled with that many bytes copied from the
+                current one. None truncates the current file in place instead,
+                which is only right when resuming the run that wrote it.
+        """
+        spill_size = self.__dict__.pop("_spill_size", None)
+        if not self.spill_path:
+            return
+        if spill_size is None:
+            spill_size = os.path.getsize(self.spill_path) if os.path.exists(self.spill_path) else 0
+        if path is None:
+            if os.path.exists(self.spill_path) and os.path.getsize(self.spill_path) > spill_size:
+                with open(self.spill_path, "r+") as f:
+                    f.truncate(spill_size)
+            return
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "wb") as dst:
+            if os.path.exists(self.spill_path):
+                with open(self.spill_path, "rb") as src:
+                    dst.write(src.read(spill_size))
+        self.spill_path = path
+
+    # --- List compatibility ---
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __iter__(self):
+        return iter(self._entries)
+
+    def __reversed__(self):
+        return reversed(self._entries)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return list(self._entries)[index]
+        return self._entries[index]
+
+    def __bool__(self) -> bool:
+        return bool(self._entries)
+
+    def __repr__(self):
+        return (f"ActorMemory(entries={len(self._entries)}, spilled={self.n_spilled}, "
+                f"dropped={self.n_dropped}, types={sorted(map(str, self._by_type))})")
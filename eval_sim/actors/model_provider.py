@@ -16,6 +16,7 @@ from dataclasses import dataclass, field, asdict
 from typing import Optional
 
 from visibility import PublicState, ProviderPrivateState, ProviderGroundTruth
+from .memory import ActorMemory
 
 
 @dataclass
@@ -231,7 +232,7 @@ class ModelProvider:
         self.verbose_llm = verbose_llm
 
         # Memory structures
-        self.memory = []
+        self.memory = ActorMemory()
 
     @property
     def name(self) -> str:
@@ -397,19 +398,32 @@ class ModelProvider:
         })
         self.scratch.recent_insights = self.private_state.recent_insights
 
-    def plan(self, ecosystem_context: Optional[dict] = None) -> dict:
+    def plan(self, ecosystem_context: Optional[dict] = None, deadline: Optional[float] = None) -> dict:
         """
         Decide investment portfolio allocation for the next round.
 
         Args:
             ecosystem_context: Optional dict with public ecosystem signals
                 (consumer_satisfaction, regulatory_pressure)
+            deadline: LLM mode only. Absolute time.monotonic() by which the LLM
+                must answer; if it does not, the heuristic portfolio (computed
+                up front) is used and the planning entry is tagged
+                deadline_missed. None waits for the LLM.
 
         Returns:
             Dict with keys: fundamental_research, training_optimization,
                            evaluation_engineering, safety_alignment
         """
-        if self.llm_mode:
+        deadline_missed = False
+        if self.llm_mode and deadline is not None:
+            fallback = self._plan_heuristic()
+            planned = self._plan_llm(ecosystem_context, deadline)
+            if planned is None:
+                portfolio, reasoning = fallback, None
+                deadline_missed = True
+            else:
+                portfolio, reasoning = planned
+        elif self.llm_mode:
             portfolio, reasoning = self._plan_llm(ecosystem_context)
         else:
             portfolio = self._plan_heuristic()
@@ -447,6 +461,9 @@ class ModelProvider:
         }
         if reasoning:
             memory_entry["reasoning"] = reasoning
+        if deadline_missed:
+            memory_entry["deadline_missed"] = True
+            memory_entry["reason"] = "[deadline] LLM missed the planning deadline; heuristic portfolio used"
         self.memory.append(memory_entry)
 
         return portfolio
@@ -515,9 +532,11 @@ class ModelProvider:
             "safety_alignment": safety,
         }
 
-    def _plan_llm(self, ecosystem_context: Optional[dict] = None) -> tuple[dict, str]:
-        """LLM-driven investment portfolio planning."""
-        from llm import llm_plan_portfolio
+    def _plan_llm(
+        self, ecosystem_context: Optional[dict] = None, deadline: Optional[float] = None
+    ) -> Optional[tuple[dict, str]]:
+        """LLM-driven investment portfolio planning (None if the deadline is missed)."""
+        from llm import llm_plan_portfolio, run_with_deadline
 
         # Get recent competitor scores
         competitor_scores = {}
@@ -536,8 +555,10 @@ class ModelProvider:
         # Extract ecosystem context
         ctx = ecosystem_context or {}
 
-        # Call LLM
-        portfolio, reasoning = llm_plan_portfolio(
+        # Call LLM (inputs are gathered above, so a late call touches no state)
+        finished, result = run_with_deadline(
+            llm_plan_portfolio,
+            deadline,
             name=self.name,
             strategy_profile=self.private_state.strategy_profile,
             innate_traits=self.private_state.innate_traits,
@@ -550,6 +571,9 @@ class ModelProvider:
             regulatory_pressure=ctx.get("regulatory_pressure"),
             verbose=self.verbose_llm,
         )
+        if not finished:
+            return None
+        portfolio, reasoning = result
 
         # Store reasoning
         self.private_state.recent_insights.append({
@@ -659,7 +683,7 @@ class ModelProvider:
 
         # Save memory
         with open(f"{folder}/memory.json", "w") as f:
-            json.dump(self.memory, f, indent=2)
+            json.dump(self.memory.to_list(), f, indent=2)
 
     @classmethod
     def load(cls, folder: str) -> "ModelProvider":
@@ -686,7 +710,7 @@ class ModelProvider:
 
         # Load memory
         with open(f"{folder}/memory.json", "r") as f:
-            provider.memory = json.load(f)
+            provider.memory = ActorMemory(json.load(f))
 
         return provider
 
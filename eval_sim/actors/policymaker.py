@@ -21,6 +21,7 @@ from dataclasses import dataclass, field
 from typing import Optional
 
 from visibility import PublicState, PolicymakerPrivateState, PolicymakerGroundTruth
+from .memory import ActorMemory
 
 
 class Policymaker:
@@ -87,7 +88,7 @@ class Policymaker:
         self.llm_mode = llm_mode
 
         # Memory
-        self.memory = []
+        self.memory = ActorMemory()
 
         # Tracking
         self._last_validity_correlation: Optional[float] = None
@@ -100,9 +101,7 @@ class Policymaker:
     def _detect_score_volatility(self) -> bool:
         """Detect suspicious score spikes (possible gaming signal)."""
         # Check if any provider's score jumped more than 0.1 in one round
-        if len(self.memory) < 2:
-            return False
-        recent_obs = [m for m in self.memory if m.get("type") == "observation"]
+        recent_obs = self.memory.of_type("observation", last_n=2)
         if len(recent_obs) < 2:
             return False
         # Compare leaderboard from last two observations
@@ -118,7 +117,8 @@ class Policymaker:
 
     def _detect_satisfaction_trend(self) -> bool:
         """Detect declining consumer satisfaction trend over last 3 observations."""
-        recent_obs = [m for m in self.memory if m.get("type") == "observation" and m.get("consumer_satisfaction") is not None]
+        recent_obs = [m for m in self.memory.of_type("observation")
+                      if m.get("consumer_satisfaction") is not None]
         if len(recent_obs) < 3:
             return False
         sats = [m["consumer_satisfaction"] for m in recent_obs[-3:]]
@@ -447,7 +447,7 @@ class Policymaker:
             json.dump(self.private_state.to_dict(), f, indent=2)
 
         with open(f"{folder}/memory.json", "w") as f:
-            json.dump(self.memory, f, indent=2)
+            json.dump(self.memory.to_list(), f, indent=2)
 
         # Save parameters
         with open(f"{folder}/params.json", "w") as f:
@@ -481,7 +481,7 @@ class Policymaker:
         policymaker.private_state = PolicymakerPrivateState.from_dict(private_data)
 
         with open(f"{folder}/memory.json", "r") as f:
-            policymaker.memory = json.load(f)
+            policymaker.memory = ActorMemory(json.load(f))
 
         return policymaker
 
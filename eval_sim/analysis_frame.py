@@ -0,0 +1,300 @@
+"""
+Shared Analysis Frame for Evaluation Ecosystem Plotting
+
+Builds the (round x provider) arrays that the dashboards plot once per
+history, instead of every panel re-walking the nested round_data dicts:
+
+    - scores, capabilities, believed: (n_rounds, n_providers)
+    - investments[inv_type]: (n_rounds, n_providers) portfolio allocations
+    - benchmark_scores[name]: (n_rounds, n_providers) per-benchmark scores
+    - market_shares, provider_satisfaction, funding_multipliers
+    - consumer_mask / policymaker_mask / funder_mask / media_mask: (n_rounds,)
+
+Missing values are NaN. Rolling statistics are vectorized kernels over
+these arrays (rolling_correlation, rolling_mean, deltas), and the frame
+memoizes the validity series so several dashboards can share them.
+
+Usage:
+    frame = AnalysisFrame.of(sim.history)        # or a ColumnarHistory
+    rounds, corrs = frame.rolling_validity(window=5)
+    create_all_dashboards(frame, output_dir)
+"""
+from typing import Optional
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from history_store import ColumnarHistory
+
+
+INVESTMENT_TYPES = (
+    "fundamental_research",
+    "training_optimization",
+    "evaluation_engineering",
+    "safety_alignment",
+)
+
+
+# =============================================================================
+# Rolling Kernels
+# =============================================================================
+
+def rolling_correlation(x: np.ndarray, y: np.ndarray, window: int) -> np.ndarray:
+    """
+    Pearson correlation over trailing windows of rounds, pooling all columns.
+
+    Window k covers rows k .. k + window - 1. Cells where either array is NaN
+    are left out, as are windows with fewer than 2 pairs (NaN result).
+
+    Args:
+        x: (n_rounds,) or (n_rounds, n_cols) array
+        y: Array of the same shape
+        window: Rounds per window
+
+    Returns:
+        (n_rounds - window + 1,) array of correlations
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    if x.ndim == 1:
+        x, y = x[:, None], y[:, None]
+    if window < 1 or len(x) < window:
+        return np.empty(0)
+
+    valid = ~(np.isnan(x) | np.isnan(y))
+    n_windows = len(x) - window + 1
+    # (n_windows, n_cols, window) views flattened to one row per window
+    xw = sliding_window_view(np.where(valid, x, 0.0), window, axis=0).reshape(n_windows, -1)
+    yw = sliding_window_view(np.where(valid, y, 0.0), window, axis=0).reshape(n_windows, -1)
+    vw = sliding_window_view(valid, window, axis=0).reshape(n_windows, -1)
+
+    n = vw.sum(axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        dx = np.where(vw, xw - (xw.sum(axis=1) / n)[:, None], 0.0)
+        dy = np.where(vw, yw - (yw.sum(axis=1) / n)[:, None], 0.0)
+        corr = (dx * dy).sum(axis=1) / np.sqrt((dx * dx).sum(axis=1) * (dy * dy).sum(axis=1))
+    corr[n < 2] = np.nan
+    return np.clip(corr, -1.0, 1.0)
+
+
+def rolling_mean(x: np.ndarray, window: int) -> np.ndarray:
+    """
+    Trailing mean over `window` rows.
+
+    Args:
+        x: (n_rounds,) or (n_rounds, n_cols) array
+        window: Rows per window
+
+    Returns:
+        Array with n_rounds - window + 1 rows
+    """
+    x = np.asarray(x, dtype=float)
+    if window < 1 or len(x) < window:
+        return np.empty((0,) + x.shape[1:])
+    return sliding_window_view(x, window, axis=0).mean(axis=-1)
+
+
+def deltas(x: np.ndarray, lag: int = 1) -> np.ndarray:
+    """Row-to-row changes x[t] - x[t - lag] (n_rounds - lag rows)."""
+    x = np.asarray(x, dtype=float)
+    return x[lag:] - x[:-lag]
+
+
+# =============================================================================
+# Frame Construction
+# =============================================================================
+
+def _dict_at(round_data: dict, path: tuple) -> dict:
+    """Nested dict at path, or {} if any level is missing."""
+    node = round_data
+    for key in path:
+        node = node.get(key) if isinstance(node, dict) else None
+        if node is None:
+            return {}
+    return node if isinstance(node, dict) else {}
+
+
+def _rounds_matrix(history: list, path: tuple, names: list) -> np.ndarray:
+    """(n_rounds, len(names)) array of the values under path, NaN where missing."""
+    out = np.full((len(history), len(names)), np.nan)
+    for i, h in enumerate(history):
+        values = _dict_at(h, path)
+        for j, name in enumerate(names):
+            value = values.get(name)
+            if isinstance(value, (int, float)):
+                out[i, j] = value
+    return out
+
+
+def _columns_matrix(columns: ColumnarHistory, path: tuple, names: list) -> np.ndarray:
+    """Same as _rounds_matrix, read from column views."""
+    out = np.full((len(columns), len(names)), np.nan)
+    for j, name in enumerate(names):
+        if columns.has(*path, name):
+            out[:, j] = columns.column(*path, name)
+    return out
+
+
+def _columns_subtree_present(columns: ColumnarHistory, key: str) -> np.ndarray:
+    """Rounds whose round_data has top-level key (numeric or non-numeric leaves)."""
+    present = np.array([key in extras for extras in columns.extras], dtype=bool)
+    idx = [j for j, path in enumerate(columns.columns) if path[0] == key]
+    if idx:
+        present |= np.asarray(columns.present[:, idx]).any(axis=1)
+    return present
+
+
+class AnalysisFrame:
+    """
+    Stacked per-round arrays for one simulation history.
+
+    Build with AnalysisFrame.of(history); the round_data dicts stay available
+    as frame.history for panels that plot non-numeric data (headlines,
+    segment breakdowns, interventions).
+    """
+
+    def __init__(self, history: Optional[list] = None, columns: Optional[ColumnarHistory] = None):
+        self._history = history
+        self._columns = columns
+        self._cache: dict = {}
+
+        if columns is not None:
+            self.rounds = np.asarray(columns.rounds).astype(int)
+            self.providers = columns.keys("scores")
+            self.benchmark_names = columns.keys("per_benchmark_scores")
+            per_benchmark_present = _columns_subtree_present(columns, "per_benchmark_scores")
+            self.has_per_benchmark = bool(len(columns)) and bool(per_benchmark_present[0])
+
+            def matrix(*path):
+                return _columns_matrix(columns, path, self.providers)
+
+            self.consumer_mask = _columns_subtree_present(columns, "consumer_data")
+            self.policymaker_mask = _columns_subtree_present(columns, "policymaker_data")
+            self.funder_mask = _columns_subtree_present(columns, "funder_data")
+            self.media_mask = _columns_subtree_present(columns, "media_data")
+        else:
+            history = history or []
+            self.rounds = np.array([h["round"] for h in history], dtype=int)
+            self.providers = []
+            for h in history:
+                self.providers.extend(p for p in h["scores"] if p not in self.providers)
+            self.benchmark_names = []
+            for h in history:
+                self.benchmark_names.extend(
+                    bm for bm in h.get("per_benchmark_scores", {}) if bm not in self.benchmark_names
+                )
+            self.has_per_benchmark = bool(history) and "per_benchmark_scores" in history[0]
+
+            def matrix(*path):
+                return _rounds_matrix(history, path, self.providers)
+
+            self.consumer_mask = np.array(["consumer_data" in h for h in history], dtype=bool)
+            self.policymaker_mask = np.array(["policymaker_data" in h for h in history], dtype=bool)
+            self.funder_mask = np.array(["funder_data" in h for h in history], dtype=bool)
+            self.media_mask = np.array(["media_data" in h for h in history], dtype=bool)
+
+        self.scores = matrix("scores")
+        self.capabilities = matrix("true_capabilities")
+        self.believed = matrix("believed_capabilities")
+        self.market_shares = matrix("consumer_data", "market_shares")
+        self.provider_satisfaction = matrix("consumer_data", "provider_satisfaction")
+        self.funding_multipliers = matrix("funder_data", "funding_multipliers")
+        self.benchmark_scores = {
+            bm: matrix("per_benchmark_scores", bm) for bm in self.benchmark_names
+        }
+        # Allocation per investment type; providers without a portfolio read 0
+        self.investments = {}
+        for inv_type in INVESTMENT_TYPES:
+            values = np.full((len(self.rounds), len(self.providers)), np.nan)
+            for j, provider in enumerate(self.providers):
+                if columns is not None:
+                    if columns.has("strategies", provider, inv_type):
+                        values[:, j] = columns.column("strategies", provider, inv_type)
+                else:
+                    values[:, j] = [
+                        h["strategies"].get(provider, {}).get(inv_type, np.nan)
+                        if "strategies" in h else np.nan
+                        for h in history
+                    ]
+            self.investments[inv_type] = np.nan_to_num(values, nan=0.0)
+
+    @classmethod
+    def of(cls, history) -> "AnalysisFrame":
+        """Frame for a list of round dicts or a ColumnarHistory (frames pass through)."""
+        if isinstance(history, AnalysisFrame):
+            return history
+        if isinstance(history, ColumnarHistory):
+            return cls(columns=history)
+        return cls(history=list(history))
+
+    @property
+    def history(self) -> list:
+        """The round_data dicts (rebuilt once from columns if needed)."""
+        if self._history is None:
+            self._history = self._columns.to_history() if self._columns is not None else []
+        return self._history
+
+    def __len__(self) -> int:
+        return len(self.rounds)
+
+    def __bool__(self) -> bool:
+        return len(self.rounds) > 0
+
+    def provider_index(self, provider: str) -> int:
+        return self.providers.index(provider)
+
+    # --- Derived series (memoized) ---
+
+    def rolling_validity(self, window: int = 5) -> tuple[list, list]:
+        """
+        Rolling correlation between scores and true capabilities.
+
+        Returns:
+            (rounds, correlations): round numbers at each window's end, and the
+            correlation over that window; windows with no defined correlation
+            are skipped
+        """
+        key = ("validity", window)
+        if key not in self._cache:
+            corr = rolling_correlation(self.scores, self.capabilities, window)
+            self._cache[key] = self._defined(corr, window)
+        return self._cache[key]
+
+    def rolling_benchmark_validity(self, window: int = 5) -> dict:
+        """
+        Rolling validity per benchmark.
+
+        Returns:
+            {benchmark_name: (rounds, correlations)} for benchmarks with at
+            least one defined window, in order of first appearance
+        """
+        key = ("benchmark_validity", window)
+        if key not in self._cache:
+            result = {}
+            if self.has_per_benchmark:
+                for bm, bm_scores in self.benchmark_scores.items():
+                    corr = rolling_correlation(bm_scores, self.capabilities, window)
+                    rounds, values = self._defined(corr, window)
+                    if values:
+                        result[bm] = (rounds, values)
+            self._cache[key] = result
+        return self._cache[key]
+
+    def score_momentum(self, window: int = 3) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Trailing mean of round-to-round score changes.
+
+        Returns:
+            (rounds, momentum) where momentum is (len(rounds), n_providers)
+        """
+        key = ("momentum", window)
+        if key not in self._cache:
+            momentum = rolling_mean(deltas(self.scores), window)
+            self._cache[key] = (self.rounds[window:], momentum)
+        return self._cache[key]
+
+    def _defined(self, corr: np.ndarray, window: int) -> tuple[list, list]:
+        """Drop NaN windows; label each window with its last round."""
+        keep = ~np.isnan(corr)
+        end_rounds = self.rounds[window - 1:]
+        return end_rounds[keep].tolist(), corr[keep].tolist()
@@ -0,0 +1,834 @@
+"""
+Batched Monte Carlo Runner for the Evaluation Ecosystem Simulation
+
+Advances N independent replicas of the heuristic simulation in lockstep.
+Instead of one EvalEcosystemSimulation object graph per seed, all replica
+state lives in NumPy arrays with a leading replica axis:
+
+- Providers: true capability, believed capability, investment portfolio
+- Evaluator: benchmark validity/exploitability/noise/weights (padded to
+  max_benchmarks slots), best published scores, introduction state
+- Consumer market: per-segment provider shares, believed quality,
+  satisfaction and tenure
+
+Each replica draws from its own np.random.default_rng(seed) stream in the
+same order as EvalEcosystemSimulation, so replica r reproduces
+EvalEcosystemSimulation(SimulationConfig(seed=seeds[r], ...)) round for round.
+get_history(r) returns a history list in the same format as
+EvalEcosystemSimulation.history, so plotting.py works unchanged.
+
+Scope: heuristic providers, the evaluator (multi-benchmark scoring, Goodhart
+decay, benchmark introduction) and the consumer market. LLM mode,
+policymakers, funders and media are not supported; use
+EvalEcosystemSimulation for those.
+
+Usage:
+    config = SimulationConfig(n_rounds=50, enable_consumers=True, verbose=False)
+    batch = BatchedSimulation(config, get_default_provider_configs(), n_replicas=500)
+    batch.run()
+    arrays = batch.get_arrays()            # {"scores": (R, T, P), ...}
+    history = batch.get_history(0)         # plotting-compatible history
+"""
+from typing import Optional
+
+import numpy as np
+
+from actors.evaluator import Evaluator
+from simulation import SimulationConfig, r4
+
+
+# Portfolio component order used for the strategies array
+INVESTMENT_TYPES = [
+    "fundamental_research",
+    "training_optimization",
+    "evaluation_engineering",
+    "safety_alignment",
+]
+
+DEFAULT_USE_CASES = ["software_dev", "content_writer", "healthcare",
+                     "finance", "researcher", "creative"]
+
+
+def _switching_probability(gap: np.ndarray, threshold: np.ndarray,
+                           steepness: float = 10.0) -> np.ndarray:
+    """Array version of consumer._switching_probability."""
+    x = np.clip(steepness * (gap - threshold), -20.0, 20.0)
+    return 1.0 / (1.0 + np.exp(-x))
+
+
+class BatchedSimulation:
+    """
+    N replicas of the heuristic simulation advanced round by round.
+
+    Arrays use the axes R (replicas), P (providers), K (benchmark slots,
+    padded to max_benchmarks) and S (consumer segments). Benchmark slots are
+    filled in introduction order, so the active benchmarks of replica r are
+    always slots [0, n_benchmarks[r]).
+    """
+
+    def __init__(
+        self,
+        config: SimulationConfig,
+        provider_configs: list[dict],
+        n_replicas: Optional[int] = None,
+        seeds: Optional[list[int]] = None,
+    ):
+        """
+        Initialize the batch.
+
+        Args:
+            config: Shared simulation config (config.seed is the base seed)
+            provider_configs: Provider configs, as for EvalEcosystemSimulation.setup()
+            n_replicas: Number of replicas (default: len(seeds))
+            seeds: Per-replica seeds. Default: config.seed, config.seed + 1, ...
+        """
+        if config.llm_mode:
+            raise ValueError("BatchedSimulation only supports heuristic mode (llm_mode=False)")
+        unsupported = [
+            name for name, enabled in [
+                ("enable_policymakers", config.enable_policymakers),
+                ("enable_funders", config.enable_funders),
+                ("enable_media", config.enable_media),
+            ] if enabled
+        ]
+        if unsupported:
+            raise ValueError(
+                f"BatchedSimulation does not support {', '.join(unsupported)}; "
+                "use EvalEcosystemSimulation for those actors"
+            )
+
+        if seeds is None:
+            if n_replicas is None:
+                raise ValueError("Provide n_replicas or seeds")
+            base_seed = config.seed if config.seed is not None else 0
+            seeds = [base_seed + i for i in range(n_replicas)]
+        self.seeds = list(seeds)
+        self.config = config
+        self.n_replicas = len(self.seeds)
+        self.current_round = 0
+
+        # Per-replica RNG streams (the evaluator's stream in the object simulation)
+        self.rngs = [np.random.default_rng(seed) for seed in self.seeds]
+
+        self._setup_providers(provider_configs)
+        self._setup_evaluator()
+        self.consumers_enabled = config.enable_consumers
+        if self.consumers_enabled:
+            self._setup_consumer_market(provider_configs)
+
+        # Per-round array records; histories are built on demand
+        self.records: list[dict] = []
+
+    # =========================================================================
+    # Setup
+    # =========================================================================
+
+    def _setup_providers(self, provider_configs: list[dict]):
+        """Initialize provider arrays from provider configs."""
+        R = self.n_replicas
+        self.provider_names = [pc["name"] for pc in provider_configs]
+        P = len(self.provider_names)
+
+        initial_capability = np.array(
+            [pc.get("initial_capability", 0.5) for pc in provider_configs], dtype=float
+        )
+        initial_believed = np.array([
+            pc["initial_believed_capability"]
+            if pc.get("initial_believed_capability") is not None
+            else pc.get("initial_capability", 0.5)
+            for pc in provider_configs
+        ], dtype=float)
+
+        self.true_capability = np.tile(initial_capability, (R, 1))
+        self.believed_capability = np.tile(initial_believed, (R, 1))
+
+        # strategies[..., i] follows INVESTMENT_TYPES
+        strategies = np.full((P, 4), 0.25)
+        for i, pc in enumerate(provider_configs):
+            if "initial_strategy" in pc:
+                for j, key in enumerate(INVESTMENT_TYPES):
+                    strategies[i, j] = pc["initial_strategy"].get(key, 0.25)
+        self.strategies = np.tile(strategies, (R, 1, 1))
+
+        # Heuristic planning modifiers (see ModelProvider._plan_heuristic)
+        profiles = [pc["strategy_profile"].lower() for pc in provider_configs]
+        traits = [pc["innate_traits"].lower() for pc in provider_configs]
+        self._is_aggressive = np.array(
+            ["aggressive" in p or "competitive" in p for p in profiles]
+        )
+        self._is_quality = np.array(
+            ["quality" in p or "long-term" in p for p in profiles]
+        )
+        self._is_risk_averse = np.array(["risk-averse" in t for t in traits])
+        self._effort_budget = 1.0
+
+        # Last three published composite scores, oldest first: [(R, P), ...]
+        self._recent_scores: list[np.ndarray] = []
+
+    def _setup_evaluator(self):
+        """Initialize benchmark slot arrays from the same config the Evaluator uses."""
+        config = self.config
+        R = self.n_replicas
+        P = len(self.provider_names)
+
+        # Reuse Evaluator's config parsing for the initial benchmark set
+        if config.benchmarks:
+            template = Evaluator(benchmarks=config.benchmarks)
+        else:
+            template = Evaluator(
+                benchmark_name=config.benchmark_name,
+                validity=config.benchmark_validity,
+                exploitability=config.benchmark_exploitability,
+                noise_level=config.benchmark_noise,
+            )
+        initial = template.benchmarks
+        K = max(config.max_benchmarks, len(initial))
+        self.max_slots = K
+
+        self.bm_validity = np.zeros((R, K))
+        self.bm_exploitability = np.zeros((R, K))
+        self.bm_noise = np.zeros((R, K))
+        self.bm_decay_rate = np.zeros((R, K))
+        self.bm_growth_rate = np.zeros((R, K))
+        self.bm_weight = np.zeros((R, K))
+        for k, bm in enumerate(initial):
+            self.bm_validity[:, k] = bm.validity
+            self.bm_exploitability[:, k] = bm.exploitability
+            self.bm_noise[:, k] = bm.noise_level
+            # Same defaulting as EvalEcosystemSimulation.setup()
+            self.bm_decay_rate[:, k] = bm.validity_decay_rate or config.benchmark_validity_decay_rate
+            self.bm_growth_rate[:, k] = (
+                bm.exploitability_growth_rate or config.benchmark_exploitability_growth_rate
+            )
+            self.bm_weight[:, k] = template.benchmark_weights[bm.name]
+
+        self.n_benchmarks = np.full(R, len(initial), dtype=int)
+        self.bm_names: list[list[str]] = [[bm.name for bm in initial] for _ in range(R)]
+        self.best_scores = np.zeros((R, P, K))
+
+        self.benchmark_sequence = config.benchmark_sequence or []
+        self.sequence_index = np.zeros(R, dtype=int)
+        self.last_introduction_round = np.zeros(R, dtype=int)
+
+    def _setup_consumer_market(self, provider_configs: list[dict]):
+        """Initialize segment arrays from the same segments ConsumerMarket uses."""
+        from actors.consumer import ConsumerMarket, create_default_segments, USE_CASE_PROFILES
+
+        R = self.n_replicas
+        P = len(self.provider_names)
+        brand_recognition = {
+            pc["name"]: pc.get("brand_recognition", 0.5) for pc in provider_configs
+        }
+        segments = create_default_segments(
+            use_cases=self.config.use_case_profiles or DEFAULT_USE_CASES,
+            provider_names=self.provider_names,
+            brand_recognition=brand_recognition,
+        )
+        # Template market, used only to resolve segment benchmark weights
+        self._market_template = ConsumerMarket(
+            segments=segments,
+            provider_names=self.provider_names,
+            brand_recognition=brand_recognition,
+        )
+        self._segment_weight_cache: dict[tuple, np.ndarray] = {}
+        self.segments = segments
+        S = len(segments)
+
+        self.seg_market_fraction = np.array([s.market_fraction for s in segments])
+        self.seg_trust = np.array([s.leaderboard_trust for s in segments])
+        self.seg_switching_cost = np.array([s.switching_cost for s in segments])
+        self.seg_switching_threshold = np.array([s.switching_threshold for s in segments])
+
+        safety_pref = np.zeros(S)
+        for i, seg in enumerate(segments):
+            prefs = USE_CASE_PROFILES.get(seg.use_case, {}).get("benchmark_prefs", {})
+            for cat, weight in prefs.items():
+                if "safety" in cat.lower():
+                    safety_pref[i] = weight
+                    break
+        self.seg_safety_pref = safety_pref
+
+        shares = np.array([[s.provider_shares[p] for p in self.provider_names] for s in segments])
+        self.shares = np.tile(shares, (R, 1, 1))
+        self.believed_quality = np.zeros((R, S, P))
+        self.satisfaction = np.zeros((R, S, P))
+        self.tenure = np.zeros((R, S, P), dtype=int)
+        self._consumers_observed = False
+
+        # Segment benchmark weights (R, S, K), re-resolved on introductions
+        self.seg_bm_weights = np.zeros((R, S, self.max_slots))
+        for r in range(R):
+            self._resolve_segment_weights(r)
+
+    def _resolve_segment_weights(self, r: int):
+        """Resolve segment benchmark weights for replica r's benchmark names."""
+        names = tuple(self.bm_names[r])
+        weights = self._segment_weight_cache.get(names)
+        if weights is None:
+            self._market_template.resolve_benchmark_weights(list(names))
+            weights = np.array([
+                [seg.benchmark_weights[name] for name in names]
+                for seg in self.segments
+            ])
+            self._segment_weight_cache[names] = weights
+        self.seg_bm_weights[r, :, :] = 0.0
+        self.seg_bm_weights[r, :, :len(names)] = weights
+
+    # =========================================================================
+    # Round Phases
+    # =========================================================================
+
+    def _plan_providers(self):
+        """Vectorized ModelProvider._plan_heuristic for every replica and provider."""
+        R, P = self.believed_capability.shape
+        fundamental = np.full((R, P), 0.25)
+        training = np.full((R, P), 0.25)
+        eval_eng = np.full((R, P), 0.25)
+        safety = np.full((R, P), 0.25)
+
+        # Competitive pressure: gap to the best competitor's believed capability
+        if P > 1 and self._recent_scores:
+            competitor_beliefs = self._recent_scores[0]
+            for scores in self._recent_scores[1:]:
+                competitor_beliefs = competitor_beliefs + scores
+            competitor_beliefs = competitor_beliefs / len(self._recent_scores)
+
+            others = np.broadcast_to(competitor_beliefs[:, None, :], (R, P, P)).copy()
+            others[:, np.arange(P), np.arange(P)] = -np.inf
+            gap = others.max(axis=2) - self.believed_capability
+            shift = np.clip(gap * 0.3, -0.15, 0.15)
+            fundamental = fundamental - shift
+            eval_eng = eval_eng + shift
+
+        # Personality modifiers, applied in the same order as the heuristic
+        eval_eng = np.where(self._is_aggressive, eval_eng + 0.05, eval_eng)
+        safety = np.where(self._is_aggressive, safety - 0.05, safety)
+        fundamental = np.where(self._is_quality, fundamental + 0.05, fundamental)
+        eval_eng = np.where(self._is_quality, eval_eng - 0.05, eval_eng)
+        safety = np.where(self._is_risk_averse, safety + 0.05, safety)
+        eval_eng = np.where(self._is_risk_averse, eval_eng - 0.05, eval_eng)
+
+        total = fundamental + training + eval_eng + safety
+        budget = self._effort_budget
+        self.strategies = np.stack([
+            (fundamental / total) * budget,
+            (training / total) * budget,
+            (eval_eng / total) * budget,
+            (safety / total) * budget,
+        ], axis=-1)
+
+    def _execute_providers(self):
+        """S-curve capability gains plus breakthrough draws (run_round step 1)."""
+        config = self.config
+        fundamental = self.strategies[..., 0]
+        training = self.strategies[..., 1]
+        eval_eng = self.strategies[..., 2]
+
+        # No funders in batched mode, so the funding multiplier is always 1.0
+        effective_efficiency = config.rnd_efficiency * 1.0
+        headroom = np.maximum(0, config.capability_ceiling - self.true_capability)
+        diminishing_factor = headroom ** (1.0 / config.diminishing_returns_rate)
+        raw_gain = (
+            fundamental * effective_efficiency * 1.5 +
+            training * effective_efficiency * 1.0 +
+            eval_eng * effective_efficiency * 0.1
+        )
+        capability_gain = raw_gain * diminishing_factor
+
+        # One breakthrough draw per provider, in provider order, per replica
+        P = self.true_capability.shape[1]
+        draws = np.stack([rng.random(P) for rng in self.rngs])
+        breakthrough = draws < config.breakthrough_probability * fundamental
+        capability_gain = np.where(
+            breakthrough, capability_gain + config.breakthrough_magnitude * headroom, capability_gain
+        )
+        self.true_capability = self.true_capability + capability_gain
+
+    def _evaluate(self) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Vectorized Evaluator.evaluate_all.
+
+        Returns:
+            (composite (R, P), per_benchmark (R, P, K)); inactive slots are NaN
+        """
+        R, P = self.true_capability.shape
+        K = self.max_slots
+        eval_eng = self.strategies[..., 2]
+        mean_scores = (
+            self.true_capability[:, :, None]
+            + eval_eng[:, :, None] * self.bm_exploitability[:, None, :]
+        )
+        noise_std = np.broadcast_to(
+            (self.bm_noise / np.sqrt(np.maximum(self.bm_validity, 0.05)))[:, None, :],
+            mean_scores.shape,
+        )
+
+        raw = np.full((R, P, K), np.nan)
+        for r, rng in enumerate(self.rngs):
+            nb = self.n_benchmarks[r]
+            raw[r, :, :nb] = rng.normal(mean_scores[r, :, :nb], noise_std[r, :, :nb])
+
+        active = np.arange(K)[None, :] < self.n_benchmarks[:, None]  # (R, K)
+        scores = np.maximum(np.clip(raw, 0.0, 1.0), self.best_scores)
+        scores = np.where(active[:, None, :], scores, np.nan)
+        self.best_scores = np.where(active[:, None, :], scores, self.best_scores)
+
+        weighted_sum = np.zeros((R, P))
+        total_weight = np.zeros(R)
+        for k in range(K):
+            on = active[:, k]
+            weight = self.bm_weight[:, k]
+            weighted_sum = np.where(
+                on[:, None], weighted_sum + scores[:, :, k] * weight[:, None], weighted_sum
+            )
+            total_weight = np.where(on, total_weight + weight, total_weight)
+        composite = np.where(
+            total_weight[:, None] > 0,
+            weighted_sum / np.where(total_weight > 0, total_weight, 1.0)[:, None],
+            0.0,
+        )
+        return composite, scores
+
+    def _update_benchmarks(self):
+        """Vectorized Evaluator.update_benchmark (Goodhart feedback)."""
+        eval_eng = self.strategies[..., 2]
+        P = eval_eng.shape[1]
+        total = np.zeros(eval_eng.shape[0])
+        for p in range(P):
+            total = total + eval_eng[:, p]
+        avg_eval_engineering = total / P if P else total
+        gaming_pressure = np.maximum(0.1, avg_eval_engineering)[:, None]
+
+        active = np.arange(self.max_slots)[None, :] < self.n_benchmarks[:, None]
+        decays = active & (self.bm_decay_rate > 0)
+        grows = active & (self.bm_growth_rate > 0)
+        self.bm_validity = np.where(
+            decays,
+            np.maximum(0.2, self.bm_validity * (1 - self.bm_decay_rate * gaming_pressure)),
+            self.bm_validity,
+        )
+        self.bm_exploitability = np.where(
+            grows,
+            np.minimum(0.95, self.bm_exploitability * (1 + self.bm_growth_rate * gaming_pressure)),
+            self.bm_exploitability,
+        )
+
+    def _consider_new_benchmarks(self, round_num: int) -> dict:
+        """
+        Per-replica Evaluator.consider_new_benchmark.
+
+        Returns:
+            {replica_index: new_benchmark_dict} for replicas that introduced one
+        """
+        cooldown = self.config.benchmark_introduction_cooldown
+        eligible = (
+            (self.n_benchmarks < self.config.max_benchmarks)
+            & (self.n_benchmarks < self.max_slots)
+            & (round_num - self.last_introduction_round >= cooldown)
+        )
+        introduced = {}
+        for r in np.flatnonzero(eligible):
+            nb = self.n_benchmarks[r]
+            trigger = None
+            for k in range(nb):
+                if self.bm_validity[r, k] < 0.4:
+                    trigger = f"validity_decay:{self.bm_names[r][k]}={self.bm_validity[r, k]:.2f}"
+                    break
+            if trigger is None and round_num > 0 and round_num % cooldown == 0:
+                trigger = f"periodic_introduction:round_{round_num}"
+            if trigger is None:
+                continue
+
+            mean_weight = self.bm_weight[r, :nb].tolist()
+            mean_weight = sum(mean_weight) / len(mean_weight)
+            seq_idx = self.sequence_index[r]
+            if seq_idx < len(self.benchmark_sequence):
+                bm_config = self.benchmark_sequence[seq_idx]
+                name = bm_config.get("name", f"benchmark_r{round_num}")
+                validity = bm_config.get("validity", 0.85)
+                exploitability = bm_config.get("exploitability", 0.15)
+                noise_level = bm_config.get("noise_level", 0.08)
+                weight = bm_config["weight"] if "weight" in bm_config else mean_weight
+                self.sequence_index[r] += 1
+            else:
+                name = f"benchmark_r{round_num}"
+                validity, exploitability, noise_level = 0.85, 0.15, 0.08
+                weight = mean_weight
+
+            self.bm_validity[r, nb] = validity
+            self.bm_exploitability[r, nb] = exploitability
+            self.bm_noise[r, nb] = noise_level
+            self.bm_decay_rate[r, nb] = self.bm_decay_rate[r, 0]
+            self.bm_growth_rate[r, nb] = self.bm_growth_rate[r, 0]
+            self.bm_weight[r, nb] = weight
+            self.bm_names[r].append(name)
+            self.n_benchmarks[r] = nb + 1
+            self.last_introduction_round[r] = round_num
+
+            if self.consumers_enabled:
+                self._resolve_segment_weights(r)
+
+            introduced[int(r)] = {
+                "name": name,
+                "validity": validity,
+                "exploitability": exploitability,
+                "trigger": trigger,
+            }
+        return introduced
+
+    def _observe_and_reflect(self, composite: np.ndarray):
+        """Providers observe published scores and update beliefs (heuristic reflect)."""
+        learning_rate = 0.3
+        self.believed_capability = (
+            (1 - learning_rate) * self.believed_capability + learning_rate * composite
+        )
+        self._recent_scores.append(composite)
+        if len(self._recent_scores) > 3:
+            self._recent_scores.pop(0)
+
+    def _run_consumer_round(self, composite: np.ndarray, per_benchmark: np.ndarray,
+                            scored: np.ndarray) -> dict:
+        """
+        Vectorized ConsumerMarket observe_per_benchmark / compute_satisfaction /
+        compute_switching / get_consumer_data.
+
+        Args:
+            composite: Published composite scores (R, P)
+            per_benchmark: Per-benchmark scores (R, P, K)
+            scored: (R, K) mask of benchmarks that produced scores this round
+
+        Returns:
+            Dict of consumer arrays for the round record
+        """
+        R, S, P = self.shares.shape
+
+        # --- Observe (per-benchmark, use-case weighted) ---
+        weighted_score = np.zeros((R, S, P))
+        total_weight = np.zeros((R, S, 1))
+        for k in range(self.max_slots):
+            on = scored[:, k][:, None, None]
+            weight = self.seg_bm_weights[:, :, k][:, :, None]
+            weighted_score = np.where(
+                on, weighted_score + weight * per_benchmark[:, None, :, k], weighted_score
+            )
+            total_weight = np.where(on, total_weight + weight, total_weight)
+        perceived = np.where(
+            total_weight > 0,
+            weighted_score / np.where(total_weight > 0, total_weight, 1.0),
+            composite[:, None, :],
+        )
+        learning_rate = 0.3
+        if self._consumers_observed:
+            self.believed_quality = (
+                (1 - learning_rate) * self.believed_quality + learning_rate * perceived
+            )
+        else:
+            self.believed_quality = perceived
+            self._consumers_observed = True
+
+        # --- Satisfaction ---
+        gaming_penalty = 0.20 * np.maximum(0, composite - self.true_capability)
+        safety_bonus = (0.12 * self.strategies[..., 3])[:, None, :] * self.seg_safety_pref[None, :, None]
+        satisfaction = self.believed_quality - gaming_penalty[:, None, :] + safety_bonus
+        self.satisfaction = np.clip(satisfaction, 0.0, 1.0)
+
+        # --- Switching (providers processed in order, as shares move) ---
+        trust = self.seg_trust[None, :]
+        blended = (
+            trust[:, :, None] * self.believed_quality
+            + (1 - trust)[:, :, None] * self.satisfaction
+        )
+        shares = self.shares.copy()
+        tenure = self.tenure.copy()
+        seg_switching = np.zeros((R, S))
+        cost = self.seg_switching_cost[None, :]
+        threshold_base = self.seg_switching_threshold[None, :]
+        rows = np.arange(R)[:, None]
+        cols = np.arange(S)[None, :]
+
+        for p in range(P):
+            share = shares[:, :, p]
+            tenure_bonus = np.minimum(0.1, tenure[:, :, p] * 0.02)
+
+            gap = self.believed_quality[:, :, p] - self.satisfaction[:, :, p]
+            threshold = threshold_base + tenure_bonus + cost
+            prob = np.where(gap > 0, _switching_probability(gap, threshold), 0.0)
+
+            current_blended = blended[:, :, p]
+            opportunity_threshold = cost + tenure_bonus
+            best_alt = np.full((R, S), -1)
+            best_alt_score = np.full((R, S), -1.0)
+            for alt in range(P):
+                if alt == p:
+                    continue
+                alt_blended = blended[:, :, alt]
+                improvement = alt_blended - current_blended
+                better = improvement > 0
+                opp_prob = _switching_probability(improvement, opportunity_threshold)
+                prob = np.where(better & (opp_prob > prob), opp_prob, prob)
+                new_best = better & (alt_blended > best_alt_score)
+                best_alt_score = np.where(new_best, alt_blended, best_alt_score)
+                best_alt = np.where(new_best, alt, best_alt)
+
+            switch = (share >= 0.001) & (prob > 0.01) & (best_alt >= 0)
+            fraction = np.where(switch, np.minimum(prob * share, share), 0.0)
+            shares[:, :, p] = np.where(switch, share - fraction, share)
+            target = np.where(switch, best_alt, 0)
+            received = shares[rows, cols, target]
+            shares[rows, cols, target] = np.where(switch, received + fraction, received)
+            seg_switching = np.where(switch, seg_switching + fraction, seg_switching)
+            tenure[:, :, p] = np.where(switch, np.maximum(0, tenure[:, :, p] - 1), tenure[:, :, p])
+
+        tenure = np.where(shares > 0.01, tenure + 1, tenure)
+        total_share = shares[:, :, 0]
+        for p in range(1, P):
+            total_share = total_share + shares[:, :, p]
+        shares = np.where(
+            total_share[:, :, None] > 0,
+            shares / np.where(total_share > 0, total_share, 1.0)[:, :, None],
+            shares,
+        )
+        self.shares = shares
+        self.tenure = tenure
+
+        # --- Aggregates (same accumulation order as get_consumer_data) ---
+        market_shares = np.zeros((R, P))
+        switching_rate = np.zeros(R)
+        weighted_sat = np.zeros((R, P))
+        sat_weight = np.zeros((R, P))
+        for s in range(S):
+            fraction = self.seg_market_fraction[s]
+            market_shares = market_shares + shares[:, s, :] * fraction
+            switching_rate = switching_rate + seg_switching[:, s] * fraction
+            weight = shares[:, s, :] * fraction
+            has_weight = weight > 0
+            weighted_sat = np.where(
+                has_weight, weighted_sat + self.satisfaction[:, s, :] * weight, weighted_sat
+            )
+            sat_weight = np.where(has_weight, sat_weight + weight, sat_weight)
+        provider_satisfaction = np.where(
+            sat_weight > 0, weighted_sat / np.where(sat_weight > 0, sat_weight, 1.0), 0.0
+        )
+
+        total_market = np.zeros(R)
+        avg_satisfaction = np.zeros(R)
+        for p in range(P):
+            total_market = total_market + market_shares[:, p]
+            avg_satisfaction = avg_satisfaction + provider_satisfaction[:, p] * market_shares[:, p]
+        avg_satisfaction = np.where(
+            total_market > 0,
+            avg_satisfaction / np.where(total_market > 0, total_market, 1.0),
+            0.0,
+        )
+
+        return {
+            "shares": shares.copy(),
+            "satisfaction": self.satisfaction.copy(),
+            "segment_switching": seg_switching,
+            "market_shares": market_shares,
+            "provider_satisfaction": provider_satisfaction,
+            "avg_satisfaction": avg_satisfaction,
+            "switching_rate": switching_rate,
+        }
+
+    # =========================================================================
+    # Main Loop
+    # =========================================================================
+
+    def run_round(self) -> dict:
+        """
+        Advance every replica by one round (same phase order as
+        EvalEcosystemSimulation.run_round).
+
+        Returns:
+            The array record for this round
+        """
+        round_num = self.current_round
+
+        # 1. Providers plan and execute
+        if round_num > 0:
+            self._plan_providers()
+            self._execute_providers()
+
+        # 2. Evaluate, then Goodhart feedback and benchmark introduction
+        n_scored = self.n_benchmarks.copy()
+        composite, per_benchmark = self._evaluate()
+        self._update_benchmarks()
+        new_benchmarks = self._consider_new_benchmarks(round_num)
+
+        # 3-4. Publish, observe, reflect
+        self._observe_and_reflect(composite)
+
+        record = {
+            "round": round_num,
+            "scores": composite,
+            "true_capabilities": self.true_capability.copy(),
+            "believed_capabilities": self.believed_capability.copy(),
+            "strategies": self.strategies.copy(),
+            "per_benchmark_scores": per_benchmark,
+            "n_scored": n_scored,
+            "n_benchmarks": self.n_benchmarks.copy(),
+            "validity": self.bm_validity.copy(),
+            "exploitability": self.bm_exploitability.copy(),
+            "new_benchmarks": new_benchmarks,
+        }
+
+        # 6. Consumer market
+        if self.consumers_enabled:
+            scored = np.arange(self.max_slots)[None, :] < n_scored[:, None]
+            record["consumer"] = self._run_consumer_round(composite, per_benchmark, scored)
+
+        self.records.append(record)
+        self.current_round += 1
+        return record
+
+    def run(self, n_rounds: Optional[int] = None) -> "BatchedSimulation":
+        """Run all replicas for n_rounds (default: config.n_rounds)."""
+        n_rounds = n_rounds if n_rounds is not None else self.config.n_rounds
+        for _ in range(n_rounds):
+            self.run_round()
+        return self
+
+    # =========================================================================
+    # Output
+    # =========================================================================
+
+    def get_arrays(self) -> dict:
+        """
+        Stack per-round records into replica x round arrays.
+
+        Returns:
+            Dict of arrays: scores, true_capabilities, believed_capabilities
+            (R, T, P); strategies (R, T, P, 4); and, with consumers enabled,
+            market_shares (R, T, P), avg_satisfaction and switching_rate (R, T)
+        """
+        if not self.records:
+            return {}
+        arrays = {
+            "rounds": np.array([rec["round"] for rec in self.records]),
+            "scores": np.stack([rec["scores"] for rec in self.records], axis=1),
+            "true_capabilities": np.stack([rec["true_capabilities"] for rec in self.records], axis=1),
+            "believed_capabilities": np.stack(
+                [rec["believed_capabilities"] for rec in self.records], axis=1
+            ),
+            "strategies": np.stack([rec["strategies"] for rec in self.records], axis=1),
+        }
+        if self.consumers_enabled:
+            for key in ["market_shares", "provider_satisfaction", "avg_satisfaction", "switching_rate"]:
+                arrays[key] = np.stack([rec["consumer"][key] for rec in self.records], axis=1)
+        return arrays
+
+    def get_history(self, replica: int) -> list[dict]:
+        """
+        Build replica's history in EvalEcosystemSimulation.history format.
+
+        Args:
+            replica: Replica index (0 <= replica < n_replicas)
+
+        Returns:
+            List of round_data dicts (rounded with r4), usable by plotting.py
+        """
+        names = self.provider_names
+        history = []
+        for rec in self.records:
+            round_data = {
+                "round": rec["round"],
+                "scores": dict(zip(names, rec["scores"][replica].tolist())),
+                "true_capabilities": dict(zip(names, rec["true_capabilities"][replica].tolist())),
+                "believed_capabilities": dict(
+                    zip(names, rec["believed_capabilities"][replica].tolist())
+                ),
+                "strategies": {
+                    name: dict(zip(INVESTMENT_TYPES, rec["strategies"][replica, i].tolist()))
+                    for i, name in enumerate(names)
+                },
+            }
+
+            n_benchmarks = rec["n_benchmarks"][replica]
+            bm_names = self.bm_names[replica][:n_benchmarks]
+            round_data["benchmark_params"] = {
+                bm_name: {
+                    "validity": float(rec["validity"][replica, k]),
+                    "exploitability": float(rec["exploitability"][replica, k]),
+                }
+                for k, bm_name in enumerate(bm_names)
+            }
+            if n_benchmarks > 1:
+                round_data["per_benchmark_scores"] = {
+                    bm_name: dict(zip(names, rec["per_benchmark_scores"][replica, :, k].tolist()))
+                    for k, bm_name in enumerate(bm_names[:rec["n_scored"][replica]])
+                }
+            if replica in rec["new_benchmarks"]:
+                round_data["new_benchmark"] = dict(rec["new_benchmarks"][replica])
+
+            if "consumer" in rec:
+                round_data["consumer_data"] = self._consumer_data(rec["consumer"], replica)
+
+            history.append(r4(round_data))
+        return history
+
+    def get_histories(self) -> list[list[dict]]:
+        """Histories for every replica (see get_history)."""
+        return [self.get_history(r) for r in range(self.n_replicas)]
+
+    def _consumer_data(self, consumer: dict, replica: int) -> dict:
+        """Build a ConsumerMarket.get_consumer_data()-style dict for one replica."""
+        names = self.provider_names
+        segment_data = {}
+        for s, seg in enumerate(self.segments):
+            segment_data[seg.name] = {
+                "archetype": seg.archetype,
+                "use_case": seg.use_case,
+                "market_fraction": seg.market_fraction,
+                "provider_shares": dict(zip(names, consumer["shares"][replica, s].tolist())),
+                "satisfaction": dict(zip(names, consumer["satisfaction"][replica, s].tolist())),
+                "switching_rate": float(consumer["segment_switching"][replica, s]),
+            }
+        return {
+            "market_shares": dict(zip(names, consumer["market_shares"][replica].tolist())),
+            "provider_satisfaction": dict(
+                zip(names, consumer["provider_satisfaction"][replica].tolist())
+            ),
+            "avg_satisfaction": float(consumer["avg_satisfaction"][replica]),
+            "switching_rate": float(consumer["switching_rate"][replica]),
+            "segment_data": segment_data,
+        }
+
+
+def run_monte_carlo(
+    config: SimulationConfig,
+    provider_configs: list[dict],
+    n_replicas: int,
+    seeds: Optional[list[int]] = None,
+) -> BatchedSimulation:
+    """
+    Convenience wrapper: build a BatchedSimulation and run config.n_rounds.
+
+    Args:
+        config: Shared simulation config (heuristic mode)
+        provider_configs: Provider configs
+        n_replicas: Number of replicas (ignored if seeds is given)
+        seeds: Optional explicit per-replica seeds
+
+    Returns:
+        The finished BatchedSimulation
+    """
+    batch = BatchedSimulation(config, provider_configs, n_replicas=n_replicas, seeds=seeds)
+    return batch.run()
+
+
+if __name__ == "__main__":
+    import time
+    from simulation import get_default_provider_configs
+
+    config = SimulationConfig(n_rounds=50, enable_consumers=True, verbose=False)
+    start = time.time()
+    batch = run_monte_carlo(config, get_default_provider_configs(), n_replicas=1000)
+    elapsed = time.time() - start
+
+    arrays = batch.get_arrays()
+    final_caps = arrays["true_capabilities"][:, -1, :]
+    print(f"{batch.n_replicas} replicas x {config.n_rounds} rounds in {elapsed:.1f}s")
+    for i, name in enumerate(batch.provider_names):
+        print(f"  {name}: final true capability "
+              f"{final_caps[:, i].mean():.3f} +/- {final_caps[:, i].std():.3f}")
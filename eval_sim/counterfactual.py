@@ -0,0 +1,123 @@
+"""
+Counterfactual Branch Runner for Evaluation Ecosystem Simulation
+
+Runs several continuations of one live simulation in parallel processes,
+so intervention studies (e.g. a regulation at round 10 vs. none) only pay
+for the divergent suffix instead of re-simulating the shared prefix.
+
+- Each branch starts from EvalEcosystemSimulation.fork() of the parent at
+  its current round, including RNG state (common random numbers).
+- A branch is either a dict of SimulationConfig overrides or a callable
+  that modifies the child simulation in place before it runs.
+- On platforms with the "fork" start method, workers inherit the parent
+  simulation copy-on-write instead of receiving a pickled copy; only the
+  new rounds are sent back, and the parent's prefix rounds are shared.
+
+Usage:
+    sim = EvalEcosystemSimulation(config)
+    sim.setup(get_default_provider_configs())
+    sim.run(10)
+
+    def faster_decay(child):
+        for bm in child.evaluator.benchmarks:
+            bm.validity_decay_rate *= 2
+
+    histories = run_branches(sim, {
+        "baseline": {},
+        "faster_decay": faster_decay,
+        "fast_rnd": {"rnd_efficiency": 0.02},
+    })
+    # histories[name] == full 0..n_rounds history for that branch
+"""
+import multiprocessing
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+
+# Parent simulation and branch specs, set in each worker by _init_worker
+_PARENT = None
+_BRANCHES: dict = {}
+
+
+def _init_worker(parent, branches: dict):
+    """Hold the parent for forking."""
+    global _PARENT, _BRANCHES
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    _PARENT = parent
+    _BRANCHES = branches
+
+
+def run_branch(parent, name: str, branch, n_rounds: int) -> list[dict]:
+    """
+    Fork parent, apply one branch and run it.
+
+    Args:
+        parent: Simulation to branch from (left untouched)
+        name: Branch name (used in the child's spill/checkpoint paths)
+        branch: Dict of SimulationConfig overrides, or callable(child)
+        n_rounds: Rounds to run after the fork
+
+    Returns:
+        The rounds produced after the fork point
+    """
+    overrides = branch if isinstance(branch, dict) else None
+    child = parent.fork(1, config_overrides=overrides, names=[name])[0]
+    if callable(branch):
+        branch(child)
+    start = len(child.history)
+    child.run(n_rounds)
+    return child.history[start:]
+
+
+def _run_in_worker(name: str, n_rounds: int) -> list[dict]:
+    return run_branch(_PARENT, name, _BRANCHES[name], n_rounds)
+
+
+def run_branches(
+    sim,
+    branches: dict,
+    n_rounds: Optional[int] = None,
+    max_workers: Optional[int] = None,
+) -> dict[str, list[dict]]:
+    """
+    Continue sim under each branch, one process per branch (up to max_workers).
+
+    Args:
+        sim: Live EvalEcosystemSimulation to branch from; it is not advanced
+        branches: {name: config override dict or callable(child)}. Names are
+            used in the children's spill/checkpoint paths. Callables must be
+            picklable (module-level) where "fork" is unavailable.
+        n_rounds: Rounds to run per branch (default: up to config.n_rounds)
+        max_workers: Pool size (default: min(len(branches), os.cpu_count()));
+            1 runs the branches serially in this process
+
+    Returns:
+        {name: history}, where history is sim's prefix (shared round dicts)
+        followed by that branch's new rounds
+    """
+    if n_rounds is None:
+        n_rounds = max(0, sim.config.n_rounds - sim.current_round)
+    max_workers = max_workers or min(len(branches), os.cpu_count() or 1)
+
+    suffixes = {}
+    if max_workers <= 1 or len(branches) <= 1:
+        for name, branch in branches.items():
+            suffixes[name] = run_branch(sim, name, branch, n_rounds)
+    else:
+        methods = multiprocessing.get_all_start_methods()
+        context = multiprocessing.get_context("fork" if "fork" in methods else None)
+        with ProcessPoolExecutor(
+            max_workers=max_workers,
+            mp_context=context,
+            initializer=_init_worker,
+            initargs=(sim, branches),
+        ) as pool:
+            futures = {
+                name: pool.submit(_run_in_worker, name, n_rounds)
+                for name in branches
+            }
+            suffixes = {name: future.result() for name, future in futures.items()}
+
+    return {name: list(sim.history) + suffix for name, suffix in suffixes.items()}
@@ -7,6 +7,9 @@ Provides systematic logging of experiments with hybrid naming scheme:
 Each experiment gets its own folder with:
     - config.json: Full configuration (reproducible)
     - history.json: Round-by-round data
+    - history_*.npy + history_schema.json + traces.jsonl: The same data,
+      columnar, with the actor reasoning traces split out (see
+      history_store.py; opt-in with history_format="columnar" or "both")
     - summary.json: Final metrics
     - metadata.json: Description, tags, timestamp, etc.
     - plots/: Generated visualizations
@@ -20,6 +23,8 @@ from dataclasses import dataclass, field, asdict
 from datetime import datetime
 from typing import Optional
 
+from history_store import ColumnarHistory, has_columnar_history
+
 
 @dataclass
 class ExperimentMetadata:
@@ -75,16 +80,30 @@ class ExperimentLogger:
         logger.finalize()
     """
 
-    def __init__(self, base_dir: str = "./experiments", use_heuristic_subdir: bool = False):
+    def __init__(
+        self,
+        base_dir: str = "./experiments",
+        use_heuristic_subdir: bool = False,
+        history_format: str = "json",
+    ):
         """
         Initialize ExperimentLogger.
 
         Args:
             base_dir: Base experiments directory
             use_heuristic_subdir: If True, uses experiments/heuristic/ with separate numbering
+            history_format: "json" (history.json only), "columnar" (npy
+                arrays + traces.jsonl) / "parquet" (needs pyarrow) instead
+                of history.json, or "both" (history.json and the npy arrays)
         """
+        if history_format not in ("columnar", "parquet", "json", "both"):
+            raise ValueError(
+                f"Unknown history_format: {history_format}. "
+                "Use 'columnar', 'parquet', 'json' or 'both'."
+            )
         self.base_experiments_dir = base_dir
         self.use_heuristic_subdir = use_heuristic_subdir
+        self.history_format = history_format
 
         # Set paths based on whether using heuristic subdir
         if use_heuristic_subdir:
@@ -98,6 +117,7 @@ class ExperimentLogger:
 
         self.current_experiment: Optional[str] = None
         self.current_metadata: Optional[ExperimentMetadata] = None
+        self._perf_rounds: list = []  # round_data["perf"] blocks, for finalize()
 
         # Ensure base directory exists
         os.makedirs(self.base_dir, exist_ok=True)
@@ -173,6 +193,7 @@ class ExperimentLogger:
             llm_mode=llm_mode,
         )
         self.current_experiment = experiment_id
+        self._perf_rounds = []
 
         # Save metadata
         self._save_metadata()
@@ -190,6 +211,36 @@ class ExperimentLogger:
         print(f"Created experiment: {experiment_id}")
         return experiment_id
 
+    def open_experiment(self, experiment_id: str) -> str:
+        """
+        Re-open an existing experiment, e.g. to resume an interrupted run.
+
+        Subsequent log_* calls write into the existing experiment folder.
+
+        Args:
+            experiment_id: ID of an experiment in this logger's base_dir
+
+        Returns:
+            The experiment ID
+        """
+        exp_dir = os.path.join(self.base_dir, experiment_id)
+        if not os.path.exists(exp_dir):
+            raise ValueError(f"Experiment not found: {experiment_id}")
+
+        metadata_path = os.path.join(exp_dir, "metadata.json")
+        if os.path.exists(metadata_path):
+            with open(metadata_path, "r") as f:
+                self.current_metadata = ExperimentMetadata(**json.load(f))
+        else:
+            self.current_metadata = ExperimentMetadata(
+                experiment_id=experiment_id, name=experiment_id
+            )
+        self.current_experiment = experiment_id
+        self._perf_rounds = []
+
+        print(f"Opened experiment: {experiment_id}")
+        return experiment_id
+
     def get_experiment_dir(self) -> str:
         """Get current experiment directory."""
         if not self.current_experiment:
@@ -209,10 +260,28 @@ class ExperimentLogger:
             json.dump(config, f, indent=2)
 
     def log_history(self, history: list):
-        """Log simulation history (round-by-round data)."""
+        """Log simulation history (round-by-round data).
+
+        With history_format "columnar" or "parquet" (no history.json), the
+        rounds.jsonl crash journal is removed once the columnar history has
+        been read back and matches, since it duplicates the same data.
+        """
         exp_dir = self.get_experiment_dir()
-        with open(os.path.join(exp_dir, "history.json"), "w") as f:
-            json.dump(history, f, indent=2)
+        perf_rounds = [h["perf"] for h in history if "perf" in h]
+        if perf_rounds:
+            self._perf_rounds = perf_rounds
+        if self.history_format in ("json", "both"):
+            with open(os.path.join(exp_dir, "history.json"), "w") as f:
+                json.dump(history, f, indent=2)
+        if self.history_format != "json":
+            fmt = "parquet" if self.history_format == "parquet" else "npy"
+            ColumnarHistory.from_history(history).save(exp_dir, format=fmt)
+        if self.history_format in ("columnar", "parquet"):
+            rounds_path = os.path.join(exp_dir, "rounds.jsonl")
+            if (os.path.exists(rounds_path)
+                    and ColumnarHistory.load(exp_dir, mmap=False).to_history()
+                    == json.loads(json.dumps(history))):
+                os.remove(rounds_path)
 
     def log_round(self, round_data: dict):
         """Append a single round's data to rounds.jsonl (incremental logging).
@@ -223,6 +292,20 @@ class ExperimentLogger:
         exp_dir = self.get_experiment_dir()
         with open(os.path.join(exp_dir, "rounds.jsonl"), "a") as f:
             f.write(json.dumps(round_data) + "\n")
+        if "perf" in round_data:
+            self._perf_rounds.append(round_data["perf"])
+
+    def rewind_rounds(self, history: list):
+        """Rewrite rounds.jsonl to hold exactly `history`.
+
+        Used when resuming from a checkpoint: rounds logged after the
+        checkpoint was taken are dropped, since they will be run again.
+        """
+        exp_dir = self.get_experiment_dir()
+        with open(os.path.join(exp_dir, "rounds.jsonl"), "w") as f:
+            for round_data in history:
+                f.write(json.dumps(round_data) + "\n")
+        self._perf_rounds = [h["perf"] for h in history if "perf" in h]
 
     def log_summary(self, summary: dict):
         """Log experiment summary/final metrics."""
@@ -315,12 +398,29 @@ class ExperimentLogger:
                 self.current_metadata.notes = note
             self._save_metadata()
 
+    def log_perf_report(self) -> Optional[dict]:
+        """
+        Aggregate the profiled rounds seen so far into perf_report.json.
+
+        Only runs profiled with SimulationConfig(profile=True) carry perf
+        blocks; returns None (and writes nothing) otherwise.
+        """
+        if not self._perf_rounds:
+            return None
+        report = aggregate_perf(self._perf_rounds)
+        with open(os.path.join(self.get_experiment_dir(), "perf_report.json"), "w") as f:
+            json.dump(report, f, indent=2)
+        return report
+
     def finalize(self):
         """Finalize the experiment (update metadata with completion time)."""
         if self.current_metadata:
+            report = self.log_perf_report()
             self.add_note(f"Completed at: {datetime.now().isoformat()}")
             print(f"Experiment finalized: {self.current_experiment}")
             print(f"  Location: {self.get_experiment_dir()}")
+            if report:
+                print_perf_report(report)
 
     # --- Query/List Methods ---
 
@@ -345,12 +445,19 @@ class ExperimentLogger:
 
         return experiments
 
-    def load_experiment(self, experiment_id: str) -> dict:
+    def load_experiment(self, experiment_id: str, history_dicts: bool = True) -> dict:
         """
         Load all data from an experiment.
 
+        Args:
+            experiment_id: Experiment to load
+            history_dicts: Rebuild "history" as round_data dicts from the
+                columnar store. Set False to only get the array views.
+
         Returns:
-            Dict with keys: metadata, config, history, summary
+            Dict with keys: metadata, config, history, summary, and
+            history_columns (ColumnarHistory, memory-mapped) when the
+            experiment was logged in a columnar format
         """
         exp_dir = os.path.join(self.base_dir, experiment_id)
 
@@ -366,6 +473,12 @@ class ExperimentLogger:
                     key = filename.replace(".json", "")
                     data[key] = json.load(f)
 
+        if has_columnar_history(exp_dir):
+            columns = ColumnarHistory.load(exp_dir, mmap=True)
+            data["history_columns"] = columns
+            if history_dicts and "history" not in data:
+                data["history"] = columns.to_history()
+
         return data
 
     def get_latest_experiment(self) -> Optional[str]:
@@ -545,6 +658,85 @@ def generate_summary(
     return summary
 
 
+def aggregate_perf(perf_rounds: list) -> dict:
+    """
+    Aggregate per-round perf blocks into a run-level profiling report.
+
+    Args:
+        perf_rounds: round_data["perf"] dicts ({"total_s", "phases", "llm"})
+
+    Returns:
+        Dict with wall-time totals, per-phase totals/means/maxima and share of
+        the run, and per-actor LLM usage (calls, retries, failures, tokens,
+        latency, cache hit rate) plus an "all" row summed over actors
+    """
+    n_rounds = len(perf_rounds)
+    round_times = [p.get("total_s", 0.0) for p in perf_rounds]
+    total_s = sum(round_times)
+
+    phase_times: dict[str, list] = {}
+    for perf in perf_rounds:
+        for phase, seconds in perf.get("phases", {}).items():
+            phase_times.setdefault(phase, []).append(seconds)
+    phases = {
+        phase: {
+            "total_s": round(sum(times), 6),
+            "mean_s": round(sum(times) / n_rounds, 6),
+            "max_s": round(max(times), 6),
+            "share": round(sum(times) / total_s, 4) if total_s > 0 else 0.0,
+        }
+        for phase, times in phase_times.items()
+    }
+
+    llm: dict[str, dict] = {}
+    totals: dict = {}
+    for perf in perf_rounds:
+        for actor, usage in perf.get("llm", {}).items():
+            for entry in (llm.setdefault(actor, {}), totals):
+                for name, value in usage.items():
+                    if name == "max_latency_s":
+                        entry[name] = max(entry.get(name, 0.0), value)
+                    else:
+                        entry[name] = entry.get(name, 0) + value
+    if llm:
+        llm["all"] = totals
+    for entry in llm.values():
+        calls = entry.get("calls", 0)
+        lookups = entry.get("cache_hits", 0) + entry.get("cache_misses", 0)
+        entry["latency_s"] = round(entry.get("latency_s", 0.0), 6)
+        entry["mean_latency_s"] = round(entry["latency_s"] / calls, 6) if calls else 0.0
+        entry["cache_hit_rate"] = round(entry.get("cache_hits", 0) / lookups, 4) if lookups else None
+
+    return {
+        "n_rounds": n_rounds,
+        "total_s": round(total_s, 6),
+        "mean_round_s": round(total_s / n_rounds, 6) if n_rounds else 0.0,
+        "max_round_s": round(max(round_times), 6) if round_times else 0.0,
+        "phases": phases,
+        "llm": llm,
+    }
+
+
+def print_perf_report(report: dict):
+    """Print a compact table of an aggregate_perf() report."""
+    print(f"\nPerformance ({report['n_rounds']} rounds, {report['total_s']:.2f}s total, "
+          f"{report['mean_round_s']:.3f}s/round):")
+    phases = sorted(report["phases"].items(), key=lambda kv: -kv[1]["total_s"])
+    for phase, stats in phases:
+        print(f"  {phase:<20} {stats['total_s']:>9.3f}s  {stats['share']:>6.1%}  "
+              f"(max {stats['max_s']:.3f}s)")
+    if report["llm"]:
+        print("  LLM usage:")
+        for actor, usage in report["llm"].items():
+            hit_rate = usage["cache_hit_rate"]
+            hits = f"{hit_rate:.0%}" if hit_rate is not None else "-"
+            print(f"    {actor:<28} calls={usage.get('calls', 0):<5} "
+                  f"retries={usage.get('retries', 0):<4} failures={usage.get('failures', 0):<3} "
+                  f"tokens={usage.get('prompt_tokens', 0)}+{usage.get('completion_tokens', 0)} "
+                  f"(est. prompt {usage.get('prompt_tokens_est', 0)}, trimmed {usage.get('prompt_trims', 0)}x) "
+                  f"mean={usage['mean_latency_s']:.2f}s cache={hits}")
+
+
 if __name__ == "__main__":
     # Demo
     logger = ExperimentLogger("./experiments")
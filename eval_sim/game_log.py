@@ -11,6 +11,8 @@ Design:
 """
 from typing import Optional
 
+from actors.memory import ActorMemory
+
 
 class GameLogGenerator:
     """
@@ -125,6 +127,11 @@ class GameLogGenerator:
 
         # Check memory for planning entries
         if hasattr(provider, 'memory'):
+            if isinstance(provider.memory, ActorMemory):
+                entry = provider.memory.get("planning", round_num)
+                if entry and entry.get("reasoning"):
+                    return entry.get("reasoning")
+                return None
             for entry in reversed(provider.memory):
                 if (entry.get("type") == "planning" and
                     entry.get("round") == round_num and
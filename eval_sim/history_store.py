@@ -0,0 +1,416 @@
+"""
+Columnar History Storage for Evaluation Ecosystem Simulation
+
+Flattens the list of nested round_data dicts into typed columns, one per
+leaf path (e.g. ("scores", "OpenAI"), ("per_benchmark_scores", "coding_bench",
+"OpenAI"), ("consumer_data", "market_shares", "Anthropic")).
+
+On disk (inside an experiment directory):
+    - history_values.npy: (n_rounds, n_columns) float64, NaN where absent
+    - history_present.npy: (n_rounds, n_columns) bool presence mask
+    - history_schema.json: column paths, dtypes, dict key order
+    - history_extras.jsonl: per-round non-numeric leaves (headlines, lists, ...)
+    - traces.jsonl: per-round actor_traces (reasoning text), stored separately
+
+The .npy files can be memory-mapped, so loaders and plotting get zero-copy
+views: column() returns values[:, j] and block() returns a contiguous
+values[:, a:b] slice (e.g. an (n_rounds, n_providers) score matrix).
+
+Parquet (history.parquet) is available as an alternative when pyarrow is
+installed.
+
+Usage:
+    columns = ColumnarHistory.from_history(sim.history)
+    columns.save(exp_dir)
+
+    columns = ColumnarHistory.load(exp_dir, mmap=True)
+    providers, scores = columns.block("scores")   # (R, P) view
+    history = columns.to_history()                # round_data dicts again
+"""
+import json
+import os
+from typing import Optional
+
+import numpy as np
+
+
+VALUES_FILE = "history_values.npy"
+PRESENT_FILE = "history_present.npy"
+PARQUET_FILE = "history.parquet"
+SCHEMA_FILE = "history_schema.json"
+EXTRAS_FILE = "history_extras.jsonl"
+TRACES_FILE = "traces.jsonl"
+
+# Keys kept out of the columns and written to traces.jsonl instead
+TRACE_KEYS = ("actor_traces",)
+
+_MISSING = object()
+
+
+def has_columnar_history(exp_dir: str) -> bool:
+    """Check whether an experiment directory contains a columnar history."""
+    return os.path.exists(os.path.join(exp_dir, SCHEMA_FILE))
+
+
+# =============================================================================
+# Flattening
+# =============================================================================
+
+def _numeric_kind(value) -> Optional[str]:
+    """Column dtype code for a leaf value, or None if it is not numeric."""
+    if isinstance(value, bool):
+        return "b"
+    if isinstance(value, int):
+        return "i"
+    if isinstance(value, float):
+        return "f"
+    return None
+
+
+def _merge_kind(old: Optional[str], new: str) -> str:
+    if old is None or old == new:
+        return new
+    return "f"
+
+
+class _Flattener:
+    """Walks round dicts once, collecting columns, key order and extras."""
+
+    def __init__(self):
+        self.col_index: dict[tuple, int] = {}
+        self.col_paths: list[tuple] = []
+        self.kinds: list[str] = []
+        self.key_order: dict[tuple, list] = {(): []}
+        self._key_sets: dict[tuple, set] = {(): set()}
+        self.rows: list[dict] = []
+        self.extras: list[dict] = []
+
+    def _note_key(self, path: tuple, key: str, prev_key):
+        """Record a key, placing late arrivals right after their predecessor."""
+        if key not in self._key_sets[path]:
+            self._key_sets[path].add(key)
+            order = self.key_order[path]
+            if prev_key is _MISSING:
+                order.insert(0, key)
+            else:
+                order.insert(order.index(prev_key) + 1, key)
+
+    def _walk(self, d: dict, path: tuple, row: dict) -> dict:
+        extras = {}
+        prev_key = _MISSING
+        for key, value in d.items():
+            self._note_key(path, key, prev_key)
+            prev_key = key
+            child = path + (key,)
+            if isinstance(value, dict):
+                if child not in self.key_order:
+                    self.key_order[child] = []
+                    self._key_sets[child] = set()
+                sub_extras = self._walk(value, child, row)
+                if sub_extras or not value:
+                    extras[key] = sub_extras
+                continue
+
+            kind = _numeric_kind(value)
+            if kind is None:
+                extras[key] = value
+                continue
+
+            j = self.col_index.get(child)
+            if j is None:
+                j = len(self.col_paths)
+                self.col_index[child] = j
+                self.col_paths.append(child)
+                self.kinds.append(kind)
+            else:
+                self.kinds[j] = _merge_kind(self.kinds[j], kind)
+            row[j] = value
+        return extras
+
+    def add_round(self, round_data: dict) -> dict:
+        """Flatten one round; returns the separated trace entries."""
+        traces = {k: round_data[k] for k in TRACE_KEYS if k in round_data}
+        body = {k: v for k, v in round_data.items() if k not in TRACE_KEYS}
+        row = {}
+        self.extras.append(self._walk(body, (), row))
+        self.rows.append(row)
+        return traces
+
+
+# =============================================================================
+# Columnar History
+# =============================================================================
+
+class ColumnarHistory:
+    """
+    Column-oriented view of a simulation history.
+
+    Columns are grouped by parent path, so all leaves of one dict
+    (e.g. every provider under "scores") are adjacent and block() can
+    return them as a single zero-copy slice.
+    """
+
+    def __init__(
+        self,
+        values: np.ndarray,
+        present: np.ndarray,
+        columns: list[tuple],
+        kinds: list[str],
+        key_order: dict[tuple, list],
+        extras: list[dict],
+        traces: list[dict],
+    ):
+        self.values = values
+        self.present = present
+        self.columns = columns
+        self.kinds = kinds
+        self.key_order = key_order
+        self.extras = extras
+        self.traces = traces
+        self._col_index = {path: j for j, path in enumerate(columns)}
+
+    # --- Construction ---
+
+    @classmethod
+    def from_history(cls, history: list) -> "ColumnarHistory":
+        """
+        Flatten a list of round_data dicts.
+
+        Args:
+            history: Simulation history (as in sim.history / history.json)
+
+        Returns:
+            ColumnarHistory holding the same data
+        """
+        flat = _Flattener()
+        traces = [flat.add_round(round_data) for round_data in history]
+
+        # Group columns by parent (first-seen parent order, then first-seen leaf order)
+        parent_rank = {}
+        for path in flat.col_paths:
+            parent_rank.setdefault(path[:-1], len(parent_rank))
+        order = sorted(range(len(flat.col_paths)), key=lambda j: (parent_rank[flat.col_paths[j][:-1]], j))
+        remap = {old: new for new, old in enumerate(order)}
+
+        n_rounds, n_cols = len(history), len(order)
+        values = np.full((n_rounds, n_cols), np.nan, dtype=np.float64)
+        present = np.zeros((n_rounds, n_cols), dtype=bool)
+        for r, row in enumerate(flat.rows):
+            if row:
+                idx = np.fromiter((remap[j] for j in row), dtype=np.intp, count=len(row))
+                values[r, idx] = np.fromiter(row.values(), dtype=np.float64, count=len(row))
+                present[r, idx] = True
+
+        return cls(
+            values=values,
+            present=present,
+            columns=[flat.col_paths[j] for j in order],
+            kinds=[flat.kinds[j] for j in order],
+            key_order=flat.key_order,
+            extras=flat.extras,
+            traces=traces,
+        )
+
+    # --- Array access ---
+
+    def __len__(self) -> int:
+        return self.values.shape[0]
+
+    @property
+    def rounds(self) -> np.ndarray:
+        """Round numbers as an array view."""
+        return self.column("round")
+
+    def has(self, *path: str) -> bool:
+        """Check whether a leaf column exists."""
+        return tuple(path) in self._col_index
+
+    def column(self, *path: str) -> np.ndarray:
+        """
+        Zero-copy view of one leaf column (NaN in rounds where it is absent).
+
+        Args:
+            *path: Key path, e.g. column("scores", "OpenAI")
+        """
+        j = self._col_index.get(tuple(path))
+        if j is None:
+            raise KeyError(f"No history column: {'/'.join(path)}")
+        return self.values[:, j]
+
+    def keys(self, *parent: str) -> list:
+        """Child keys of a dict path, in original order (e.g. keys("scores"))."""
+        return list(self.key_order.get(tuple(parent), []))
+
+    def block(self, *parent: str) -> tuple[list, np.ndarray]:
+        """
+        All numeric leaves directly under a dict path as one 2-D array.
+
+        Args:
+            *parent: Dict path, e.g. block("scores") or
+                block("per_benchmark_scores", "coding_bench")
+
+        Returns:
+            (keys, array of shape (n_rounds, len(keys))). The array is a
+            view into the stored values (no copy).
+        """
+        parent = tuple(parent)
+        idx = [self._col_index[parent + (k,)] for k in self.key_order.get(parent, [])
+               if parent + (k,) in self._col_index]
+        if not idx:
+            return [], self.values[:, 0:0]
+        lo = min(idx)
+        keys = [self.columns[j][-1] for j in range(lo, lo + len(idx))]
+        return keys, self.values[:, lo:lo + len(idx)]
+
+    def present_mask(self, *path: str) -> np.ndarray:
+        """Presence mask view for one leaf column."""
+        return self.present[:, self._col_index[tuple(path)]]
+
+    # --- Reconstruction ---
+
+    def _build(self, path: tuple, row: list, present: np.ndarray, extras: dict) -> dict:
+        out = {}
+        for key in self.key_order.get(path, []):
+            child = path + (key,)
+            extra = extras.get(key, _MISSING)
+            j = self._col_index.get(child)
+            if j is not None and present[j]:
+                kind = self.kinds[j]
+                value = row[j]
+                out[key] = int(value) if kind == "i" else bool(value) if kind == "b" else value
+            elif child in self.key_order:
+                sub = self._build(child, row, present, extra if isinstance(extra, dict) else {})
+                if sub or isinstance(extra, dict):
+                    out[key] = sub
+                elif extra is not _MISSING:
+                    out[key] = extra
+            elif extra is not _MISSING:
+                out[key] = extra
+        return out
+
+    def round_data(self, i: int) -> dict:
+        """Rebuild the round_data dict at index i."""
+        row = self.values[i].tolist()
+        round_data = self._build((), row, self.present[i], self.extras[i])
+        round_data.update(self.traces[i])
+        return round_data
+
+    def to_history(self) -> list[dict]:
+        """Rebuild the full list of round_data dicts."""
+        return [self.round_data(i) for i in range(len(self))]
+
+    # --- Persistence ---
+
+    def _schema(self) -> dict:
+        return {
+            "version": 1,
+            "n_rounds": len(self),
+            "columns": [list(path) for path in self.columns],
+            "kinds": self.kinds,
+            "key_order": [[list(path), keys] for path, keys in self.key_order.items()],
+        }
+
+    def save(self, exp_dir: str, format: str = "npy"):
+        """
+        Write the history into an experiment directory.
+
+        Args:
+            exp_dir: Target directory
+            format: "npy" (memory-mappable arrays) or "parquet" (needs pyarrow)
+        """
+        os.makedirs(exp_dir, exist_ok=True)
+        if format == "npy":
+            np.save(os.path.join(exp_dir, VALUES_FILE), self.values)
+            np.save(os.path.join(exp_dir, PRESENT_FILE), self.present)
+        elif format == "parquet":
+            _write_parquet(os.path.join(exp_dir, PARQUET_FILE), self.values, self.present, self.columns)
+        else:
+            raise ValueError(f"Unknown history format: {format}. Use 'npy' or 'parquet'.")
+
+        schema = self._schema()
+        schema["format"] = format
+        with open(os.path.join(exp_dir, SCHEMA_FILE), "w") as f:
+            json.dump(schema, f, indent=2)
+        with open(os.path.join(exp_dir, EXTRAS_FILE), "w") as f:
+            for extras in self.extras:
+                f.write(json.dumps(extras) + "\n")
+        with open(os.path.join(exp_dir, TRACES_FILE), "w") as f:
+            for i, traces in enumerate(self.traces):
+                f.write(json.dumps({"index": i, **traces}) + "\n")
+
+    @classmethod
+    def load(cls, exp_dir: str, mmap: bool = True) -> "ColumnarHistory":
+        """
+        Load a columnar history from an experiment directory.
+
+        Args:
+            exp_dir: Experiment directory
+            mmap: Memory-map the .npy arrays instead of reading them into RAM
+
+        Returns:
+            ColumnarHistory
+        """
+        with open(os.path.join(exp_dir, SCHEMA_FILE)) as f:
+            schema = json.load(f)
+        columns = [tuple(path) for path in schema["columns"]]
+
+        if schema.get("format", "npy") == "parquet":
+            values, present = _read_parquet(os.path.join(exp_dir, PARQUET_FILE), columns)
+        else:
+            mmap_mode = "r" if mmap else None
+            values = np.load(os.path.join(exp_dir, VALUES_FILE), mmap_mode=mmap_mode)
+            present = np.load(os.path.join(exp_dir, PRESENT_FILE), mmap_mode=mmap_mode)
+
+        extras = _read_jsonl(os.path.join(exp_dir, EXTRAS_FILE))
+        traces = [{k: v for k, v in t.items() if k != "index"}
+                  for t in _read_jsonl(os.path.join(exp_dir, TRACES_FILE))]
+        n_rounds = schema["n_rounds"]
+        extras += [{}] * (n_rounds - len(extras))
+        traces += [{}] * (n_rounds - len(traces))
+
+        return cls(
+            values=values,
+            present=present,
+            columns=columns,
+            kinds=schema["kinds"],
+            key_order={tuple(path): keys for path, keys in schema["key_order"]},
+            extras=extras,
+            traces=traces,
+        )
+
+
+def _read_jsonl(path: str) -> list[dict]:
+    if not os.path.exists(path):
+        return []
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+# --- Parquet (optional) ---
+
+def _import_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        raise ImportError("pyarrow package not installed. Run: pip install pyarrow")
+    return pyarrow
+
+
+def _write_parquet(path: str, values: np.ndarray, present: np.ndarray, columns: list[tuple]):
+    pa = _import_pyarrow()
+    arrays = [pa.array(values[:, j], mask=~present[:, j]) for j in range(len(columns))]
+    table = pa.table(arrays, names=["/".join(c) for c in columns])
+    pa.parquet.write_table(table, path)
+
+
+def _read_parquet(path: str, columns: list[tuple]) -> tuple[np.ndarray, np.ndarray]:
+    pa = _import_pyarrow()
+    table = pa.parquet.read_table(path)
+    values = np.full((table.num_rows, len(columns)), np.nan, dtype=np.float64)
+    present = np.zeros((table.num_rows, len(columns)), dtype=bool)
+    for j, chunked in enumerate(table.columns):
+        col = chunked.combine_chunks()
+        present[:, j] = ~col.is_null().to_numpy(zero_copy_only=False)
+        values[:, j] = col.fill_null(np.nan).to_numpy()
+    return values, present
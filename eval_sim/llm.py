@@ -8,20 +8,600 @@ Supported Providers:
 - Anthropic (Claude 3.5 Sonnet, Claude 3 Opus, etc.)
 - Ollama (local models like llama3, mistral, phi, gemma)
 - Gemini (Gemini 2.5 Flash, Gemini 2.5 Pro, etc.)
+- Mock (offline seeded stand-in for load tests; see mock_llm_server.py for HTTP)
 
 Configuration via environment variables:
-- LLM_PROVIDER: "openai", "anthropic", "ollama", or "gemini" (default: "openai")
+- LLM_PROVIDER: "openai", "anthropic", "ollama", "gemini", or "mock" (default: "openai")
 - LLM_MODEL: Model name (provider-specific)
 - OPENAI_API_KEY: Required for OpenAI provider
 - ANTHROPIC_API_KEY: Required for Anthropic provider
 - GEMINI_API_KEY: Required for Gemini provider
 - OLLAMA_BASE_URL: Ollama server URL (default: http://localhost:11434)
+- OLLAMA_KEEP_ALIVE / OLLAMA_NUM_CTX: Keep the model loaded (e.g. "30m") / context window
+- OLLAMA_STREAM: "0" disables streamed replies (and early JSON termination)
+- LLM_REQUESTS_PER_SECOND: Optional override of the shared per-backend rate limit
+- LLM_MAX_CONCURRENCY: Optional override of the per-provider in-flight request cap
+- LLM_CACHE_PATH: Optional SQLite file for the persistent response cache
+- LLM_CACHE_MAX_ENTRIES: Optional LRU bound for the response cache (default: 100000)
+- LLM_PROMPT_BUDGET: Default token budget for planning/reflection prompts (default: none, 0 = off)
+- MOCK_LLM_SEED / MOCK_LLM_LATENCY / MOCK_LLM_FAILURE_RATE / MOCK_LLM_MALFORMED_RATE:
+  Mock provider seed, latency distribution and fault rates
 """
+import asyncio
+import contextvars
+import hashlib
 import json
+import math
 import os
+import random
+import re
+import sqlite3
+import threading
 import time
 from abc import ABC, abstractmethod
-from typing import Callable, Optional
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeoutError
+from contextlib import contextmanager
+from typing import Callable, Iterable, Optional
+
+
+# --- Rate Limiting ---
+
+class TokenBucket:
+    """
+    Thread-safe token-bucket rate limiter.
+
+    Tokens refill continuously at `rate` per second up to `capacity`. Each
+    request takes one token. When the bucket is empty the token is borrowed
+    against future refills, so concurrent callers queue up fairly instead of
+    all waking at once.
+    """
+
+    def __init__(self, rate: float, capacity: float = 1.0):
+        """
+        Args:
+            rate: Tokens added per second
+            capacity: Maximum tokens held (allowed burst size)
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._last_refill = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _reserve(self) -> float:
+        """Take one token and return how many seconds to wait before using it."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(
+                self.capacity, self._tokens + (now - self._last_refill) * self.rate
+            )
+            self._last_refill = now
+            self._tokens -= 1
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+    def acquire(self):
+        """Block until a token is available."""
+        wait = self._reserve()
+        if wait > 0:
+            time.sleep(wait)
+
+    async def aacquire(self):
+        """Await until a token is available without blocking the event loop."""
+        wait = self._reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+
+_rate_limiters: dict = {}
+_rate_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(key: str, rate: float, capacity: float = 1.0) -> TokenBucket:
+    """
+    Get the process-wide token bucket for a backend, creating it on first use.
+
+    All provider instances with the same key share one bucket, so concurrent
+    actors calling the same API draw from a single request budget.
+
+    Args:
+        key: Limiter name (normally the provider class name)
+        rate: Tokens per second, used only when creating the bucket
+        capacity: Burst size, used only when creating the bucket
+
+    Returns:
+        Shared TokenBucket instance
+    """
+    with _rate_limiters_lock:
+        limiter = _rate_limiters.get(key)
+        if limiter is None:
+            limiter = TokenBucket(rate, capacity)
+            _rate_limiters[key] = limiter
+        return limiter
+
+
+# --- Response Cache ---
+
+class ResponseCache:
+    """
+    Persistent content-addressed cache of raw LLM responses, backed by SQLite.
+
+    Entries are keyed by a hash of (provider, model, temperature, system
+    prompt, prompt, extra generation args). Only responses that passed
+    validation are stored, so a replay with the same seed and prompts returns
+    the same completions without touching the backend. The table is bounded
+    to max_entries with least-recently-used eviction.
+    """
+
+    def __init__(self, path: str, max_entries: int = 100_000):
+        """
+        Args:
+            path: SQLite database file (created if missing)
+            max_entries: Maximum cached responses before LRU eviction
+        """
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+
+        self.path = path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " key TEXT PRIMARY KEY,"
+            " provider TEXT,"
+            " model TEXT,"
+            " response TEXT NOT NULL,"
+            " created REAL NOT NULL,"
+            " last_access REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_responses_last_access"
+            " ON responses(last_access)"
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(
+        provider: str,
+        model: Optional[str],
+        temperature: Optional[float],
+        system_prompt: Optional[str],
+        prompt: str,
+        **extra,
+    ) -> str:
+        """Build the content-addressed key for a generation request."""
+        payload = json.dumps(
+            {
+                "provider": provider,
+                "model": model,
+                "temperature": temperature,
+                "system_prompt": system_prompt or "",
+                "prompt_sha256": hashlib.sha256(prompt.encode("utf-8")).hexdigest(),
+                "extra": extra,
+            },
+            sort_keys=True,
+            default=str,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached response for key (refreshing its LRU position), or None."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._conn.execute(
+                "UPDATE responses SET last_access = ? WHERE key = ?",
+                (time.time(), key),
+            )
+            self._conn.commit()
+            return row[0]
+
+    def put(self, key: str, response: str, provider: str = "", model: Optional[str] = None):
+        """Store a response and evict the least recently used entries if over budget."""
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses"
+                " (key, provider, model, response, created, last_access)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (key, provider, model, response, now, now),
+            )
+            n_entries = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+            overflow = n_entries - self.max_entries
+            if overflow > 0:
+                self._conn.execute(
+                    "DELETE FROM responses WHERE key IN ("
+                    " SELECT key FROM responses ORDER BY last_access ASC LIMIT ?)",
+                    (overflow,),
+                )
+            self._conn.commit()
+
+    def stats(self) -> dict:
+        """Hit/miss counters for this process plus the current table size."""
+        with self._lock:
+            n_entries = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": n_entries,
+            "max_entries": self.max_entries,
+        }
+
+    def clear(self):
+        """Delete all cached responses and reset counters."""
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._conn.commit()
+            self.hits = 0
+            self.misses = 0
+
+    def close(self):
+        """Close the underlying database connection."""
+        with self._lock:
+            self._conn.close()
+
+
+# --- Usage Stats ---
+
+_llm_actor: contextvars.ContextVar = contextvars.ContextVar("llm_actor", default=None)
+
+
+@contextmanager
+def llm_actor(name: Optional[str]):
+    """Attribute LLM calls made on this thread/task to an actor."""
+    token = _llm_actor.set(name)
+    try:
+        yield
+    finally:
+        _llm_actor.reset(token)
+
+
+def current_llm_actor() -> Optional[str]:
+    """Actor that LLM calls are currently attributed to (None if unset)."""
+    return _llm_actor.get()
+
+
+class LLMUsageStats:
+    """
+    Thread-safe per-actor counters for LLM usage.
+
+    safe_generate() records one call (latency, attempts, retries, failures,
+    cache hits/misses); backends add token counts reported by their API (and
+    early_stops for streamed replies cut off once their JSON was complete,
+    stream_aborts for streamed replies whose JSON could not be parsed), and
+    PromptBuilder adds the estimated size of each prompt it builds and how
+    much history it trimmed to fit the budget.
+    Calls outside an llm_actor() block are filed under "unattributed".
+
+    Counters only grow; take snapshot() before and after a span of work and
+    use diff() to get the usage in between.
+    """
+
+    COUNTERS = (
+        "calls", "attempts", "retries", "failures", "cache_hits", "cache_misses",
+        "prompt_tokens", "completion_tokens", "latency_s",
+        "prompt_tokens_est", "prompt_trims", "prompt_rows_dropped", "deadline_misses",
+        "early_stops", "stream_aborts",
+    )
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._by_actor: dict[str, dict] = {}
+
+    def _entry(self, actor: Optional[str]) -> dict:
+        key = actor or "unattributed"
+        entry = self._by_actor.get(key)
+        if entry is None:
+            entry = {name: 0 for name in self.COUNTERS}
+            entry["latency_s"] = 0.0
+            entry["max_latency_s"] = 0.0
+            self._by_actor[key] = entry
+        return entry
+
+    def record(self, actor: Optional[str] = None, latency_s: Optional[float] = None, **counts):
+        """Add counts (and optionally one call's latency) for an actor."""
+        with self._lock:
+            entry = self._entry(actor if actor is not None else current_llm_actor())
+            for name, value in counts.items():
+                entry[name] += value
+            if latency_s is not None:
+                entry["latency_s"] += latency_s
+                entry["max_latency_s"] = max(entry["max_latency_s"], latency_s)
+
+    def snapshot(self) -> dict:
+        """Copy of all counters, {actor: {counter: value}}."""
+        with self._lock:
+            return {actor: dict(entry) for actor, entry in self._by_actor.items()}
+
+    @staticmethod
+    def diff(before: dict, after: dict) -> dict:
+        """
+        Usage between two snapshots, for actors with at least one call or token.
+
+        max_latency_s is the running maximum at `after`, not for the span.
+        """
+        result = {}
+        for actor, entry in after.items():
+            prev = before.get(actor, {})
+            delta = {name: entry[name] - prev.get(name, 0) for name in LLMUsageStats.COUNTERS}
+            if delta["calls"] or delta["prompt_tokens"] or delta["completion_tokens"] or delta["prompt_tokens_est"]:
+                delta["max_latency_s"] = entry["max_latency_s"]
+                result[actor] = delta
+        return result
+
+    def reset(self):
+        with self._lock:
+            self._by_actor.clear()
+
+
+_usage_stats = LLMUsageStats()
+
+
+def get_usage_stats() -> LLMUsageStats:
+    """Process-wide LLM usage counters."""
+    return _usage_stats
+
+
+# --- Deadlines ---
+
+DEADLINE_POOL_WORKERS = 32
+
+_deadline_pool: Optional[ThreadPoolExecutor] = None
+_deadline_pool_lock = threading.Lock()
+
+# Deadline of the run_with_deadline() call the current thread is working for
+_call_deadline: contextvars.ContextVar[Optional[float]] = contextvars.ContextVar(
+    "llm_call_deadline", default=None
+)
+
+
+class DeadlineExceeded(TimeoutError):
+    """An abandoned deadline call gave up before starting an API request."""
+
+
+def _get_deadline_pool() -> ThreadPoolExecutor:
+    global _deadline_pool
+    with _deadline_pool_lock:
+        if _deadline_pool is None:
+            _deadline_pool = ThreadPoolExecutor(
+                max_workers=DEADLINE_POOL_WORKERS, thread_name_prefix="llm-deadline"
+            )
+        return _deadline_pool
+
+
+def run_with_deadline(fn: Callable, deadline: Optional[float], *args, **kwargs) -> tuple[bool, any]:
+    """
+    Run fn(*args, **kwargs), waiting for it no later than `deadline`.
+
+    A call that misses the deadline is abandoned and its result discarded, so
+    fn must not modify actor state; build inputs before and apply results
+    after. Abandoned work does not start new API requests: it is skipped if it
+    is still queued for a pool thread, and a request still waiting for a
+    provider's request slot gives up at the deadline. A request already in
+    flight at the deadline runs to completion on its background thread and
+    holds its request slot until then (its LLM usage is still recorded), so a
+    slow backend can keep up to max_concurrency slots busy with abandoned
+    calls. Misses are counted as deadline_misses in the usage stats.
+
+    Args:
+        fn: Callable, typically an llm_* convenience function
+        deadline: Absolute time.monotonic() value; None runs fn inline and waits
+        *args, **kwargs: Passed to fn
+
+    Returns:
+        (finished, result); result is None when the deadline was missed
+    """
+    if deadline is None:
+        return True, fn(*args, **kwargs)
+    future = _get_deadline_pool().submit(
+        contextvars.copy_context().run, _run_before_deadline, deadline, fn, *args, **kwargs
+    )
+    try:
+        return True, future.result(timeout=max(0.0, deadline - time.monotonic()))
+    except FuturesTimeoutError:
+        if future.done() and not isinstance(future.exception(), DeadlineExceeded):
+            # fn itself raised a TimeoutError (e.g. from an HTTP client)
+            return True, future.result()
+        _usage_stats.record(deadline_misses=1)
+        return False, None
+
+
+def _run_before_deadline(deadline: float, fn: Callable, *args, **kwargs):
+    """Run fn with its deadline visible to _request_slot, unless it has already passed."""
+    if time.monotonic() >= deadline:
+        raise DeadlineExceeded("deadline passed while queued")
+    _call_deadline.set(deadline)
+    return fn(*args, **kwargs)
+
+
+# --- Streaming JSON ---
+
+_JSON_NUMBER = re.compile(r"-?(0|[1-9]\d*)(\.\d+)?([eE][+-]?\d+)?")
+_JSON_LITERALS = ("true", "false", "null")
+_JSON_ESCAPES = frozenset('"\\/bfnrtu')
+_JSON_HEX = frozenset("0123456789abcdefABCDEF")
+
+
+class StreamingJSONParser:
+    """
+    Incremental syntax check for a JSON object arriving in pieces.
+
+    feed() consumes streamed text and reports, after each piece, whether the
+    first top-level object is complete, still open, or already malformed, so
+    the caller can close the stream as soon as the reply is usable (no tokens
+    past the closing brace). Text before the opening brace (a code fence, a
+    preamble) is skipped, up to max_preamble characters if set; text after
+    the object is ignored.
+
+    Usage:
+        parser = StreamingJSONParser()
+        for piece in stream:
+            if parser.feed(piece) != StreamingJSONParser.INCOMPLETE:
+                break
+        if parser.status == StreamingJSONParser.COMPLETE:
+            result = parser.value()
+    """
+
+    INCOMPLETE = "incomplete"
+    COMPLETE = "complete"
+    INVALID = "invalid"
+
+    def __init__(self, max_preamble: Optional[int] = None):
+        """
+        Args:
+            max_preamble: Characters allowed before the opening brace
+                (None = no limit)
+        """
+        self.max_preamble = max_preamble
+        self.status = self.INCOMPLETE
+        self.error: Optional[str] = None
+        self.consumed = 0  # Characters read, up to and including the closing brace
+        self._chars: list[str] = []  # The object's text so far
+        self._n_preamble = 0
+        self._stack: list[str] = []  # Open containers, "{" or "["
+        self._expect = "start"       # What the next significant character must be
+        self._in_string = False
+        self._in_key = False
+        self._escape = False
+        self._hex_left = 0
+        self._token = ""             # Number or literal being read
+
+    def feed(self, text: str) -> str:
+        """Consume more streamed text; returns the status after it."""
+        for ch in text:
+            if self.status != self.INCOMPLETE:
+                break
+            self.consumed += 1
+            self._step(ch)
+        return self.status
+
+    def value(self) -> dict:
+        """The parsed object (only once status is COMPLETE)."""
+        if self.status != self.COMPLETE:
+            raise ValueError(f"JSON object is {self.status}: {self.error or 'not closed yet'}")
+        return json.loads("".join(self._chars))
+
+    def _fail(self, reason: str):
+        self.status = self.INVALID
+        self.error = f"{reason} at offset {self._n_preamble + len(self._chars)}"
+
+    def _step(self, ch: str):
+        if self._expect == "start":
+            if ch == "{":
+                self._chars.append(ch)
+                self._open(ch)
+            else:
+                self._n_preamble += 1
+                if self.max_preamble is not None and self._n_preamble > self.max_preamble:
+                    self._fail("no JSON object")
+            return
+
+        self._chars.append(ch)
+        if self._in_string:
+            self._string_char(ch)
+            return
+        if self._token:
+            if self._token_continues(ch):
+                self._token += ch
+                if self._token[0] in "tfn" and not any(
+                    literal.startswith(self._token) for literal in _JSON_LITERALS
+                ):
+                    self._fail(f"invalid literal {self._token!r}")
+                return
+            self._end_token()
+            if self.status != self.INCOMPLETE:
+                return
+        if ch in " \t\r\n":
+            return
+
+        expect = self._expect
+        if expect in ("value", "value_or_close"):
+            if ch == "]" and expect == "value_or_close":
+                self._close()
+            elif ch in "{[":
+                self._open(ch)
+            elif ch == '"':
+                self._in_string, self._in_key = True, False
+            elif ch == "-" or ch.isdigit() or ch in "tfn":
+                self._token = ch
+            else:
+                self._fail(f"unexpected {ch!r} where a value belongs")
+        elif expect in ("key", "key_or_close"):
+            if ch == '"':
+                self._in_string, self._in_key = True, True
+            elif ch == "}" and expect == "key_or_close":
+                self._close()
+            else:
+                self._fail(f"unexpected {ch!r} where a key belongs")
+        elif expect == "colon":
+            if ch == ":":
+                self._expect = "value"
+            else:
+                self._fail(f"expected ':' but got {ch!r}")
+        else:  # comma_or_close
+            top = self._stack[-1]
+            if ch == ",":
+                self._expect = "key" if top == "{" else "value"
+            elif ch == ("}" if top == "{" else "]"):
+                self._close()
+            else:
+                self._fail(f"expected ',' or a closing bracket but got {ch!r}")
+
+    def _string_char(self, ch: str):
+        if self._hex_left:
+            if ch not in _JSON_HEX:
+                self._fail("invalid \\u escape")
+            self._hex_left -= 1
+        elif self._escape:
+            self._escape = False
+            if ch not in _JSON_ESCAPES:
+                self._fail(f"invalid escape \\{ch}")
+            elif ch == "u":
+                self._hex_left = 4
+        elif ch == "\\":
+            self._escape = True
+        elif ch == '"':
+            self._in_string = False
+            self._expect = "colon" if self._in_key else "comma_or_close"
+        elif ch < " ":
+            self._fail("control character in string")
+
+    def _token_continues(self, ch: str) -> bool:
+        if self._token[0] in "tfn":
+            return ch.isalpha()
+        return ch.isdigit() or ch in ".eE+-"
+
+    def _end_token(self):
+        token, self._token = self._token, ""
+        if token[0] in "tfn":
+            if token not in _JSON_LITERALS:
+                self._fail(f"invalid literal {token!r}")
+        elif not _JSON_NUMBER.fullmatch(token):
+            self._fail(f"invalid number {token!r}")
+        self._expect = "comma_or_close"
+
+    def _open(self, bracket: str):
+        self._stack.append(bracket)
+        self._expect = "key_or_close" if bracket == "{" else "value_or_close"
+
+    def _close(self):
+        self._stack.pop()
+        if self._stack:
+            self._expect = "comma_or_close"
+        else:
+            self.status = self.COMPLETE
 
 
 class LLMProvider(ABC):
@@ -31,8 +611,29 @@ class LLMProvider(ABC):
     All providers must implement:
     - generate(): Basic text generation
     - generate_json(): JSON generation with validation
+
+    The base class adds, on top of those:
+    - agenerate() / agenerate_json(): awaitable versions for asyncio callers
+    - generate_batch() / agenerate_batch(): many prompts in flight at once
+
+    Throughput is bounded by a token bucket shared by every instance of the
+    same backend (requests_per_second, burst) and by a per-instance cap on
+    in-flight requests (max_concurrency). Subclasses wrap each API call in
+    `with self._request_slot():`.
+
+    generate_json() implementations pass stop_at_json=True; backends then
+    stream the reply through _collect_stream() and close it once the JSON
+    object is complete or malformed, instead of waiting for the full reply.
     """
 
+    # Request throttling defaults (override per subclass or via configure_limits)
+    requests_per_second: Optional[float] = 10.0  # None disables rate limiting
+    burst: float = 1.0
+    max_concurrency: int = 4
+
+    # Optional persistent response cache consulted by safe_generate()
+    response_cache: Optional[ResponseCache] = None
+
     @abstractmethod
     def generate(
         self,
@@ -77,6 +678,190 @@ class LLMProvider(ABC):
         """
         pass
 
+    def configure_limits(
+        self,
+        requests_per_second: Optional[float] = None,
+        burst: Optional[float] = None,
+        max_concurrency: Optional[int] = None,
+    ):
+        """
+        Override throttling settings for this provider instance.
+
+        Args:
+            requests_per_second: Shared token-bucket refill rate (<= 0 disables)
+            burst: Token-bucket capacity
+            max_concurrency: Max in-flight requests for this instance
+        """
+        if requests_per_second is not None:
+            self.requests_per_second = requests_per_second if requests_per_second > 0 else None
+        if burst is not None:
+            self.burst = burst
+        if max_concurrency is not None:
+            self.max_concurrency = max(1, int(max_concurrency))
+        # Rebuild lazily with the new settings
+        self._limiter = None
+        self._semaphore = None
+
+    def _get_limiter(self) -> Optional[TokenBucket]:
+        """Shared token bucket for this backend, or None if unlimited."""
+        if not self.requests_per_second:
+            return None
+        limiter = getattr(self, "_limiter", None)
+        if limiter is None:
+            key = f"{type(self).__name__}:{self.requests_per_second}:{self.burst}"
+            limiter = get_rate_limiter(key, self.requests_per_second, self.burst)
+            self._limiter = limiter
+        return limiter
+
+    def _get_semaphore(self) -> threading.BoundedSemaphore:
+        """Per-instance in-flight request cap."""
+        semaphore = getattr(self, "_semaphore", None)
+        if semaphore is None:
+            with _rate_limiters_lock:
+                semaphore = getattr(self, "_semaphore", None)
+                if semaphore is None:
+                    semaphore = threading.BoundedSemaphore(self.max_concurrency)
+                    self._semaphore = semaphore
+        return semaphore
+
+    def _rate_limit(self):
+        """Take a token from the shared bucket (blocks if the budget is spent)."""
+        limiter = self._get_limiter()
+        if limiter is not None:
+            limiter.acquire()
+
+    @contextmanager
+    def _request_slot(self):
+        """
+        Hold one concurrency slot and one rate-limit token for an API call.
+
+        Inside run_with_deadline(), waiting for a slot stops at the deadline
+        and raises DeadlineExceeded, so abandoned calls don't queue for slots.
+        """
+        semaphore = self._get_semaphore()
+        deadline = _call_deadline.get()
+        if deadline is None:
+            semaphore.acquire()
+        elif not semaphore.acquire(timeout=max(0.0, deadline - time.monotonic())):
+            raise DeadlineExceeded("deadline passed while waiting for a request slot")
+        try:
+            # Take the token only once a slot is free so queued callers
+            # don't burn the budget while waiting.
+            self._rate_limit()
+            yield
+        finally:
+            semaphore.release()
+
+    async def agenerate(
+        self,
+        prompt: str,
+        system_prompt: Optional[str] = None,
+        **kwargs,
+    ) -> str:
+        """
+        Awaitable generate().
+
+        The blocking client call runs in a worker thread; the request slot
+        still bounds in-flight requests, so many coroutines can be gathered.
+
+        Args:
+            prompt: User prompt
+            system_prompt: Optional system prompt
+            **kwargs: Additional args passed to generate()
+
+        Returns:
+            Response text from the LLM
+        """
+        return await asyncio.to_thread(self.generate, prompt, system_prompt, **kwargs)
+
+    async def agenerate_json(
+        self,
+        prompt: str,
+        system_prompt: Optional[str] = None,
+        **kwargs,
+    ) -> dict:
+        """
+        Awaitable generate_json().
+
+        Args:
+            prompt: User prompt (should request JSON output)
+            system_prompt: Optional system prompt
+            **kwargs: Additional args passed to generate_json()
+                (retries, fail_safe, verbose)
+
+        Returns:
+            Parsed JSON dict, or fail_safe if parsing fails
+        """
+        return await asyncio.to_thread(self.generate_json, prompt, system_prompt, **kwargs)
+
+    def generate_batch(
+        self,
+        prompts: list,
+        system_prompt: Optional[str] = None,
+        as_json: bool = False,
+        max_workers: Optional[int] = None,
+        **kwargs,
+    ) -> list:
+        """
+        Run many prompts concurrently and return results in input order.
+
+        Args:
+            prompts: List of user prompts
+            system_prompt: System prompt shared by all prompts
+            as_json: If True, use generate_json() (kwargs may include fail_safe)
+            max_workers: Thread count (default: max_concurrency)
+            **kwargs: Additional args passed to generate()/generate_json()
+
+        Returns:
+            List of responses aligned with prompts
+        """
+        func = self.generate_json if as_json else self.generate
+        n_workers = min(max_workers or self.max_concurrency, len(prompts))
+        if n_workers <= 1:
+            return [func(p, system_prompt, **kwargs) for p in prompts]
+
+        with ThreadPoolExecutor(max_workers=n_workers) as pool:
+            # Each task runs in a copy of the caller's context (keeps llm_actor attribution)
+            futures = [
+                pool.submit(contextvars.copy_context().run, func, p, system_prompt, **kwargs)
+                for p in prompts
+            ]
+            return [f.result() for f in futures]
+
+    async def agenerate_batch(
+        self,
+        prompts: list,
+        system_prompt: Optional[str] = None,
+        as_json: bool = False,
+        **kwargs,
+    ) -> list:
+        """Awaitable generate_batch(); results are returned in input order."""
+        func = self.agenerate_json if as_json else self.agenerate
+        return list(await asyncio.gather(
+            *(func(p, system_prompt, **kwargs) for p in prompts)
+        ))
+
+    def _cache_key(self, prompt: str, system_prompt: Optional[str] = None, **kwargs) -> str:
+        """Response-cache key for a generate() call on this provider."""
+        kwargs.pop("stop_at_json", None)  # Only affects how a reply is read
+        temperature = kwargs.pop("temperature", None)
+        if temperature is None:
+            temperature = getattr(self, "default_temperature", None)
+        return ResponseCache.make_key(
+            provider=type(self).__name__,
+            model=getattr(self, "model", None),
+            temperature=temperature,
+            system_prompt=system_prompt,
+            prompt=prompt,
+            **kwargs,
+        )
+
+    def _cache_put(self, cache_key: str, response: str):
+        """Store a validated response in the response cache."""
+        self.response_cache.put(
+            cache_key, response, type(self).__name__, getattr(self, "model", None)
+        )
+
     def safe_generate(
         self,
         prompt: str,
@@ -104,7 +889,53 @@ class LLMProvider(ABC):
         Returns:
             Cleaned response, or fail_safe if validation fails
         """
+        start = time.perf_counter()
+        usage = {"attempts": 0, "cache_hits": 0, "cache_misses": 0, "failures": 0}
+        try:
+            return self._safe_generate(
+                prompt, system_prompt, func_validate, func_cleanup,
+                retries, fail_safe, verbose, usage, **kwargs
+            )
+        finally:
+            _usage_stats.record(
+                calls=1,
+                retries=max(0, usage["attempts"] - 1),
+                latency_s=time.perf_counter() - start,
+                **usage,
+            )
+
+    def _safe_generate(
+        self,
+        prompt: str,
+        system_prompt: Optional[str],
+        func_validate: Optional[Callable[[str], bool]],
+        func_cleanup: Optional[Callable[[str], any]],
+        retries: int,
+        fail_safe: any,
+        verbose: bool,
+        usage: dict,
+        **kwargs,
+    ) -> any:
+        """safe_generate() body; fills `usage` with attempt/cache/failure counts."""
+        cache = self.response_cache
+        cache_key = None
+        if cache is not None:
+            cache_key = self._cache_key(prompt, system_prompt, **kwargs)
+            cached = cache.get(cache_key)
+            if cached is not None:
+                try:
+                    if func_validate is None or func_validate(cached):
+                        if verbose:
+                            print(f"Cache hit: {cached[:100]}...")
+                        usage["cache_hits"] = 1
+                        return func_cleanup(cached) if func_cleanup else cached
+                except Exception as e:
+                    if verbose:
+                        print(f"Cached response failed validation: {e}")
+            usage["cache_misses"] = 1
+
         for attempt in range(retries):
+            usage["attempts"] += 1
             response = self.generate(prompt, system_prompt, **kwargs)
 
             if verbose:
@@ -112,6 +943,8 @@ class LLMProvider(ABC):
 
             # Skip validation if no validator provided
             if func_validate is None:
+                if cache is not None and not response.startswith("ERROR:"):
+                    self._cache_put(cache_key, response)
                 if func_cleanup:
                     return func_cleanup(response)
                 return response
@@ -119,6 +952,8 @@ class LLMProvider(ABC):
             # Validate
             try:
                 if func_validate(response):
+                    if cache is not None:
+                        self._cache_put(cache_key, response)
                     if func_cleanup:
                         return func_cleanup(response)
                     return response
@@ -131,8 +966,73 @@ class LLMProvider(ABC):
 
         if verbose:
             print(f"All {retries} attempts failed, returning fail_safe")
+        usage["failures"] = 1
         return fail_safe
 
+    def _record_tokens(self, prompt_tokens: Optional[int], completion_tokens: Optional[int]):
+        """Add API-reported token counts to the usage stats (None = not reported)."""
+        _usage_stats.record(
+            prompt_tokens=int(prompt_tokens or 0),
+            completion_tokens=int(completion_tokens or 0),
+        )
+
+    def _collect_stream(
+        self,
+        pieces: Iterable[str],
+        prompt_text: str,
+        usage: dict,
+        stop_at_json: bool = True,
+    ) -> str:
+        """
+        Concatenate a streamed reply and record its token usage.
+
+        With stop_at_json, reading stops as soon as the reply's first JSON
+        object is complete; the caller then closes the stream, which stops
+        generation server-side (counted as early_stops when the stream had
+        more to send). If that object turns out malformed, the rest of the
+        reply is still read so _extract_json() can look for JSON in the full
+        text, as for an unstreamed reply; replies it cannot parse either are
+        counted as stream_aborts.
+
+        Args:
+            pieces: Text deltas from the backend's stream
+            prompt_text: Prompt sent, to estimate token counts when the stream
+                ends before the backend reports usage
+            usage: Filled by `pieces` with "prompt_tokens" and
+                "completion_tokens" if the backend reports them
+            stop_at_json: Stop at the end of the JSON object
+
+        Returns:
+            The text received (a complete JSON reply ends at its closing
+            brace)
+        """
+        parts = []
+        pieces = iter(pieces)
+        parser = StreamingJSONParser() if stop_at_json else None
+        for piece in pieces:
+            parts.append(piece)
+            if parser is not None and parser.feed(piece) == StreamingJSONParser.COMPLETE:
+                break
+        text = "".join(parts)
+
+        if parser is not None and parser.status == StreamingJSONParser.COMPLETE:
+            # Early stop only if the stream had more to send: text after the
+            # object in the last piece, or another non-empty piece
+            left_unread = text[parser.consumed:].strip() or any(piece for piece in pieces)
+            text = text[:parser.consumed]
+            if left_unread:
+                _usage_stats.record(early_stops=1)
+        elif parser is not None and parser.status == StreamingJSONParser.INVALID:
+            try:
+                json.loads(_extract_json(text))
+            except json.JSONDecodeError:
+                _usage_stats.record(stream_aborts=1)
+        if usage:
+            self._record_tokens(usage.get("prompt_tokens"), usage.get("completion_tokens"))
+        else:
+            self._record_tokens(estimate_tokens(prompt_text), estimate_tokens(text))
+        return text
+
 
 class OpenAIProvider(LLMProvider):
     """
@@ -176,17 +1076,6 @@ class OpenAIProvider(LLMProvider):
         self.default_temperature = temperature
         self.default_max_tokens = max_tokens
 
-        # Rate limiting
-        self.last_call_time = 0
-        self.min_call_interval = 0.1  # seconds between calls
-
-    def _rate_limit(self):
-        """Simple rate limiting to avoid hitting API limits."""
-        elapsed = time.time() - self.last_call_time
-        if elapsed < self.min_call_interval:
-            time.sleep(self.min_call_interval - elapsed)
-        self.last_call_time = time.time()
-
     def generate(
         self,
         prompt: str,
@@ -194,10 +1083,9 @@ class OpenAIProvider(LLMProvider):
         temperature: Optional[float] = None,
         max_tokens: Optional[int] = None,
         json_mode: bool = False,
+        stop_at_json: bool = False,
     ) -> str:
-        """Generate a response from OpenAI."""
-        self._rate_limit()
-
+        """Generate a response from OpenAI (streamed and cut short with stop_at_json)."""
         messages = []
         if system_prompt:
             messages.append({"role": "system", "content": system_prompt})
@@ -214,12 +1102,38 @@ class OpenAIProvider(LLMProvider):
             kwargs["response_format"] = {"type": "json_object"}
 
         try:
-            response = self.client.chat.completions.create(**kwargs)
+            with self._request_slot():
+                if stop_at_json:
+                    return self._generate_streamed(kwargs, f"{system_prompt or ''}{prompt}")
+                response = self.client.chat.completions.create(**kwargs)
+            usage = getattr(response, "usage", None)
+            if usage is not None:
+                self._record_tokens(usage.prompt_tokens, usage.completion_tokens)
             return response.choices[0].message.content
         except Exception as e:
             print(f"OpenAI API Error: {e}")
             return f"ERROR: {e}"
 
+    def _generate_streamed(self, kwargs: dict, prompt_text: str) -> str:
+        """Stream a completion until its JSON object is complete or malformed."""
+        stream = self.client.chat.completions.create(
+            stream=True, stream_options={"include_usage": True}, **kwargs
+        )
+        usage = {}
+
+        def pieces():
+            for chunk in stream:
+                if getattr(chunk, "usage", None) is not None:
+                    usage["prompt_tokens"] = chunk.usage.prompt_tokens
+                    usage["completion_tokens"] = chunk.usage.completion_tokens
+                if chunk.choices:
+                    yield chunk.choices[0].delta.content or ""
+
+        try:
+            return self._collect_stream(pieces(), prompt_text, usage)
+        finally:
+            stream.close()
+
     def generate_json(
         self,
         prompt: str,
@@ -255,6 +1169,7 @@ class OpenAIProvider(LLMProvider):
             fail_safe=fail_safe or {},
             verbose=verbose,
             json_mode=True,
+            stop_at_json=True,
         )
 
 
@@ -300,41 +1215,49 @@ class AnthropicProvider(LLMProvider):
         self.default_temperature = temperature
         self.default_max_tokens = max_tokens
 
-        # Rate limiting
-        self.last_call_time = 0
-        self.min_call_interval = 0.1  # seconds between calls
-
-    def _rate_limit(self):
-        """Simple rate limiting to avoid hitting API limits."""
-        elapsed = time.time() - self.last_call_time
-        if elapsed < self.min_call_interval:
-            time.sleep(self.min_call_interval - elapsed)
-        self.last_call_time = time.time()
-
     def generate(
         self,
         prompt: str,
         system_prompt: Optional[str] = None,
         temperature: Optional[float] = None,
         max_tokens: Optional[int] = None,
+        stop_at_json: bool = False,
         **kwargs,
     ) -> str:
-        """Generate a response from Anthropic Claude."""
-        self._rate_limit()
-
+        """Generate a response from Anthropic Claude (streamed and cut short with stop_at_json)."""
+        params = {
+            "model": self.model,
+            "max_tokens": max_tokens if max_tokens is not None else self.default_max_tokens,
+            "temperature": temperature if temperature is not None else self.default_temperature,
+            "system": system_prompt or "",
+            "messages": [{"role": "user", "content": prompt}],
+        }
         try:
-            message = self.client.messages.create(
-                model=self.model,
-                max_tokens=max_tokens if max_tokens is not None else self.default_max_tokens,
-                temperature=temperature if temperature is not None else self.default_temperature,
-                system=system_prompt or "",
-                messages=[{"role": "user", "content": prompt}],
-            )
+            with self._request_slot():
+                if stop_at_json:
+                    return self._generate_streamed(params, f"{system_prompt or ''}{prompt}")
+                message = self.client.messages.create(**params)
+            usage = getattr(message, "usage", None)
+            if usage is not None:
+                self._record_tokens(usage.input_tokens, usage.output_tokens)
             return message.content[0].text
         except Exception as e:
             print(f"Anthropic API Error: {e}")
             return f"ERROR: {e}"
 
+    def _generate_streamed(self, params: dict, prompt_text: str) -> str:
+        """Stream a message until its JSON object is complete or malformed."""
+        usage = {}
+        # Leaving the context manager closes the stream
+        with self.client.messages.stream(**params) as stream:
+            def pieces():
+                yield from stream.text_stream
+                final = stream.get_final_message().usage
+                usage["prompt_tokens"] = final.input_tokens
+                usage["completion_tokens"] = final.output_tokens
+
+            return self._collect_stream(pieces(), prompt_text, usage)
+
     def generate_json(
         self,
         prompt: str,
@@ -371,6 +1294,7 @@ class AnthropicProvider(LLMProvider):
             retries=retries,
             fail_safe=fail_safe or {},
             verbose=verbose,
+            stop_at_json=True,
         )
 
 
@@ -380,14 +1304,28 @@ class OllamaProvider(LLMProvider):
 
     Requires Ollama to be running locally (default: http://localhost:11434).
     No API key needed for local usage.
+
+    Requests go through one pooled keep-alive requests.Session. Replies are
+    streamed; generate_json() hangs up as soon as a complete JSON object has
+    arrived (or is already malformed), so the server stops generating tokens
+    nobody will read.
     """
 
+    # Local server: no request budget, only the in-flight cap
+    requests_per_second = None
+
+    # Keep-alive connections kept open to the server
+    pool_maxsize: int = 32
+
     def __init__(
         self,
         model: str = "llama3",
         base_url: str = "http://localhost:11434",
         temperature: float = 0.7,
         max_tokens: int = 500,
+        keep_alive: Optional[str] = None,
+        num_ctx: Optional[int] = None,
+        stream: bool = True,
     ):
         """
         Initialize Ollama provider.
@@ -397,9 +1335,14 @@ class OllamaProvider(LLMProvider):
             base_url: Ollama server URL
             temperature: Default sampling temperature
             max_tokens: Default max tokens (note: Ollama uses num_predict)
+            keep_alive: How long the server keeps the model loaded after a
+                request, e.g. "30m" or "-1" (None: server default, 5m)
+            num_ctx: Context window in tokens (None: model default)
+            stream: Stream replies (allows early termination of JSON replies)
         """
         try:
             import requests
+            from requests.adapters import HTTPAdapter
         except ImportError:
             raise ImportError(
                 "requests package not installed. Run: pip install requests"
@@ -409,6 +1352,14 @@ class OllamaProvider(LLMProvider):
         self.base_url = base_url.rstrip("/")
         self.default_temperature = temperature
         self.default_max_tokens = max_tokens
+        self.keep_alive = keep_alive
+        self.num_ctx = num_ctx
+        self.stream = stream
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_maxsize)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
 
         # Verify Ollama is running
         self._verify_connection()
@@ -417,7 +1368,7 @@ class OllamaProvider(LLMProvider):
         """Verify Ollama server is reachable."""
         import requests
         try:
-            response = requests.get(f"{self.base_url}/api/tags", timeout=5)
+            response = self.session.get(f"{self.base_url}/api/tags", timeout=5)
             if response.status_code != 200:
                 print(f"Warning: Ollama server returned status {response.status_code}")
         except requests.exceptions.ConnectionError:
@@ -430,9 +1381,15 @@ class OllamaProvider(LLMProvider):
         system_prompt: Optional[str] = None,
         temperature: Optional[float] = None,
         max_tokens: Optional[int] = None,
+        stop_at_json: bool = False,
         **kwargs,
     ) -> str:
-        """Generate a response from Ollama."""
+        """
+        Generate a response from Ollama.
+
+        With stop_at_json, a streamed reply is cut off once its first
+        top-level JSON object is complete or malformed.
+        """
         import requests
 
         # Build the full prompt
@@ -440,24 +1397,34 @@ class OllamaProvider(LLMProvider):
         if system_prompt:
             full_prompt = f"System: {system_prompt}\n\nUser: {prompt}"
 
+        options = {
+            "temperature": temperature if temperature is not None else self.default_temperature,
+            "num_predict": max_tokens if max_tokens is not None else self.default_max_tokens,
+        }
+        if self.num_ctx is not None:
+            options["num_ctx"] = self.num_ctx
         payload = {
             "model": self.model,
             "prompt": full_prompt,
-            "stream": False,
-            "options": {
-                "temperature": temperature if temperature is not None else self.default_temperature,
-                "num_predict": max_tokens if max_tokens is not None else self.default_max_tokens,
-            }
+            "stream": self.stream,
+            "options": options,
         }
+        if self.keep_alive is not None:
+            payload["keep_alive"] = self.keep_alive
 
         try:
-            response = requests.post(
-                f"{self.base_url}/api/generate",
-                json=payload,
-                timeout=120,  # Longer timeout for local models
-            )
-            response.raise_for_status()
-            result = response.json()
+            with self._request_slot():
+                response = self.session.post(
+                    f"{self.base_url}/api/generate",
+                    json=payload,
+                    timeout=120,  # Longer timeout for local models
+                    stream=self.stream,
+                )
+                response.raise_for_status()
+                if self.stream:
+                    return self._read_stream(response, stop_at_json, full_prompt)
+                result = response.json()
+            self._record_tokens(result.get("prompt_eval_count"), result.get("eval_count"))
             return result.get("response", "")
         except requests.exceptions.ConnectionError:
             return "ERROR: Could not connect to Ollama. Make sure it's running."
@@ -467,6 +1434,33 @@ class OllamaProvider(LLMProvider):
             print(f"Ollama API Error: {e}")
             return f"ERROR: {e}"
 
+    def _read_stream(self, response, stop_at_json: bool, full_prompt: str) -> str:
+        """
+        Concatenate a streamed (NDJSON) reply.
+
+        With stop_at_json, the connection is closed as soon as the JSON object
+        is complete or malformed; Ollama then stops generating. Token counts
+        come from the final chunk, or are estimated for a cut-off reply.
+        """
+        usage = {}
+
+        def pieces():
+            for line in response.iter_lines():
+                if not line:
+                    continue
+                chunk = json.loads(line)
+                if "error" in chunk:
+                    raise RuntimeError(chunk["error"])
+                if chunk.get("done"):
+                    usage["prompt_tokens"] = chunk.get("prompt_eval_count")
+                    usage["completion_tokens"] = chunk.get("eval_count")
+                yield chunk.get("response", "")
+
+        try:
+            return self._collect_stream(pieces(), full_prompt, usage, stop_at_json)
+        finally:
+            response.close()
+
     def generate_json(
         self,
         prompt: str,
@@ -503,6 +1497,7 @@ class OllamaProvider(LLMProvider):
             retries=retries,
             fail_safe=fail_safe or {},
             verbose=verbose,
+            stop_at_json=True,
         )
 
 
@@ -550,44 +1545,62 @@ class GeminiProvider(LLMProvider):
         self.default_temperature = temperature
         self.default_max_tokens = max_tokens
 
-        # Rate limiting
-        self.last_call_time = 0
-        self.min_call_interval = 0.1  # seconds between calls
-
-    def _rate_limit(self):
-        """Simple rate limiting to avoid hitting API limits."""
-        elapsed = time.time() - self.last_call_time
-        if elapsed < self.min_call_interval:
-            time.sleep(self.min_call_interval - elapsed)
-        self.last_call_time = time.time()
-
     def generate(
         self,
         prompt: str,
         system_prompt: Optional[str] = None,
         temperature: Optional[float] = None,
         max_tokens: Optional[int] = None,
+        stop_at_json: bool = False,
         **kwargs,
     ) -> str:
-        """Generate a response from Google Gemini."""
-        self._rate_limit()
-
+        """Generate a response from Google Gemini (streamed and cut short with stop_at_json)."""
         try:
             config = self.types.GenerateContentConfig(
                 temperature=temperature if temperature is not None else self.default_temperature,
                 max_output_tokens=max_tokens if max_tokens is not None else self.default_max_tokens,
                 system_instruction=system_prompt,
             )
-            response = self.client.models.generate_content(
-                model=self.model,
-                contents=prompt,
-                config=config,
-            )
+            with self._request_slot():
+                if stop_at_json:
+                    return self._generate_streamed(prompt, config, f"{system_prompt or ''}{prompt}")
+                response = self.client.models.generate_content(
+                    model=self.model,
+                    contents=prompt,
+                    config=config,
+                )
+            usage = getattr(response, "usage_metadata", None)
+            if usage is not None:
+                self._record_tokens(usage.prompt_token_count, usage.candidates_token_count)
             return response.text
         except Exception as e:
             print(f"Gemini API Error: {e}")
             return f"ERROR: {e}"
 
+    def _generate_streamed(self, prompt: str, config, prompt_text: str) -> str:
+        """Stream a reply until its JSON object is complete or malformed."""
+        stream = self.client.models.generate_content_stream(
+            model=self.model,
+            contents=prompt,
+            config=config,
+        )
+        usage = {}
+
+        def pieces():
+            for chunk in stream:
+                meta = getattr(chunk, "usage_metadata", None)
+                if meta is not None and meta.candidates_token_count is not None:
+                    usage["prompt_tokens"] = meta.prompt_token_count
+                    usage["completion_tokens"] = meta.candidates_token_count
+                yield chunk.text or ""
+
+        try:
+            return self._collect_stream(pieces(), prompt_text, usage)
+        finally:
+            close = getattr(stream, "close", None)
+            if close is not None:
+                close()
+
     def generate_json(
         self,
         prompt: str,
@@ -623,6 +1636,306 @@ class GeminiProvider(LLMProvider):
             retries=retries,
             fail_safe=fail_safe or {},
             verbose=verbose,
+            stop_at_json=True,
+        )
+
+
+# --- Mock Backend ---
+
+def sample_latency(spec: Optional[str], rng: random.Random) -> float:
+    """
+    Draw one response latency in seconds.
+
+    Args:
+        spec: None or "0" (no delay), "0.2" (fixed), "uniform:lo,hi",
+            "normal:mean,sd", "lognormal:median,sigma" or "exp:mean"
+        rng: Random source
+
+    Returns:
+        Latency in seconds (never negative)
+    """
+    if not spec:
+        return 0.0
+    name, _, params = str(spec).partition(":")
+    if not params:
+        return max(0.0, float(name))
+    args = [float(p) for p in params.split(",")]
+    if name == "uniform":
+        value = rng.uniform(args[0], args[1])
+    elif name == "normal":
+        value = rng.gauss(args[0], args[1])
+    elif name == "lognormal":
+        value = args[0] * math.exp(rng.gauss(0.0, args[1]))
+    elif name == "exp":
+        value = rng.expovariate(1.0 / args[0])
+    else:
+        raise ValueError(f"Unknown latency distribution: {name}. "
+                         "Use 'uniform', 'normal', 'lognormal' or 'exp'.")
+    return max(0.0, value)
+
+
+_MOCK_THINKING = (
+    "We are {position} on the leaderboard. Scores are {trend} and consumer "
+    "satisfaction is tracking them, so we keep most effort on real capability.",
+    "Our position is {position}. Evaluation engineering has {trend} returns; "
+    "we rebalance toward training while watching for regulatory signals.",
+    "Competitors are {trend}. Being {position}, we hedge across research and "
+    "safety rather than chase the benchmark.",
+)
+_MOCK_REFLECTION = (
+    "Scores moved roughly in line with research investment, so the benchmark "
+    "looks {validity}; capability belief adjusted slightly.",
+    "Evaluation engineering rounds scored {gap} than research-heavy rounds; "
+    "exploitability belief updated accordingly.",
+)
+# Spliced into malformed replies; invalid JSON wherever it lands
+_MOCK_DERAIL = "\n\nI need to reconsider this allocation before continuing.\n"
+_MOCK_FUNDING = (
+    "Backing providers in proportion to score, discounted where the "
+    "satisfaction gap suggests gaming.",
+    "Spreading capital across the field with extra weight on leaders whose "
+    "consumer satisfaction supports their scores.",
+)
+
+
+def _mock_prompt_kind(prompt: str, system_prompt: Optional[str]) -> str:
+    """Which simulation prompt this is, from the system prompt's first line."""
+    text = f"{system_prompt or ''}\n{prompt}"
+    for kind, system in (
+        ("portfolio", PLANNING_SYSTEM_PROMPT_PORTFOLIO),
+        ("reflection", REFLECTION_SYSTEM_PROMPT),
+        ("funding", FUNDER_PLANNING_SYSTEM_PROMPT),
+        ("planning", PLANNING_SYSTEM_PROMPT),
+    ):
+        if system.splitlines()[0] in text:
+            return kind
+    return "text"
+
+
+def _prompt_number(prompt: str, pattern: str, default: float) -> float:
+    match = re.search(pattern, prompt)
+    return float(match.group(1).replace(",", "")) if match else default
+
+
+def mock_response(prompt: str, system_prompt: Optional[str], rng: random.Random) -> str:
+    """
+    Schema-valid JSON reply to one of the simulation's prompts.
+
+    Portfolio, reflection, funding and legacy planning prompts get the keys
+    their llm_* parsers read; numbers come from rng (and, for reflection and
+    funding, from the beliefs, capital and leaderboard stated in the prompt).
+    Any other prompt gets {"reasoning": ...}.
+    """
+    kind = _mock_prompt_kind(prompt, system_prompt)
+
+    if kind == "portfolio":
+        keys = ("fundamental_research", "training_optimization",
+                "evaluation_engineering", "safety_alignment")
+        weights = [rng.gammavariate(2.0, 1.0) for _ in keys]
+        shares = [round(w / sum(weights), 2) for w in weights[:-1]]
+        shares.append(round(1.0 - sum(shares), 2))
+        reply = {"thinking": rng.choice(_MOCK_THINKING).format(
+            position=rng.choice(("ahead", "behind", "level")),
+            trend=rng.choice(("rising", "flat", "falling")),
+        )}
+        reply.update(zip(keys, shares))
+
+    elif kind == "reflection":
+        capability = _prompt_number(prompt, r"Believed capability: ([\d.]+)", 0.5)
+        exploitability = _prompt_number(prompt, r"Believed benchmark exploitability: ([\d.]+)", 0.5)
+        reply = {
+            "reasoning": rng.choice(_MOCK_REFLECTION).format(
+                validity=rng.choice(("valid", "partly exploitable")),
+                gap=rng.choice(("higher", "about the same", "lower")),
+            ),
+            "believed_capability": round(min(1.0, max(0.0, capability + rng.gauss(0.0, 0.03))), 3),
+            "believed_exploitability": round(min(1.0, max(0.0, exploitability + rng.gauss(0.0, 0.03))), 3),
+        }
+
+    elif kind == "funding":
+        capital = _prompt_number(prompt, r"Total Capital: \$([\d,]+)", 0.0)
+        leaderboard = re.findall(r"^\s+\d+\. (.+?): score=([\d.]+)", prompt, re.MULTILINE)
+        weights = {name: float(score) ** 2 * rng.gammavariate(4.0, 0.25)
+                   for name, score in leaderboard}
+        total = sum(weights.values()) or 1.0
+        reply = {
+            "reasoning": rng.choice(_MOCK_FUNDING),
+            "allocations": {name: round(capital * w / total) for name, w in weights.items()},
+        }
+
+    elif kind == "planning":
+        rnd = round(rng.uniform(0.3, 0.9), 2)
+        reply = {
+            "reasoning": rng.choice(_MOCK_THINKING).format(position="level", trend="flat"),
+            "rnd_investment": rnd,
+            "gaming_investment": round(1.0 - rnd, 2),
+        }
+
+    else:
+        reply = {"reasoning": "Mock response."}
+
+    return json.dumps(reply, indent=2)
+
+
+class MockBackend:
+    """
+    Seeded response generator shared by MockProvider and mock_llm_server.
+
+    Each reply is drawn from an RNG seeded by (seed, prompt, n), where n counts
+    earlier requests with the same prompt, so a run is reproducible for a seed
+    regardless of request interleaving, while retries still see fresh draws.
+    """
+
+    # Characters per streamed chunk (roughly four tokens)
+    stream_chunk_chars: int = 16
+
+    def __init__(
+        self,
+        seed: int = 0,
+        latency: Optional[str] = None,
+        failure_rate: float = 0.0,
+        malformed_rate: float = 0.0,
+    ):
+        """
+        Args:
+            seed: Base seed for replies, latencies and injected faults
+            latency: Latency distribution spec (see sample_latency)
+            failure_rate: Probability a request fails outright
+            malformed_rate: Probability a reply breaks off mid-JSON into prose
+        """
+        sample_latency(latency, random.Random(0))  # Reject bad specs up front
+        self.seed = seed
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.malformed_rate = malformed_rate
+        self._seen: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def respond(self, prompt: str, system_prompt: Optional[str] = None) -> tuple[str, str, float]:
+        """
+        Draw the reply to one request.
+
+        Returns:
+            (outcome, text, latency_s): outcome is "ok", "malformed" (the
+            reply breaks off mid-JSON into prose) or "failed" (text is empty)
+        """
+        digest = hashlib.sha256(f"{system_prompt or ''}\0{prompt}".encode()).hexdigest()
+        with self._lock:
+            n = self._seen.get(digest, 0)
+            self._seen[digest] = n + 1
+        rng = random.Random(f"{self.seed}:{digest}:{n}")
+
+        latency_s = sample_latency(self.latency, rng)
+        if rng.random() < self.failure_rate:
+            return "failed", "", latency_s
+        text = mock_response(prompt, system_prompt, rng)
+        if rng.random() < self.malformed_rate:
+            cut = rng.randrange(1, len(text))
+            return "malformed", text[:cut] + _MOCK_DERAIL + text[cut:], latency_s
+        return "ok", text, latency_s
+
+    def chunks(self, text: str) -> list[str]:
+        """Split a reply into the pieces a streaming backend would send."""
+        step = self.stream_chunk_chars
+        return [text[i:i + step] for i in range(0, len(text), step)] or [""]
+
+
+class MockProvider(LLMProvider):
+    """
+    Offline stand-in backend for load tests and CI.
+
+    Answers the portfolio, reflection and funding prompts with schema-valid
+    JSON from MockBackend, after a sampled delay, and injects failures and
+    malformed replies at the configured rates. No network or API key needed.
+    For the HTTP path, run mock_llm_server.py and use the ollama provider.
+    """
+
+    # In-process: no request budget, only the in-flight cap
+    requests_per_second = None
+
+    def __init__(
+        self,
+        model: str = "mock",
+        seed: int = 0,
+        latency: Optional[str] = None,
+        failure_rate: float = 0.0,
+        malformed_rate: float = 0.0,
+    ):
+        """
+        Initialize mock provider.
+
+        Args:
+            model: Model name reported in caches and logs
+            seed: Base seed for replies, latencies and injected faults
+            latency: Latency distribution spec, e.g. "lognormal:0.5,0.4"
+            failure_rate: Probability a request returns an ERROR string
+            malformed_rate: Probability a reply breaks off mid-JSON into prose
+        """
+        self.model = model
+        self.backend = MockBackend(seed, latency, failure_rate, malformed_rate)
+
+    def generate(
+        self,
+        prompt: str,
+        system_prompt: Optional[str] = None,
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        stop_at_json: bool = False,
+        **kwargs,
+    ) -> str:
+        """
+        Generate a mock response.
+
+        With stop_at_json, the reply is streamed in chunks (latency spread
+        across them) and cut off once its JSON object is complete or malformed.
+        """
+        outcome, text, latency_s = self.backend.respond(prompt, system_prompt)
+        prompt_text = f"{system_prompt or ''}{prompt}"
+        with self._request_slot():
+            if outcome == "failed":
+                time.sleep(latency_s)
+                return "ERROR: mock backend failure"
+            if stop_at_json:
+                chunks = self.backend.chunks(text)
+
+                def pieces():
+                    for chunk in chunks:
+                        time.sleep(latency_s / len(chunks))
+                        yield chunk
+
+                return self._collect_stream(pieces(), prompt_text, {})
+            time.sleep(latency_s)
+        self._record_tokens(estimate_tokens(prompt_text), estimate_tokens(text))
+        return text
+
+    def generate_json(
+        self,
+        prompt: str,
+        system_prompt: Optional[str] = None,
+        retries: int = 3,
+        fail_safe: dict = None,
+        verbose: bool = False,
+    ) -> dict:
+        """Generate and parse a mock JSON response."""
+        def validate_json(response: str) -> bool:
+            try:
+                json.loads(_extract_json(response))
+                return True
+            except:
+                return False
+
+        def cleanup_json(response: str) -> dict:
+            return json.loads(_extract_json(response))
+
+        return self.safe_generate(
+            prompt=prompt,
+            system_prompt=system_prompt,
+            func_validate=validate_json,
+            func_cleanup=cleanup_json,
+            retries=retries,
+            fail_safe=fail_safe or {},
+            verbose=verbose,
+            stop_at_json=True,
         )
 
 
@@ -662,29 +1975,80 @@ def create_llm_provider(
     Create an LLM provider based on configuration.
 
     Args:
-        provider: Provider name ("openai", "anthropic", "ollama", or "gemini").
+        provider: Provider name ("openai", "anthropic", "ollama", "gemini", or "mock").
                  If None, uses LLM_PROVIDER env var (default: "openai")
-        **kwargs: Additional arguments passed to provider constructor
+        **kwargs: Additional arguments passed to provider constructor.
+            requests_per_second and max_concurrency configure throttling;
+            cache_path and cache_max_entries enable the response cache.
 
     Returns:
         LLMProvider instance
 
     Environment Variables:
-        LLM_PROVIDER: Provider name (openai, anthropic, ollama, gemini)
+        LLM_PROVIDER: Provider name (openai, anthropic, ollama, gemini, mock)
         LLM_MODEL: Model name (provider-specific)
         OPENAI_API_KEY: For OpenAI provider
         ANTHROPIC_API_KEY: For Anthropic provider
         GEMINI_API_KEY: For Gemini provider
         OLLAMA_BASE_URL: For Ollama provider
+        OLLAMA_KEEP_ALIVE: How long Ollama keeps the model loaded (e.g. "30m")
+        OLLAMA_NUM_CTX: Ollama context window in tokens
+        OLLAMA_STREAM: "0" disables streamed Ollama replies
+        LLM_REQUESTS_PER_SECOND: Shared rate limit for the backend
+        LLM_MAX_CONCURRENCY: In-flight request cap for the provider
+        LLM_CACHE_PATH: SQLite file for the persistent response cache
+        LLM_CACHE_MAX_ENTRIES: LRU bound for the response cache
+        MOCK_LLM_SEED: Seed for the mock provider (default: 0)
+        MOCK_LLM_LATENCY: Mock latency spec, e.g. "lognormal:0.5,0.4"
+        MOCK_LLM_FAILURE_RATE: Probability a mock request fails
+        MOCK_LLM_MALFORMED_RATE: Probability a mock reply is cut off
     """
-    provider = provider or os.getenv("LLM_PROVIDER", "openai")
+    provider_name = provider or os.getenv("LLM_PROVIDER", "openai")
+    instance = _create_llm_provider(provider_name, **kwargs)
+
+    # Optional throttling overrides (kwargs take precedence over env vars)
+    rps = kwargs.get("requests_per_second", os.getenv("LLM_REQUESTS_PER_SECOND"))
+    max_concurrency = kwargs.get("max_concurrency", os.getenv("LLM_MAX_CONCURRENCY"))
+    if rps is not None or max_concurrency is not None:
+        instance.configure_limits(
+            requests_per_second=float(rps) if rps is not None else None,
+            max_concurrency=int(max_concurrency) if max_concurrency is not None else None,
+        )
+
+    # Optional persistent response cache
+    cache_path = kwargs.get("cache_path") or os.getenv("LLM_CACHE_PATH")
+    if cache_path:
+        max_entries = kwargs.get("cache_max_entries") or os.getenv("LLM_CACHE_MAX_ENTRIES", 100_000)
+        instance.response_cache = get_response_cache(cache_path, int(max_entries))
+    return instance
+
+
+_response_caches: dict = {}
 
+
+def get_response_cache(path: str, max_entries: int = 100_000) -> ResponseCache:
+    """Get the shared ResponseCache for a database file, opening it on first use."""
+    key = os.path.abspath(path)
+    with _rate_limiters_lock:
+        cache = _response_caches.get(key)
+        if cache is None:
+            cache = ResponseCache(path, max_entries=max_entries)
+            _response_caches[key] = cache
+        return cache
+
+
+def _create_llm_provider(provider: str, **kwargs) -> LLMProvider:
+    """Instantiate the named provider backend."""
     if provider == "ollama":
+        num_ctx = kwargs.get("num_ctx") or os.getenv("OLLAMA_NUM_CTX")
         return OllamaProvider(
             model=kwargs.get("model") or os.getenv("LLM_MODEL", "llama3"),
             base_url=kwargs.get("base_url") or os.getenv("OLLAMA_BASE_URL", "http://localhost:11434"),
             temperature=kwargs.get("temperature", 0.7),
             max_tokens=kwargs.get("max_tokens", 500),
+            keep_alive=kwargs.get("keep_alive") or os.getenv("OLLAMA_KEEP_ALIVE"),
+            num_ctx=int(num_ctx) if num_ctx else None,
+            stream=kwargs.get("stream", os.getenv("OLLAMA_STREAM", "1") != "0"),
         )
     elif provider == "anthropic":
         return AnthropicProvider(
@@ -707,8 +2071,16 @@ def create_llm_provider(
             temperature=kwargs.get("temperature", 0.7),
             max_tokens=kwargs.get("max_tokens", 500),
         )
+    elif provider == "mock":
+        return MockProvider(
+            model=kwargs.get("model") or "mock",
+            seed=int(kwargs.get("seed", os.getenv("MOCK_LLM_SEED", 0))),
+            latency=kwargs.get("latency", os.getenv("MOCK_LLM_LATENCY")),
+            failure_rate=float(kwargs.get("failure_rate", os.getenv("MOCK_LLM_FAILURE_RATE", 0))),
+            malformed_rate=float(kwargs.get("malformed_rate", os.getenv("MOCK_LLM_MALFORMED_RATE", 0))),
+        )
     else:
-        raise ValueError(f"Unknown provider: {provider}. Use 'openai', 'anthropic', 'ollama', or 'gemini'.")
+        raise ValueError(f"Unknown provider: {provider}. Use 'openai', 'anthropic', 'ollama', 'gemini', or 'mock'.")
 
 
 def get_provider() -> LLMProvider:
@@ -747,6 +2119,165 @@ def set_client(client: LLMProvider):
     set_provider(client)
 
 
+# --- Prompt Budgeting ---
+
+CHARS_PER_TOKEN = 4  # Rough average for English text with common tokenizers
+DEFAULT_PROMPT_BUDGET = None  # No budget unless set
+
+_prompt_budgets: dict[tuple[Optional[str], Optional[str]], Optional[int]] = {}
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximate token count of text (no tokenizer needed)."""
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def set_prompt_budget(tokens: Optional[int], kind: Optional[str] = None, actor: Optional[str] = None):
+    """
+    Set the prompt token budget.
+
+    Args:
+        tokens: Budget in estimated tokens (None or 0 = unlimited)
+        kind: Prompt kind ("provider_planning", "provider_reflection",
+            "funder_planning"); None = all kinds
+        actor: Only for prompts built inside llm_actor(actor); None = all actors
+    """
+    _prompt_budgets[(actor, kind)] = tokens
+
+
+def get_prompt_budget(kind: str) -> Optional[int]:
+    """
+    Budget for a prompt kind, from the most specific setting: this actor and
+    kind, this actor, this kind, then the global setting.
+    """
+    actor = current_llm_actor()
+    for key in ((actor, kind), (actor, None), (None, kind), (None, None)):
+        if key in _prompt_budgets:
+            return _prompt_budgets[key] or None
+    env_budget = os.getenv("LLM_PROMPT_BUDGET")
+    if env_budget is None:
+        return DEFAULT_PROMPT_BUDGET
+    return int(env_budget) or None
+
+
+class PromptBuilder:
+    """
+    Assembles a prompt from sections and fits it to a token budget.
+
+    Sections are emitted in the order they are added. If the estimated size
+    exceeds the budget, optional sections are dropped (highest drop_priority
+    first), then the oldest rows of history tables are folded into a single
+    summary row, keeping at least min_rows per table. Required text is never
+    changed, so a prompt under budget is identical to an unbudgeted one, and
+    sections added first that do not change between rounds (an actor's
+    profile) stay a stable prefix that backend prefix/KV caches can reuse.
+
+    build() records the estimated size, whether trimming was needed and how
+    many rows were dropped in the usage stats of the current llm_actor.
+    """
+
+    def __init__(self, kind: str, budget: Optional[int] = None):
+        """
+        Args:
+            kind: Prompt kind, used to look up the budget (see set_prompt_budget)
+            budget: Explicit budget in estimated tokens (overrides the lookup)
+        """
+        self.kind = kind
+        self.budget = budget if budget is not None else get_prompt_budget(kind)
+        self._parts: list[dict] = []
+
+    def add(self, text: str, drop_priority: Optional[int] = None):
+        """Append text; with a drop_priority it may be left out to fit the budget."""
+        self._parts.append({"text": text, "drop_priority": drop_priority, "dropped": False})
+
+    def add_rows(
+        self,
+        lines: list[str],
+        items: Optional[list] = None,
+        summarize: Optional[Callable[[list], str]] = None,
+        min_rows: int = 1,
+    ):
+        """
+        Append history rows (oldest first) that may be trimmed from the front.
+
+        Args:
+            lines: Rendered rows, each ending in a newline
+            items: Data behind each row, passed to summarize (default: lines)
+            summarize: Renders the dropped items as one line (default: a count)
+            min_rows: Rows that are always kept
+        """
+        self._parts.append({
+            "lines": list(lines),
+            "items": list(items) if items is not None else list(lines),
+            "summarize": summarize or (lambda dropped: f"({len(dropped)} earlier rows omitted)\n"),
+            "min_rows": min_rows,
+            "n_dropped": 0,
+        })
+
+    def _render(self) -> str:
+        out = []
+        for part in self._parts:
+            if "lines" in part:
+                n = part["n_dropped"]
+                if n:
+                    out.append(part["summarize"](part["items"][:n]))
+                out.extend(part["lines"][n:])
+            elif not part["dropped"]:
+                out.append(part["text"])
+        return "".join(out)
+
+    def build(self) -> str:
+        """Render the prompt, trimming it to the budget if needed."""
+        prompt = self._render()
+        tokens = estimate_tokens(prompt)
+        trimmed = False
+
+        if self.budget and tokens > self.budget:
+            trimmed = True
+            optional = [p for p in self._parts if p.get("drop_priority") is not None]
+            for part in sorted(optional, key=lambda p: -p["drop_priority"]):
+                part["dropped"] = True
+                prompt = self._render()
+                tokens = estimate_tokens(prompt)
+                if tokens <= self.budget:
+                    break
+            for part in self._parts:
+                if "lines" not in part:
+                    continue
+                while tokens > self.budget and len(part["lines"]) - part["n_dropped"] > part["min_rows"]:
+                    part["n_dropped"] += 1
+                    prompt = self._render()
+                    tokens = estimate_tokens(prompt)
+
+        _usage_stats.record(
+            prompt_tokens_est=tokens,
+            prompt_trims=int(trimmed),
+            prompt_rows_dropped=sum(p.get("n_dropped", 0) for p in self._parts),
+        )
+        return prompt
+
+
+def _format_portfolio_row(entry: dict) -> str:
+    """One row of the Round | Score | Research | Training | EvalEng | Safety table."""
+    return (f"| {entry.get('round', '?')} | {entry.get('score', 0):.3f} | "
+            f"{entry.get('fundamental_research', 0):.0%} | "
+            f"{entry.get('training_optimization', 0):.0%} | "
+            f"{entry.get('evaluation_engineering', 0):.0%} | "
+            f"{entry.get('safety_alignment', 0):.0%} |\n")
+
+
+def _summarize_portfolio_rows(entries: list) -> str:
+    """Average of trimmed portfolio rows, as one table row labelled with its round span."""
+    n = len(entries)
+    mean = {
+        key: sum(e.get(key, 0) for e in entries) / n
+        for key in ("score", "fundamental_research", "training_optimization",
+                    "evaluation_engineering", "safety_alignment")
+    }
+    mean["round"] = f"{entries[0].get('round', '?')}-{entries[-1].get('round', '?')} avg"
+    return _format_portfolio_row(mean)
+
+
 # --- Prompt Templates for Provider Planning ---
 
 PLANNING_SYSTEM_PROMPT_PORTFOLIO = """You are simulating a Model Provider deciding resource allocation.
@@ -872,12 +2403,14 @@ def create_planning_prompt_portfolio(
     recent_history: list,
     consumer_satisfaction: Optional[float] = None,
     regulatory_pressure: Optional[list] = None,
+    budget: Optional[int] = None,
 ) -> str:
     """
     Create a prompt for the provider to decide their investment portfolio.
 
-    Structured to lead with dynamics (what happened, trends, market signals)
-    and present organization context secondarily.
+    The organization's fixed profile comes first, so it is the same prompt
+    prefix every round; the round's dynamics (what happened, trends, market
+    signals) follow, ahead of the current beliefs and investment history.
 
     Args:
         name: Provider name
@@ -890,70 +2423,71 @@ def create_planning_prompt_portfolio(
         recent_history: List of dicts with round, score, and portfolio allocations
         consumer_satisfaction: Average consumer satisfaction (if available)
         regulatory_pressure: List of recent regulatory interventions (if any)
+        budget: Token budget (default: get_prompt_budget("provider_planning"))
 
     Returns:
         Prompt string
     """
-    prompt = f"""# Situation Assessment for {name}
+    builder = PromptBuilder("provider_planning", budget)
+    builder.add(f"""# Situation Assessment for {name}
+
+## Your Organization
+Profile: {strategy_profile}
+Traits: {innate_traits}
 
 ## What happened last round
-"""
+""")
 
-    # Lead with concrete events, not identity
+    # Concrete events come before beliefs and history
     if last_score is not None and competitor_scores:
         rank = 1 + sum(1 for s in competitor_scores.values() if s > last_score)
-        prompt += f"- You scored {last_score:.3f} (rank #{rank} of {1 + len(competitor_scores)})\n"
+        builder.add(f"- You scored {last_score:.3f} (rank #{rank} of {1 + len(competitor_scores)})\n")
         for comp, score in sorted(competitor_scores.items(), key=lambda x: x[1], reverse=True):
-            prompt += f"- {comp} scored {score:.3f}\n"
+            builder.add(f"- {comp} scored {score:.3f}\n")
     elif last_score is not None:
-        prompt += f"- Your last benchmark score: {last_score:.3f}\n"
+        builder.add(f"- Your last benchmark score: {last_score:.3f}\n")
     else:
-        prompt += "- No scores yet (first round)\n"
+        builder.add("- No scores yet (first round)\n")
 
     # Add trend analysis
     if recent_history and len(recent_history) >= 2:
         score_trend = recent_history[-1].get('score', 0) - recent_history[-2].get('score', 0)
-        prompt += f"\n## Trends\n"
-        prompt += f"- Your score {'improved' if score_trend > 0 else 'declined'} by {abs(score_trend):.3f}\n"
+        builder.add(f"\n## Trends\n")
+        builder.add(f"- Your score {'improved' if score_trend > 0 else 'declined'} by {abs(score_trend):.3f}\n")
         if competitor_scores and len(recent_history) >= 2:
-            # Show which competitors are gaining/falling
-            for comp, score in competitor_scores.items():
-                prompt += f"- {comp}: current {score:.3f}\n"
+            # Show which competitors are gaining/falling (repeats the scores
+            # above, so it is the first thing dropped when over budget)
+            builder.add("".join(f"- {comp}: current {score:.3f}\n" for comp, score in competitor_scores.items()),
+                        drop_priority=1)
 
     # Market signals
     if consumer_satisfaction is not None:
-        prompt += f"\n## Market Signals\n"
-        prompt += f"- Consumer satisfaction: {consumer_satisfaction:.2f}\n"
+        builder.add(f"\n## Market Signals\n")
+        builder.add(f"- Consumer satisfaction: {consumer_satisfaction:.2f}\n")
     if regulatory_pressure:
         if not consumer_satisfaction:
-            prompt += f"\n## Market Signals\n"
+            builder.add(f"\n## Market Signals\n")
         for intervention in regulatory_pressure[-2:]:
             itype = intervention.get("type", "unknown")
-            prompt += f"- Regulatory activity: {itype}\n"
+            builder.add(f"- Regulatory activity: {itype}\n")
 
-    # THEN the organization context (shorter, less dominant)
-    prompt += f"""\n## Your Organization
-Profile: {strategy_profile}
-Traits: {innate_traits}
+    builder.add(f"""\n## Your Current Beliefs
 Believed capability: {believed_capability:.2f}
 Believed benchmark exploitability: {believed_exploitability:.2f}
-"""
+""")
 
-    # Investment history table (kept but moved down)
+    # Investment history table (kept but moved down); oldest rows are
+    # averaged into one row when over budget
     if recent_history:
-        prompt += "\n## Recent Investment History\n"
-        prompt += "| Round | Score | Research | Training | EvalEng | Safety |\n"
-        prompt += "|-------|-------|----------|----------|---------|--------|\n"
-        for entry in recent_history[-5:]:
-            if isinstance(entry, dict):
-                prompt += (f"| {entry.get('round', '?')} | {entry.get('score', 0):.3f} | "
-                          f"{entry.get('fundamental_research', 0):.0%} | "
-                          f"{entry.get('training_optimization', 0):.0%} | "
-                          f"{entry.get('evaluation_engineering', 0):.0%} | "
-                          f"{entry.get('safety_alignment', 0):.0%} |\n")
+        builder.add("\n## Recent Investment History\n")
+        builder.add("| Round | Score | Research | Training | EvalEng | Safety |\n")
+        builder.add("|-------|-------|----------|----------|---------|--------|\n")
+        entries = [entry for entry in recent_history[-5:] if isinstance(entry, dict)]
+        builder.add_rows([_format_portfolio_row(entry) for entry in entries], entries,
+                   summarize=_summarize_portfolio_rows)
 
     # Decision section emphasizes dynamics over identity
-    prompt += """
+    builder.add("""
 ## Decision Required
 Allocate resources for the next round. Consider:
 1. How are you positioned vs competitors? What's the trajectory?
@@ -961,9 +2495,9 @@ Allocate resources for the next round. Consider:
 3. What market signals (satisfaction, regulation) suggest about strategy?
 4. What's the right balance of short-term scoring vs long-term capability?
 
-Output your decision as JSON with all four investment percentages summing to 1.0."""
+Output your decision as JSON with all four investment percentages summing to 1.0.""")
 
-    return prompt
+    return builder.build()
 
 
 REFLECTION_SYSTEM_PROMPT = """You are simulating a Model Provider organization reflecting on benchmark results.
@@ -986,6 +2520,7 @@ def create_reflection_prompt(
     current_believed_capability: float,
     current_believed_exploitability: float,
     recent_history: list,
+    budget: Optional[int] = None,
 ) -> str:
     """
     Create a prompt for the provider to reflect and update beliefs.
@@ -996,11 +2531,13 @@ def create_reflection_prompt(
         current_believed_capability: Current capability belief
         current_believed_exploitability: Current exploitability belief
         recent_history: List of dicts with round, score, and portfolio allocations
+        budget: Token budget (default: get_prompt_budget("provider_reflection"))
 
     Returns:
         Prompt string
     """
-    prompt = f"""# Organization: {name}
+    builder = PromptBuilder("provider_reflection", budget)
+    builder.add(f"""# Organization: {name}
 Strategy Profile: {strategy_profile}
 
 # Current Beliefs
@@ -1008,26 +2545,23 @@ Strategy Profile: {strategy_profile}
 - Believed benchmark exploitability: {current_believed_exploitability:.2f}
 
 # Performance History
-"""
+""")
 
     if recent_history:
         # Check format - new portfolio format uses dicts
         if isinstance(recent_history[0], dict):
-            prompt += "| Round | Score | Research | Training | EvalEng | Safety |\n"
-            prompt += "|-------|-------|----------|----------|---------|--------|\n"
-            for entry in recent_history[-10:]:
-                prompt += (f"| {entry.get('round', '?')} | {entry.get('score', 0):.3f} | "
-                          f"{entry.get('fundamental_research', 0):.0%} | "
-                          f"{entry.get('training_optimization', 0):.0%} | "
-                          f"{entry.get('evaluation_engineering', 0):.0%} | "
-                          f"{entry.get('safety_alignment', 0):.0%} |\n")
+            builder.add("| Round | Score | Research | Training | EvalEng | Safety |\n")
+            builder.add("|-------|-------|----------|----------|---------|--------|\n")
+            entries = recent_history[-10:]
+            builder.add_rows([_format_portfolio_row(entry) for entry in entries], entries,
+                             summarize=_summarize_portfolio_rows)
 
             # Add some analysis hints
             scores = [h.get('score', 0) for h in recent_history]
             eval_eng = [h.get('evaluation_engineering', 0) for h in recent_history]
 
-            prompt += f"\nAverage score: {sum(scores)/len(scores):.3f}\n"
-            prompt += f"Average evaluation engineering: {sum(eval_eng)/len(eval_eng):.0%}\n"
+            builder.add(f"\nAverage score: {sum(scores)/len(scores):.3f}\n")
+            builder.add(f"Average evaluation engineering: {sum(eval_eng)/len(eval_eng):.0%}\n")
 
             # Correlation hint for eval engineering vs real capability investment
             if len(recent_history) >= 3:
@@ -1038,33 +2572,43 @@ Strategy Profile: {strategy_profile}
                 if high_eval and low_eval:
                     avg_high = sum(s for s, _ in high_eval) / len(high_eval)
                     avg_low = sum(s for s, _ in low_eval) / len(low_eval)
-                    prompt += f"\nWhen eval engineering > 30%: avg score = {avg_high:.3f}"
-                    prompt += f"\nWhen eval engineering <= 30%: avg score = {avg_low:.3f}\n"
+                    builder.add(f"\nWhen eval engineering > 30%: avg score = {avg_high:.3f}"
+                                f"\nWhen eval engineering <= 30%: avg score = {avg_low:.3f}\n")
         else:
             # Legacy tuple format (round, score, rnd, gaming)
-            prompt += "| Round | Score | R&D | Gaming |\n"
-            prompt += "|-------|-------|-----|--------|\n"
-            for round_num, score, rnd, gaming in recent_history[-10:]:
-                prompt += f"| {round_num} | {score:.3f} | {rnd:.0%} | {gaming:.0%} |\n"
+            builder.add("| Round | Score | R&D | Gaming |\n")
+            builder.add("|-------|-------|-----|--------|\n")
+            entries = recent_history[-10:]
+            builder.add_rows(
+                [f"| {round_num} | {score:.3f} | {rnd:.0%} | {gaming:.0%} |\n"
+                 for round_num, score, rnd, gaming in entries],
+                entries,
+                summarize=lambda dropped: (
+                    f"| {dropped[0][0]}-{dropped[-1][0]} avg | "
+                    f"{sum(h[1] for h in dropped) / len(dropped):.3f} | "
+                    f"{sum(h[2] for h in dropped) / len(dropped):.0%} | "
+                    f"{sum(h[3] for h in dropped) / len(dropped):.0%} |\n"
+                ),
+            )
 
             scores = [h[1] for h in recent_history]
             gaming_investments = [h[3] for h in recent_history]
 
-            prompt += f"\nAverage score: {sum(scores)/len(scores):.3f}\n"
-            prompt += f"Average gaming investment: {sum(gaming_investments)/len(gaming_investments):.0%}\n"
+            builder.add(f"\nAverage score: {sum(scores)/len(scores):.3f}\n")
+            builder.add(f"Average gaming investment: {sum(gaming_investments)/len(gaming_investments):.0%}\n")
     else:
-        prompt += "No history yet.\n"
+        builder.add("No history yet.\n")
 
-    prompt += """
+    builder.add("""
 # Reflection Task
 Based on your performance history, update your beliefs:
 - If scores improved when you invested more in evaluation engineering, the benchmark might be more exploitable
 - If scores improved when you invested more in fundamental research, the benchmark might be more valid
 - Consider whether your scores are converging to your believed capability
 
-Output your updated beliefs as JSON."""
+Output your updated beliefs as JSON.""")
 
-    return prompt
+    return builder.build()
 
 
 # --- Convenience Functions ---
@@ -1288,6 +2832,7 @@ def create_funder_planning_prompt(
     leaderboard: list,
     consumer_satisfaction: Optional[float],
     recent_history: list,
+    budget: Optional[int] = None,
 ) -> str:
     """
     Create a prompt for the funder to decide funding allocations.
@@ -1301,20 +2846,22 @@ def create_funder_planning_prompt(
         leaderboard: List of (provider_name, score) tuples
         consumer_satisfaction: Average consumer satisfaction (if available)
         recent_history: List of recent funding allocations
+        budget: Token budget (default: get_prompt_budget("funder_planning"))
 
     Returns:
         Prompt string
     """
-    prompt = f"""# Funder Profile
+    builder = PromptBuilder("funder_planning", budget)
+    builder.add(f"""# Funder Profile
 Name: {name}
 Type: {funder_type}
 Total Capital: ${total_capital:,.0f}
 
 # Current Ecosystem State
-"""
+""")
 
     if leaderboard:
-        prompt += "\nLeaderboard:\n"
+        builder.add("\nLeaderboard:\n")
         for rank, (provider_name, score) in enumerate(leaderboard, 1):
             quality = believed_provider_quality.get(provider_name, "N/A")
             gaming = believed_provider_gaming.get(provider_name, "N/A")
@@ -1322,19 +2869,22 @@ Total Capital: ${total_capital:,.0f}
                 quality = f"{quality:.2f}"
             if isinstance(gaming, float):
                 gaming = f"{gaming:.2f}"
-            prompt += f"  {rank}. {provider_name}: score={score:.3f}, inferred_quality={quality}, gaming_risk={gaming}\n"
+            builder.add(f"  {rank}. {provider_name}: score={score:.3f}, inferred_quality={quality}, gaming_risk={gaming}\n")
 
     if consumer_satisfaction is not None:
-        prompt += f"\nOverall Consumer Satisfaction: {consumer_satisfaction:.2f}\n"
+        builder.add(f"\nOverall Consumer Satisfaction: {consumer_satisfaction:.2f}\n")
 
     if recent_history:
-        prompt += "\n# Recent Funding History\n"
-        for round_num, allocations in recent_history[-3:]:
-            prompt += f"Round {round_num}: "
-            alloc_strs = [f"{p}: ${a:,.0f}" for p, a in allocations.items()]
-            prompt += ", ".join(alloc_strs) + "\n"
+        builder.add("\n# Recent Funding History\n")
+        entries = recent_history[-3:]
+        builder.add_rows(
+            [f"Round {round_num}: " + ", ".join(f"{p}: ${a:,.0f}" for p, a in allocations.items()) + "\n"
+             for round_num, allocations in entries],
+            entries,
+            summarize=lambda dropped: f"Rounds {dropped[0][0]}-{dropped[-1][0]}: {len(dropped)} earlier allocations omitted\n",
+        )
 
-    prompt += f"""
+    builder.add(f"""
 # Decision Required
 Based on your funder type ({funder_type}) and the current ecosystem state, decide how to allocate your ${total_capital:,.0f} across the providers.
 
@@ -1344,9 +2894,9 @@ Consider:
 3. Provider quality trends
 4. Risk tolerance appropriate for your funder type
 
-Output your decision as JSON."""
+Output your decision as JSON.""")
 
-    return prompt
+    return builder.build()
 
 
 def llm_plan_funding(
@@ -0,0 +1,198 @@
+"""
+Mock Ollama Server for Offline Load Tests
+
+Serves the Ollama HTTP API subset OllamaProvider uses, answering with the
+same seeded, schema-valid JSON as the in-process mock provider (MockBackend
+in llm.py), so the real HTTP path -- connection handling, throttling,
+retries, deadlines -- can be load-tested without a model or a network:
+
+    GET  /api/tags       model list (OllamaProvider's connection check)
+    POST /api/generate   {"model", "prompt", "system"?, "stream"?, "options"?}
+
+Non-streaming requests get one JSON object after the sampled latency;
+streaming requests (Ollama's default) get NDJSON chunks with the latency
+spread across them, ending with a "done": true chunk carrying token counts.
+Injected failures return HTTP 500; malformed replies break off mid-JSON
+into prose.
+
+Usage:
+    python mock_llm_server.py --port 11435 --latency lognormal:0.5,0.4 --failure-rate 0.05
+    LLM_PROVIDER=ollama OLLAMA_BASE_URL=http://localhost:11435 python run_llm_now.py -r 5
+
+    # Or in-process, on a free port:
+    server = serve_mock_llm(port=0, seed=1, latency="exp:0.2")
+    base_url = "http://127.0.0.1:%d" % server.server_address[1]
+    ...
+    server.shutdown()
+"""
+import argparse
+import json
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from llm import MockBackend, estimate_tokens
+
+
+class MockOllamaHandler(BaseHTTPRequestHandler):
+    """Request handler; the MockBackend and model name live on the server."""
+
+    protocol_version = "HTTP/1.1"  # Keep-alive, like the real server
+    disable_nagle_algorithm = True  # Headers and body go out as separate writes
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def _send_json(self, status: int, body: dict):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        if self.path == "/api/tags":
+            self._send_json(200, {"models": [{"name": self.server.model, "model": self.server.model}]})
+        elif self.path == "/api/version":
+            self._send_json(200, {"version": "mock"})
+        else:
+            self._send_json(404, {"error": f"unknown path {self.path}"})
+
+    def do_POST(self):
+        if self.path != "/api/generate":
+            self._send_json(404, {"error": f"unknown path {self.path}"})
+            return
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            payload = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            self._send_json(400, {"error": "invalid JSON body"})
+            return
+
+        prompt = payload.get("prompt", "")
+        system_prompt = payload.get("system")
+        if system_prompt is None and prompt.startswith("System: ") and "\n\nUser: " in prompt:
+            # OllamaProvider folds the system prompt into the prompt text
+            system_prompt, prompt = prompt[len("System: "):].split("\n\nUser: ", 1)
+
+        outcome, text, latency_s = self.server.backend.respond(prompt, system_prompt)
+        if outcome == "failed":
+            time.sleep(latency_s)
+            self._send_json(500, {"error": "mock backend failure"})
+            return
+
+        model = payload.get("model") or self.server.model
+        final = {
+            "model": model,
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "response": "",
+            "done": True,
+            "done_reason": "stop",
+            "total_duration": int(latency_s * 1e9),
+            "prompt_eval_count": estimate_tokens(f"{system_prompt or ''}{prompt}"),
+            "eval_count": estimate_tokens(text),
+        }
+
+        if not payload.get("stream", True):
+            time.sleep(latency_s)
+            final["response"] = text
+            self._send_json(200, final)
+            return
+
+        chunks = self.server.backend.chunks(text)
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        try:
+            for chunk in chunks:
+                time.sleep(latency_s / len(chunks))
+                self._write_chunk({"model": model, "created_at": final["created_at"],
+                                   "response": chunk, "done": False})
+            self._write_chunk(final)
+            self.wfile.write(b"0\r\n\r\n")
+        except (BrokenPipeError, ConnectionResetError):
+            # Client stopped reading early (e.g. once it had a full JSON object)
+            self.close_connection = True
+
+    def _write_chunk(self, body: dict):
+        data = json.dumps(body).encode() + b"\n"
+        self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+        self.wfile.flush()
+
+
+class MockOllamaServer(ThreadingHTTPServer):
+    """Threaded server that treats clients hanging up mid-stream as normal."""
+
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+
+def serve_mock_llm(
+    host: str = "127.0.0.1",
+    port: int = 11435,
+    model: str = "mock",
+    verbose: bool = False,
+    **backend_kwargs,
+) -> MockOllamaServer:
+    """
+    Start a mock Ollama server on a background daemon thread.
+
+    Args:
+        host: Interface to bind
+        port: Port to bind (0 = any free port; see server.server_address)
+        model: Model name reported by /api/tags
+        verbose: Log each request to stderr
+        **backend_kwargs: MockBackend arguments (seed, latency,
+            failure_rate, malformed_rate)
+
+    Returns:
+        The running server; call server.shutdown() to stop it
+    """
+    server = MockOllamaServer((host, port), MockOllamaHandler)
+    server.backend = MockBackend(**backend_kwargs)
+    server.model = model
+    server.verbose = verbose
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Mock Ollama server returning seeded, schema-valid simulation replies",
+    )
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=11435)
+    parser.add_argument("--model", default="mock", help="Model name reported by /api/tags")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--latency", default=None,
+                        help='Latency spec: "0.2", "uniform:lo,hi", "normal:mean,sd", '
+                             '"lognormal:median,sigma" or "exp:mean" (seconds)')
+    parser.add_argument("--failure-rate", type=float, default=0.0,
+                        help="Probability a request returns HTTP 500")
+    parser.add_argument("--malformed-rate", type=float, default=0.0,
+                        help="Probability a reply breaks off mid-JSON into prose")
+    parser.add_argument("--verbose", "-v", action="store_true", help="Log each request")
+    args = parser.parse_args()
+
+    server = serve_mock_llm(
+        host=args.host, port=args.port, model=args.model, verbose=args.verbose,
+        seed=args.seed, latency=args.latency,
+        failure_rate=args.failure_rate, malformed_rate=args.malformed_rate,
+    )
+    print(f"Mock Ollama server on http://{args.host}:{server.server_address[1]} (Ctrl-C to stop)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
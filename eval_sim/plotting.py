@@ -10,6 +10,9 @@ import matplotlib.patches as mpatches
 import numpy as np
 from typing import Optional
 
+from analysis_frame import AnalysisFrame
+from history_store import ColumnarHistory
+
 
 # =============================================================================
 # Color Palettes and Styling
@@ -59,8 +62,12 @@ def style_axis(ax, title: str, xlabel: str, ylabel: str, legend: bool = True):
 # Data Extraction Helpers
 # =============================================================================
 
-def get_providers(history: list) -> list:
-    """Extract provider names from history."""
+def get_providers(history) -> list:
+    """Extract provider names from history (round dicts, ColumnarHistory or AnalysisFrame)."""
+    if isinstance(history, AnalysisFrame):
+        return list(history.providers)
+    if isinstance(history, ColumnarHistory):
+        return history.keys("scores")
     if not history:
         return []
     return list(history[0]["scores"].keys())
@@ -76,44 +83,34 @@ def get_strategy_key(history: list) -> str:
     return "old"
 
 
-def extract_investment(history: list, provider: str, investment_type: str) -> list:
+def extract_investment(history, provider: str, investment_type: str) -> list:
     """Extract investment values for a provider over time."""
+    if isinstance(history, AnalysisFrame):
+        if investment_type not in history.investments:
+            return [0] * len(history)
+        return history.investments[investment_type][:, history.provider_index(provider)].tolist()
+    if isinstance(history, ColumnarHistory):
+        if not history.has("strategies", provider, investment_type):
+            return [0] * len(history)
+        values = history.column("strategies", provider, investment_type)
+        present = history.present_mask("strategies", provider, investment_type)
+        return np.where(present, values, 0).tolist()
     return [h["strategies"][provider].get(investment_type, 0) for h in history]
 
 
-def compute_rolling_correlation(history: list, window_size: int = 5) -> tuple:
+def compute_rolling_correlation(history, window_size: int = 5) -> tuple:
     """Compute rolling correlation between scores and true capabilities.
 
     Returns (rounds, correlations) where rounds are actual round numbers
-    (from history[i]["round"]), not array indices.
+    (from history[i]["round"]), not array indices. Accepts round dicts, a
+    ColumnarHistory or an AnalysisFrame (which caches the result).
     """
     if len(history) < window_size:
         return [], []
+    return AnalysisFrame.of(history).rolling_validity(window_size)
 
-    providers = get_providers(history)
-    correlations = []
-    rounds_used = []
-
-    for i in range(window_size, len(history) + 1):
-        window = history[i - window_size:i]
-        all_scores = []
-        all_caps = []
-        for h in window:
-            for provider in providers:
-                all_scores.append(h["scores"][provider])
-                all_caps.append(h["true_capabilities"][provider])
-
-        if len(all_scores) >= 2:
-            corr = np.corrcoef(all_scores, all_caps)[0, 1]
-            if not np.isnan(corr):
-                correlations.append(corr)
-                # Use actual round number from history, not array index
-                rounds_used.append(history[i - 1]["round"])
-
-    return rounds_used, correlations
 
-
-def compute_per_benchmark_rolling_correlation(history: list, window_size: int = 5) -> dict:
+def compute_per_benchmark_rolling_correlation(history, window_size: int = 5) -> dict:
     """Compute rolling correlation per benchmark.
 
     Returns {benchmark_name: (rounds, correlations)} where each benchmark
@@ -121,48 +118,7 @@ def compute_per_benchmark_rolling_correlation(history: list, window_size: int =
     """
     if len(history) < window_size:
         return {}
-
-    # Check if we have per-benchmark data
-    if not history or "per_benchmark_scores" not in history[0]:
-        return {}
-
-    providers = get_providers(history)
-
-    # Get all benchmark names across all rounds
-    all_benchmarks = set()
-    for h in history:
-        if "per_benchmark_scores" in h:
-            all_benchmarks.update(h["per_benchmark_scores"].keys())
-
-    benchmark_correlations = {}
-
-    for benchmark in all_benchmarks:
-        correlations = []
-        rounds_used = []
-
-        for i in range(window_size, len(history) + 1):
-            window = history[i - window_size:i]
-            benchmark_scores = []
-            benchmark_caps = []
-
-            for h in window:
-                per_bm = h.get("per_benchmark_scores", {})
-                if benchmark in per_bm:
-                    for provider in providers:
-                        if provider in per_bm[benchmark]:
-                            benchmark_scores.append(per_bm[benchmark][provider])
-                            benchmark_caps.append(h["true_capabilities"][provider])
-
-            if len(benchmark_scores) >= 2:
-                corr = np.corrcoef(benchmark_scores, benchmark_caps)[0, 1]
-                if not np.isnan(corr):
-                    correlations.append(corr)
-                    rounds_used.append(history[i - 1]["round"])
-
-        if correlations:
-            benchmark_correlations[benchmark] = (rounds_used, correlations)
-
-    return benchmark_correlations
+    return AnalysisFrame.of(history).rolling_benchmark_validity(window_size)
 
 
 def categorize_headline(headline: str) -> str:
@@ -205,7 +161,7 @@ def plot_provider_dashboard(
     6. Capability Growth comparison
 
     Args:
-        history: List of round data dicts
+        history: List of round data dicts (or a ColumnarHistory / AnalysisFrame)
         save_path: Path to save figure
         show: Whether to display
         figsize: Figure size
@@ -213,35 +169,35 @@ def plot_provider_dashboard(
     Returns:
         matplotlib Figure or None
     """
-    if not history:
+    frame = AnalysisFrame.of(history)
+    if not frame:
         print("No history to plot")
         return None
 
-    providers = get_providers(history)
+    providers = get_providers(frame)
     n_providers = len(providers)
     colors = get_provider_colors(n_providers)
     provider_colors = {p: colors[i] for i, p in enumerate(providers)}
     inv_colors = get_investment_colors()
 
-    rounds = [h["round"] for h in history]
+    rounds = frame.rounds
 
     fig, axes = plt.subplots(2, 3, figsize=figsize)
     fig.suptitle("Provider Dashboard", fontsize=14, fontweight='bold')
 
     # --- Panel 1: Scores over time ---
     ax1 = axes[0, 0]
-    for provider in providers:
-        scores = [h["scores"][provider] for h in history]
-        ax1.plot(rounds, scores, 'o-', label=provider, color=provider_colors[provider],
+    for j, provider in enumerate(providers):
+        ax1.plot(rounds, frame.scores[:, j], 'o-', label=provider, color=provider_colors[provider],
                  markersize=3, linewidth=1.5, alpha=0.8)
     ax1.set_ylim(0, 1)
     style_axis(ax1, "Benchmark Scores Over Time", "Round", "Score")
 
     # --- Panel 2: True vs Believed Capability ---
     ax2 = axes[0, 1]
-    for provider in providers:
-        true_caps = [h["true_capabilities"][provider] for h in history]
-        believed_caps = [h["believed_capabilities"][provider] for h in history]
+    for j, provider in enumerate(providers):
+        true_caps = frame.capabilities[:, j]
+        believed_caps = frame.believed[:, j]
         ax2.plot(rounds, true_caps, '-', color=provider_colors[provider], linewidth=2)
         ax2.plot(rounds, believed_caps, '--', color=provider_colors[provider],
                  linewidth=1.5, alpha=0.6)
@@ -290,7 +246,7 @@ def plot_provider_dashboard(
         # Stacked area chart for this provider
         bottom = np.zeros(len(rounds))
         for inv_type in investment_types:
-            values = np.array(extract_investment(history, provider, inv_type))
+            values = np.array(extract_investment(frame, provider, inv_type))
             sub_ax.fill_between(rounds, bottom, bottom + values,
                                alpha=0.7, color=inv_colors[inv_type])
             bottom += values
@@ -319,7 +275,7 @@ def plot_provider_dashboard(
     # --- Panel 4: Evaluation Engineering (Gaming) Over Time ---
     ax4 = axes[1, 0]
     for provider in providers:
-        eval_eng = extract_investment(history, provider, "evaluation_engineering")
+        eval_eng = extract_investment(frame, provider, "evaluation_engineering")
         ax4.plot(rounds, eval_eng, 'o-', label=provider, color=provider_colors[provider],
                  markersize=3, linewidth=2)
     ax4.axhline(y=0.25, color='gray', linestyle=':', alpha=0.5, label='Balanced (0.25)')
@@ -328,10 +284,8 @@ def plot_provider_dashboard(
 
     # --- Panel 5: Score - Capability Gap ---
     ax5 = axes[1, 1]
-    for provider in providers:
-        scores = np.array([h["scores"][provider] for h in history])
-        true_caps = np.array([h["true_capabilities"][provider] for h in history])
-        gap = scores - true_caps
+    for j, provider in enumerate(providers):
+        gap = frame.scores[:, j] - frame.capabilities[:, j]
         ax5.plot(rounds, gap, 'o-', label=provider, color=provider_colors[provider],
                  markersize=3, linewidth=2)
     ax5.axhline(y=0, color='black', linestyle='-', linewidth=1, alpha=0.5)
@@ -341,9 +295,7 @@ def plot_provider_dashboard(
 
     # --- Panel 6: Capability Growth Bar Chart ---
     ax6 = axes[1, 2]
-    initial_caps = [history[0]["true_capabilities"][p] for p in providers]
-    final_caps = [history[-1]["true_capabilities"][p] for p in providers]
-    growth = [f - i for i, f in zip(initial_caps, final_caps)]
+    growth = (frame.capabilities[-1] - frame.capabilities[0]).tolist()
 
     x = np.arange(len(providers))
     bars = ax6.bar(x, growth, color=[provider_colors[p] for p in providers], alpha=0.8)
@@ -393,7 +345,7 @@ def plot_consumer_dashboard(
     6. Satisfaction Gap (Score - Satisfaction)
 
     Args:
-        history: List of round data dicts
+        history: List of round data dicts (or a ColumnarHistory / AnalysisFrame)
         save_path: Path to save figure
         show: Whether to display
         figsize: Figure size
@@ -401,15 +353,20 @@ def plot_consumer_dashboard(
     Returns:
         matplotlib Figure or None
     """
-    consumer_rounds = [h for h in history if "consumer_data" in h]
-    if not consumer_rounds:
+    frame = AnalysisFrame.of(history)
+    if not frame.consumer_mask.any():
         print("No consumer data to plot")
         return None
+    consumer_rounds = [h for h in frame.history if "consumer_data" in h]
 
-    providers = get_providers(history)
+    providers = get_providers(frame)
     provider_colors = {p: c for p, c in zip(providers, get_provider_colors(len(providers)))}
 
-    rounds = [h["round"] for h in consumer_rounds]
+    rounds = frame.rounds[frame.consumer_mask]
+    market_shares = np.nan_to_num(frame.market_shares[frame.consumer_mask], nan=0.0)
+    provider_satisfaction = np.nan_to_num(
+        frame.provider_satisfaction[frame.consumer_mask], nan=0.0
+    )
 
     fig, axes = plt.subplots(2, 3, figsize=figsize)
     fig.suptitle("Consumer Dashboard", fontsize=14, fontweight='bold')
@@ -533,16 +490,10 @@ def plot_consumer_dashboard(
     ax4 = axes[1, 0]
 
     # Use market_shares (proportions) from consumer_data
-    market_share = {p: [] for p in providers}
-    for h in consumer_rounds:
-        shares = h["consumer_data"].get("market_shares", {})
-        for p in providers:
-            market_share[p].append(shares.get(p, 0))
-
     # Stacked area chart
     bottom = np.zeros(len(rounds))
-    for provider in providers:
-        values = np.array(market_share[provider])
+    for j, provider in enumerate(providers):
+        values = market_shares[:, j]
         ax4.fill_between(rounds, bottom, bottom + values,
                         alpha=0.7, label=provider, color=provider_colors[provider])
         bottom += values
@@ -555,12 +506,8 @@ def plot_consumer_dashboard(
 
     avg_satisfaction = [h["consumer_data"].get("avg_satisfaction", 0) for h in consumer_rounds]
 
-    for provider in providers:
-        prov_sats = []
-        for h in consumer_rounds:
-            prov_sat = h["consumer_data"].get("provider_satisfaction", {})
-            prov_sats.append(prov_sat.get(provider, 0))
-        ax5.plot(rounds, prov_sats, 'o-', label=provider, color=provider_colors[provider],
+    for j, provider in enumerate(providers):
+        ax5.plot(rounds, provider_satisfaction[:, j], 'o-', label=provider, color=provider_colors[provider],
                  markersize=3, linewidth=2)
 
     ax5.plot(rounds, avg_satisfaction, 'k--', linewidth=1.5, alpha=0.5, label='Market Avg')
@@ -570,11 +517,9 @@ def plot_consumer_dashboard(
     # --- Panel 6: Satisfaction Gap (Score - Satisfaction) ---
     ax6 = axes[1, 2]
 
-    for provider in providers:
-        scores = [h["scores"][provider] for h in consumer_rounds]
-        prov_sats = [h["consumer_data"].get("provider_satisfaction", {}).get(provider, 0)
-                     for h in consumer_rounds]
-        gap = [s - sat for s, sat in zip(scores, prov_sats)]
+    consumer_scores = frame.scores[frame.consumer_mask]
+    for j, provider in enumerate(providers):
+        gap = consumer_scores[:, j] - provider_satisfaction[:, j]
         ax6.plot(rounds, gap, 'o-', label=provider, color=provider_colors[provider],
                  markersize=3, linewidth=2)
     ax6.axhline(y=0, color='black', linestyle='-', linewidth=1, alpha=0.5)
@@ -614,7 +559,7 @@ def plot_policymaker_dashboard(
     4. Intervention Types Distribution
 
     Args:
-        history: List of round data dicts
+        history: List of round data dicts (or a ColumnarHistory / AnalysisFrame)
         save_path: Path to save figure
         show: Whether to display
         figsize: Figure size
@@ -622,12 +567,13 @@ def plot_policymaker_dashboard(
     Returns:
         matplotlib Figure or None
     """
-    policymaker_rounds = [h for h in history if "policymaker_data" in h]
-    if not policymaker_rounds:
+    frame = AnalysisFrame.of(history)
+    if not frame.policymaker_mask.any():
         print("No policymaker data to plot")
         return None
+    history = frame.history
 
-    rounds = [h["round"] for h in history]
+    rounds = frame.rounds.tolist()
 
     # Extract intervention data
     intervention_rounds = []
@@ -646,7 +592,7 @@ def plot_policymaker_dashboard(
 
     # --- Panel 1: Validity Correlation with Interventions ---
     ax1 = axes[0, 0]
-    validity_rounds, validity_values = compute_rolling_correlation(history)
+    validity_rounds, validity_values = compute_rolling_correlation(frame)
 
     if validity_values:
         ax1.plot(validity_rounds, validity_values, 'o-', color='#457B9D',
@@ -741,7 +687,7 @@ def plot_evaluator_dashboard(
     4. Score Distribution by Provider
 
     Args:
-        history: List of round data dicts
+        history: List of round data dicts (or a ColumnarHistory / AnalysisFrame)
         save_path: Path to save figure
         show: Whether to display
         figsize: Figure size
@@ -749,22 +695,23 @@ def plot_evaluator_dashboard(
     Returns:
         matplotlib Figure or None
     """
-    if not history:
+    frame = AnalysisFrame.of(history)
+    if not frame:
         print("No history to plot")
         return None
 
-    providers = get_providers(history)
+    providers = get_providers(frame)
     provider_colors = {p: c for p, c in zip(providers, get_provider_colors(len(providers)))}
-    rounds = [h["round"] for h in history]
+    rounds = frame.rounds
 
-    has_multi_benchmark = "per_benchmark_scores" in history[0]
+    has_multi_benchmark = frame.has_per_benchmark
 
     fig, axes = plt.subplots(2, 2, figsize=figsize)
     fig.suptitle("Evaluator Dashboard (Benchmark Analysis)", fontsize=14, fontweight='bold')
 
     # --- Panel 1: Validity Correlation Over Time ---
     ax1 = axes[0, 0]
-    validity_rounds, validity_values = compute_rolling_correlation(history)
+    validity_rounds, validity_values = compute_rolling_correlation(frame)
 
     if validity_values:
         ax1.plot(validity_rounds, validity_values, 'o-', color='#2A9D8F',
@@ -777,27 +724,21 @@ def plot_evaluator_dashboard(
 
     # --- Panel 2: Score vs True Capability Scatter ---
     ax2 = axes[0, 1]
-    for provider in providers:
-        scores = [h["scores"][provider] for h in history]
-        true_caps = [h["true_capabilities"][provider] for h in history]
-        ax2.scatter(true_caps, scores, label=provider, color=provider_colors[provider],
-                   alpha=0.6, s=30)
+    for j, provider in enumerate(providers):
+        ax2.scatter(frame.capabilities[:, j], frame.scores[:, j], label=provider,
+                   color=provider_colors[provider], alpha=0.6, s=30)
 
     # Perfect validity line
-    all_vals = []
-    for provider in providers:
-        all_vals.extend([h["scores"][provider] for h in history])
-        all_vals.extend([h["true_capabilities"][provider] for h in history])
-    if all_vals:
-        min_val, max_val = min(all_vals), max(all_vals)
+    paired = ~(np.isnan(frame.scores) | np.isnan(frame.capabilities))
+    all_scores = frame.scores[paired]
+    all_caps = frame.capabilities[paired]
+    if len(all_scores):
+        min_val = min(all_scores.min(), all_caps.min())
+        max_val = max(all_scores.max(), all_caps.max())
         ax2.plot([min_val, max_val], [min_val, max_val], 'k--', alpha=0.3,
                  label='Perfect Validity')
 
     # Compute overall correlation
-    all_scores, all_caps = [], []
-    for provider in providers:
-        all_scores.extend([h["scores"][provider] for h in history])
-        all_caps.extend([h["true_capabilities"][provider] for h in history])
     if len(all_scores) >= 2:
         corr = np.corrcoef(all_scores, all_caps)[0, 1]
         ax2.set_title(f"Score vs True Capability (r = {corr:.2f})", fontsize=11, fontweight='bold')
@@ -811,6 +752,7 @@ def plot_evaluator_dashboard(
     # --- Panel 3: Per-Benchmark Scores or Score Trends ---
     ax3 = axes[1, 0]
     if has_multi_benchmark:
+        history = frame.history
         # Collect ALL benchmark names across all rounds (handles mid-simulation introductions)
         all_benchmark_names = set()
         for h in history:
@@ -831,16 +773,16 @@ def plot_evaluator_dashboard(
 
         # Plot average score per benchmark over time
         for i, bench_name in enumerate(benchmark_names):
-            bench_avgs = []
-            bench_rounds = []  # Track rounds where this benchmark exists
-            for h in history:
-                bench_scores = h.get("per_benchmark_scores", {}).get(bench_name, {})
-                if bench_scores:
-                    bench_avgs.append(np.mean(list(bench_scores.values())))
-                    bench_rounds.append(h["round"])
+            bench_scores = frame.benchmark_scores.get(bench_name)
+            if bench_scores is None:
+                continue
+            # Rounds where this benchmark exists
+            scored = ~np.isnan(bench_scores).all(axis=1)
+            bench_rounds = rounds[scored]
+            bench_avgs = np.nanmean(bench_scores[scored], axis=1)
 
             # Only plot if benchmark has data
-            if bench_avgs:
+            if len(bench_avgs):
                 ax3.plot(bench_rounds, bench_avgs, 'o-', label=bench_name,
                         color=bench_colors[i], markersize=3, linewidth=2)
 
@@ -854,19 +796,17 @@ def plot_evaluator_dashboard(
         style_axis(ax3, "Average Score by Benchmark", "Round", "Score")
     else:
         # Single benchmark - show score trends
-        for provider in providers:
-            scores = [h["scores"][provider] for h in history]
-            ax3.plot(rounds, scores, 'o-', label=provider, color=provider_colors[provider],
-                    markersize=3, linewidth=1.5)
+        for j, provider in enumerate(providers):
+            ax3.plot(rounds, frame.scores[:, j], 'o-', label=provider,
+                    color=provider_colors[provider], markersize=3, linewidth=1.5)
         ax3.set_ylim(0, 1)
         style_axis(ax3, "Score Trends", "Round", "Score")
 
     # --- Panel 4: Score Distribution Box Plot ---
     ax4 = axes[1, 1]
-    score_data = []
-    for provider in providers:
-        scores = [h["scores"][provider] for h in history]
-        score_data.append(scores)
+    score_data = [
+        frame.scores[~np.isnan(frame.scores[:, j]), j] for j in range(len(providers))
+    ]
 
     bp = ax4.boxplot(score_data, labels=providers, patch_artist=True)
     for patch, provider in zip(bp['boxes'], providers):
@@ -909,7 +849,7 @@ def plot_summary_dashboard(
     Row 3: Consumer Satisfaction | Market Share | Interventions
 
     Args:
-        history: List of round data dicts
+        history: List of round data dicts (or a ColumnarHistory / AnalysisFrame)
         save_path: Path to save figure
         show: Whether to display
         figsize: Figure size
@@ -919,19 +859,21 @@ def plot_summary_dashboard(
     Returns:
         matplotlib Figure or None
     """
-    if not history:
+    frame = AnalysisFrame.of(history)
+    if not frame:
         print("No history to plot")
         return None
+    history = frame.history
 
-    providers = get_providers(history)
+    providers = get_providers(frame)
     n_providers = len(providers)
     colors = get_provider_colors(n_providers)
     provider_colors = {p: colors[i] for i, p in enumerate(providers)}
     inv_colors = get_investment_colors()
 
-    rounds = [h["round"] for h in history]
-    has_consumers = any("consumer_data" in h for h in history)
-    has_policymakers = any("policymaker_data" in h for h in history)
+    rounds = frame.rounds.tolist()
+    has_consumers = bool(frame.consumer_mask.any())
+    has_policymakers = bool(frame.policymaker_mask.any())
 
     fig, axes = plt.subplots(3, 3, figsize=figsize)
 
@@ -945,7 +887,7 @@ def plot_summary_dashboard(
     subtitle_parts.append(f"{n_rounds} rounds")
     subtitle_parts.append(f"Providers: {provider_names}")
 
-    has_funders = any("funder_data" in h for h in history)
+    has_funders = bool(frame.funder_mask.any())
 
     # Add metadata if provided
     if metadata:
@@ -985,18 +927,17 @@ def plot_summary_dashboard(
 
     # --- Panel 1,1: Scores Over Time ---
     ax = axes[0, 0]
-    for provider in providers:
-        scores = [h["scores"][provider] for h in history]
-        ax.plot(rounds, scores, 'o-', label=provider, color=provider_colors[provider],
+    for j, provider in enumerate(providers):
+        ax.plot(rounds, frame.scores[:, j], 'o-', label=provider, color=provider_colors[provider],
                 markersize=3, linewidth=1.5, alpha=0.8)
     ax.set_ylim(0, 1)
     style_axis(ax, "Benchmark Scores", "Round", "Score")
 
     # --- Panel 1,2: True vs Believed Capability ---
     ax = axes[0, 1]
-    for provider in providers:
-        true_caps = [h["true_capabilities"][provider] for h in history]
-        believed_caps = [h["believed_capabilities"][provider] for h in history]
+    for j, provider in enumerate(providers):
+        true_caps = frame.capabilities[:, j]
+        believed_caps = frame.believed[:, j]
         ax.plot(rounds, true_caps, '-', color=provider_colors[provider], linewidth=2)
         ax.plot(rounds, believed_caps, '--', color=provider_colors[provider],
                 linewidth=1.5, alpha=0.6)
@@ -1019,7 +960,7 @@ def plot_summary_dashboard(
         provider = providers[0]
         bottom = np.zeros(len(rounds))
         for inv_type in investment_types:
-            values = np.array(extract_investment(history, provider, inv_type))
+            values = np.array(extract_investment(frame, provider, inv_type))
             ax.fill_between(rounds, bottom, bottom + values, alpha=0.7,
                            label=inv_type.replace("_", " ").title()[:12],
                            color=inv_colors[inv_type])
@@ -1036,7 +977,7 @@ def plot_summary_dashboard(
     # --- Panel 2,1: Evaluation Engineering ---
     ax = axes[1, 0]
     for provider in providers:
-        eval_eng = extract_investment(history, provider, "evaluation_engineering")
+        eval_eng = extract_investment(frame, provider, "evaluation_engineering")
         ax.plot(rounds, eval_eng, 'o-', label=provider, color=provider_colors[provider],
                 markersize=3, linewidth=2)
     ax.axhline(y=0.25, color='gray', linestyle=':', alpha=0.5)
@@ -1047,7 +988,7 @@ def plot_summary_dashboard(
     ax = axes[1, 1]
 
     # Try per-benchmark correlations
-    per_benchmark = compute_per_benchmark_rolling_correlation(history)
+    per_benchmark = compute_per_benchmark_rolling_correlation(frame)
 
     if per_benchmark:
         # Plot per-benchmark correlations
@@ -1060,7 +1001,7 @@ def plot_summary_dashboard(
                    color=bm_colors[i], markersize=3, linewidth=1.5)
 
         # Overall as dashed line
-        validity_rounds, validity_values = compute_rolling_correlation(history)
+        validity_rounds, validity_values = compute_rolling_correlation(frame)
         if validity_values:
             ax.plot(validity_rounds, validity_values, '--', color='black',
                    linewidth=2, alpha=0.5, label='Overall')
@@ -1068,7 +1009,7 @@ def plot_summary_dashboard(
         ax.legend(loc='best', fontsize=7)
     else:
         # Fallback to overall
-        validity_rounds, validity_values = compute_rolling_correlation(history)
+        validity_rounds, validity_values = compute_rolling_correlation(frame)
         if validity_values:
             ax.plot(validity_rounds, validity_values, 'o-', color='#2A9D8F',
                     markersize=4, linewidth=2)
@@ -1081,10 +1022,8 @@ def plot_summary_dashboard(
 
     # --- Panel 2,3: Score - Capability Gap ---
     ax = axes[1, 2]
-    for provider in providers:
-        scores = np.array([h["scores"][provider] for h in history])
-        true_caps = np.array([h["true_capabilities"][provider] for h in history])
-        gap = scores - true_caps
+    for j, provider in enumerate(providers):
+        gap = frame.scores[:, j] - frame.capabilities[:, j]
         ax.plot(rounds, gap, 'o-', label=provider, color=provider_colors[provider],
                 markersize=3, linewidth=2)
     ax.axhline(y=0, color='black', linestyle='-', linewidth=1, alpha=0.5)
@@ -1113,18 +1052,12 @@ def plot_summary_dashboard(
     # --- Panel 3,2: Market Share ---
     ax = axes[2, 1]
     if has_consumers:
-        consumer_rounds_data = [h for h in history if "consumer_data" in h]
-        if consumer_rounds_data:
-            market_share = {p: [] for p in providers}
-            plot_rounds = [h["round"] for h in consumer_rounds_data]
-            for h in consumer_rounds_data:
-                shares = h["consumer_data"].get("market_shares", {})
-                for p in providers:
-                    market_share[p].append(shares.get(p, 0))
-
+        plot_rounds = frame.rounds[frame.consumer_mask]
+        market_shares = np.nan_to_num(frame.market_shares[frame.consumer_mask], nan=0.0)
+        if len(plot_rounds):
             bottom = np.zeros(len(plot_rounds))
-            for provider in providers:
-                values = np.array(market_share[provider])
+            for j, provider in enumerate(providers):
+                values = market_shares[:, j]
                 ax.fill_between(plot_rounds, bottom, bottom + values, alpha=0.7,
                                label=provider, color=provider_colors[provider])
                 bottom += values
@@ -1178,19 +1111,18 @@ def plot_scores_over_time(
     show: bool = True,
 ) -> Optional[plt.Figure]:
     """Plot benchmark scores over time."""
-    if not history:
+    frame = AnalysisFrame.of(history)
+    if not frame:
         return None
 
-    providers = get_providers(history)
+    providers = get_providers(frame)
     provider_colors = {p: c for p, c in zip(providers, get_provider_colors(len(providers)))}
-    rounds = [h["round"] for h in history]
 
     fig, ax = plt.subplots(figsize=(10, 6))
 
-    for provider in providers:
-        scores = [h["scores"][provider] for h in history]
-        ax.plot(rounds, scores, 'o-', label=provider, color=provider_colors[provider],
-                markersize=4, linewidth=2)
+    for j, provider in enumerate(providers):
+        ax.plot(frame.rounds, frame.scores[:, j], 'o-', label=provider,
+                color=provider_colors[provider], markersize=4, linewidth=2)
 
     ax.set_ylim(0, 1)
     style_axis(ax, "Benchmark Scores Over Time", "Round", "Score")
@@ -1218,8 +1150,10 @@ def plot_validity_over_time(
         print(f"Need at least {window_size} rounds")
         return None
 
+    frame = AnalysisFrame.of(history)
+
     # Try per-benchmark correlations first
-    per_benchmark = compute_per_benchmark_rolling_correlation(history, window_size)
+    per_benchmark = compute_per_benchmark_rolling_correlation(frame, window_size)
 
     fig, ax = plt.subplots(figsize=(12, 6))
 
@@ -1234,7 +1168,7 @@ def plot_validity_over_time(
                    color=colors[i], markersize=4, linewidth=2)
 
         # Also plot overall correlation as a thicker dashed line
-        validity_rounds, validity_values = compute_rolling_correlation(history, window_size)
+        validity_rounds, validity_values = compute_rolling_correlation(frame, window_size)
         if validity_values:
             ax.plot(validity_rounds, validity_values, '--', color='black',
                    linewidth=2.5, alpha=0.6, label='Overall')
@@ -1242,7 +1176,7 @@ def plot_validity_over_time(
         title = f"Benchmark Validity by Benchmark (window={window_size})"
     else:
         # Fallback to overall correlation
-        validity_rounds, validity_values = compute_rolling_correlation(history, window_size)
+        validity_rounds, validity_values = compute_rolling_correlation(frame, window_size)
         if not validity_values:
             return None
 
@@ -1275,10 +1209,11 @@ def plot_investment_comparison(
     show: bool = True,
 ) -> Optional[plt.Figure]:
     """Plot investment portfolio comparison across all providers."""
-    if not history:
+    frame = AnalysisFrame.of(history)
+    if not frame:
         return None
 
-    providers = get_providers(history)
+    providers = get_providers(frame)
     provider_colors = {p: c for p, c in zip(providers, get_provider_colors(len(providers)))}
     inv_colors = get_investment_colors()
     investment_types = list(inv_colors.keys())
@@ -1286,12 +1221,12 @@ def plot_investment_comparison(
     fig, axes = plt.subplots(2, 2, figsize=(14, 10))
     fig.suptitle("Investment Comparison Across Providers", fontsize=14, fontweight='bold')
 
-    rounds = [h["round"] for h in history]
+    rounds = frame.rounds
 
     for idx, inv_type in enumerate(investment_types):
         ax = axes[idx // 2, idx % 2]
         for provider in providers:
-            values = extract_investment(history, provider, inv_type)
+            values = extract_investment(frame, provider, inv_type)
             ax.plot(rounds, values, 'o-', label=provider, color=provider_colors[provider],
                     markersize=3, linewidth=2)
         ax.axhline(y=0.25, color='gray', linestyle=':', alpha=0.5)
@@ -1330,7 +1265,7 @@ def plot_funder_dashboard(
     4. Funder ROI Tracking (inferred from provider performance)
 
     Args:
-        history: List of round data dicts
+        history: List of round data dicts (or a ColumnarHistory / AnalysisFrame)
         save_path: Path to save figure
         show: Whether to display
         figsize: Figure size
@@ -1338,15 +1273,18 @@ def plot_funder_dashboard(
     Returns:
         matplotlib Figure or None
     """
-    funder_rounds = [h for h in history if "funder_data" in h]
-    if not funder_rounds:
+    frame = AnalysisFrame.of(history)
+    if not frame.funder_mask.any():
         print("No funder data to plot")
         return None
+    funder_rounds = [h for h in frame.history if "funder_data" in h]
 
-    providers = get_providers(history)
+    providers = get_providers(frame)
     provider_colors = {p: c for p, c in zip(providers, get_provider_colors(len(providers)))}
 
-    rounds = [h["round"] for h in funder_rounds]
+    rounds = frame.rounds[frame.funder_mask]
+    # Providers without a multiplier in a round count as unfunded (1.0)
+    multipliers = np.nan_to_num(frame.funding_multipliers[frame.funder_mask], nan=1.0)
 
     fig, axes = plt.subplots(2, 3, figsize=figsize)
     fig.suptitle("Funder Dashboard", fontsize=14, fontweight='bold')
@@ -1388,13 +1326,8 @@ def plot_funder_dashboard(
     # --- Panel 2: Provider Funding Multipliers Over Time ---
     ax2 = axes[0, 1]
 
-    for provider in providers:
-        multipliers = []
-        for h in funder_rounds:
-            fd = h["funder_data"]
-            mult = fd.get("funding_multipliers", {}).get(provider, 1.0)
-            multipliers.append(mult)
-        ax2.plot(rounds, multipliers, 'o-', label=provider, color=provider_colors[provider],
+    for j, provider in enumerate(providers):
+        ax2.plot(rounds, multipliers[:, j], 'o-', label=provider, color=provider_colors[provider],
                  markersize=4, linewidth=2)
 
     ax2.axhline(y=1.0, color='gray', linestyle='--', alpha=0.5, label='No Funding')
@@ -1417,18 +1350,15 @@ def plot_funder_dashboard(
 
     # For each provider, plot funding received vs capability growth
     # Use data from all rounds
-    for provider in providers:
+    initial_caps = np.nan_to_num(frame.capabilities[0], nan=0.5)
+    final_caps = np.nan_to_num(frame.capabilities[-1], nan=0.5)
+    for j, provider in enumerate(providers):
         # Get average funding multiplier
-        avg_multiplier = np.mean([
-            h["funder_data"].get("funding_multipliers", {}).get(provider, 1.0)
-            for h in funder_rounds
-        ])
+        avg_multiplier = multipliers[:, j].mean()
 
         # Get capability growth
-        if len(history) >= 2:
-            initial_cap = history[0]["true_capabilities"].get(provider, 0.5)
-            final_cap = history[-1]["true_capabilities"].get(provider, 0.5)
-            cap_growth = final_cap - initial_cap
+        if len(frame) >= 2:
+            cap_growth = final_caps[j] - initial_caps[j]
         else:
             cap_growth = 0
 
@@ -1469,20 +1399,11 @@ def plot_funder_dashboard(
 
     # --- Panel 6: Score Momentum (3-Round Avg Delta) ---
     ax6 = axes[1, 2]
-    for provider in providers:
-        scores = [h["scores"][provider] for h in history]
-        # Compute rolling 3-round average of score deltas
-        deltas = [scores[i] - scores[i - 1] for i in range(1, len(scores))]
-        window = 3
-        if len(deltas) >= window:
-            momentum = []
-            momentum_rounds = []
-            for i in range(window - 1, len(deltas)):
-                avg_delta = np.mean(deltas[i - window + 1:i + 1])
-                momentum.append(avg_delta)
-                # Round index corresponds to the end of the window
-                momentum_rounds.append(history[i + 1]["round"])
-            ax6.plot(momentum_rounds, momentum, 'o-', label=provider,
+    # Rolling 3-round average of score deltas, labelled by the window's last round
+    momentum_rounds, momentum = frame.score_momentum(window=3)
+    if len(momentum_rounds):
+        for j, provider in enumerate(providers):
+            ax6.plot(momentum_rounds, momentum[:, j], 'o-', label=provider,
                      color=provider_colors[provider], markersize=3, linewidth=2)
     ax6.axhline(y=0, color='black', linestyle='-', linewidth=1, alpha=0.5)
     style_axis(ax6, "Score Momentum (3-Round Avg Delta)", "Round", "Avg Delta")
@@ -1521,7 +1442,7 @@ def plot_media_dashboard(
     4. Risk Signals Per Round
 
     Args:
-        history: List of round data dicts
+        history: List of round data dicts (or a ColumnarHistory / AnalysisFrame)
         save_path: Path to save figure
         show: Whether to display
         figsize: Figure size
@@ -1529,12 +1450,13 @@ def plot_media_dashboard(
     Returns:
         matplotlib Figure or None
     """
-    media_rounds = [h for h in history if "media_data" in h]
-    if not media_rounds:
+    frame = AnalysisFrame.of(history)
+    if not frame.media_mask.any():
         print("No media data to plot")
         return None
+    media_rounds = [h for h in frame.history if "media_data" in h]
 
-    providers = get_providers(history)
+    providers = get_providers(frame)
     rounds = [h["round"] for h in media_rounds]
 
     fig, axes = plt.subplots(2, 2, figsize=figsize)
@@ -1645,7 +1567,7 @@ def create_all_dashboards(
     Create and save all dashboards.
 
     Args:
-        history: List of round data dicts
+        history: List of round data dicts (or a ColumnarHistory / AnalysisFrame)
         output_dir: Directory to save plots
         show: Whether to display plots
         metadata: Optional experiment metadata dict with keys like:
@@ -1655,6 +1577,9 @@ def create_all_dashboards(
         Dict of {dashboard_name: figure_path}
     """
     import os
+    # Built once and shared, so each dashboard reuses the same arrays and
+    # rolling-validity series instead of re-walking the history
+    history = AnalysisFrame.of(history)
     os.makedirs(output_dir, exist_ok=True)
 
     saved = {}
@@ -1763,19 +1688,18 @@ def plot_strategy_evolution(history, save_path=None, show=True):
 
 def plot_belief_accuracy(history, save_path=None, show=True):
     """Plot belief accuracy (kept for compatibility)."""
-    if not history:
+    frame = AnalysisFrame.of(history)
+    if not frame:
         return None
 
-    providers = get_providers(history)
+    providers = get_providers(frame)
     provider_colors = {p: c for p, c in zip(providers, get_provider_colors(len(providers)))}
-    rounds = [h["round"] for h in history]
+    rounds = frame.rounds
 
     fig, ax = plt.subplots(figsize=(10, 5))
 
-    for provider in providers:
-        true_caps = np.array([h["true_capabilities"][provider] for h in history])
-        believed_caps = np.array([h["believed_capabilities"][provider] for h in history])
-        belief_error = believed_caps - true_caps
+    for j, provider in enumerate(providers):
+        belief_error = frame.believed[:, j] - frame.capabilities[:, j]
         ax.plot(rounds, belief_error, 'o-', label=provider, color=provider_colors[provider],
                 markersize=4, linewidth=2)
 
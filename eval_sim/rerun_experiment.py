@@ -5,6 +5,8 @@ Usage:
     python rerun_experiment.py exp_016_5p_3b_full_ecosystem_ollama
     python rerun_experiment.py exp_016  # partial match works too
     python rerun_experiment.py --list   # list all experiments
+    python rerun_experiment.py exp_016 --cache  # replay LLM calls from the response cache
+    python rerun_experiment.py exp_016 --resume # continue an interrupted run from its last checkpoint
 """
 import os
 import sys
@@ -12,11 +14,11 @@ import json
 import time
 
 
-def find_experiment(experiments_dir, query):
+def find_experiment(experiments_dir, query, index_name="index.json"):
     """Find an experiment by exact or partial ID match."""
-    index_path = os.path.join(experiments_dir, "index.json")
+    index_path = os.path.join(experiments_dir, index_name)
     if not os.path.exists(index_path):
-        print("No experiments/index.json found.")
+        print(f"No {index_path} found.")
         sys.exit(1)
 
     with open(index_path) as f:
@@ -77,8 +79,8 @@ def _format_duration(seconds):
         return f"{int(h)}h {int(m)}m {int(s)}s"
 
 
-def run_from_config(config, source_exp_id):
-    """Run a simulation from a saved config dict."""
+def _prepare_environment(config, use_cache=False):
+    """Put eval_sim on sys.path, load .env and select the LLM provider/cache."""
     sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
     # Load .env file
@@ -95,10 +97,24 @@ def run_from_config(config, source_exp_id):
     if config.get("llm_mode"):
         provider = os.environ.get("LLM_PROVIDER", "ollama")
         os.environ["LLM_PROVIDER"] = provider
+        if use_cache:
+            os.environ.setdefault(
+                "LLM_CACHE_PATH",
+                os.path.join(os.path.dirname(os.path.abspath(__file__)), "experiments", "llm_cache.sqlite"),
+            )
+
+
+def run_from_config(config, source_exp_id, use_cache=False):
+    """Run a simulation from a saved config dict.
+
+    If use_cache is True, LLM responses are read from / written to the
+    persistent response cache (LLM_CACHE_PATH, default
+    experiments/llm_cache.sqlite), so identical prompts are not re-sent.
+    """
+    _prepare_environment(config, use_cache)
 
     from simulation import EvalEcosystemSimulation, SimulationConfig
-    from experiment_logger import ExperimentLogger, generate_summary
-    from game_log import generate_game_log_from_history
+    from experiment_logger import ExperimentLogger
 
     # Extract provider and funder configs (not part of SimulationConfig)
     provider_configs = config.pop("provider_configs", None)
@@ -124,6 +140,8 @@ def run_from_config(config, source_exp_id):
         benchmark_validity_decay_rate=config.get("benchmark_validity_decay_rate", 0.005),
         benchmark_exploitability_growth_rate=config.get("benchmark_exploitability_growth_rate", 0.008),
         llm_mode=config.get("llm_mode", False),
+        max_planning_workers=config.get("max_planning_workers", 4),
+        llm_deadline_s=config.get("llm_deadline_s"),
         enable_consumers=config.get("enable_consumers", False),
         enable_policymakers=config.get("enable_policymakers", False),
         enable_funders=config.get("enable_funders", False),
@@ -131,6 +149,8 @@ def run_from_config(config, source_exp_id):
         n_policymakers=config.get("n_policymakers", 0),
         n_funders=config.get("n_funders", 0),
         verbose=config.get("verbose", True),
+        profile=config.get("profile", False),
+        checkpoint_every=config.get("checkpoint_every", 0),
     )
 
     n_rounds = sim_config.n_rounds
@@ -181,13 +201,36 @@ def run_from_config(config, source_exp_id):
     # Run simulation
     sim = EvalEcosystemSimulation(sim_config)
     sim.setup(provider_configs=provider_configs, funder_configs=funder_configs)
+    # Checkpoints go in the new experiment folder, so it can be resumed too
+    sim.config.checkpoint_dir = os.path.join(logger.get_experiment_dir(), "checkpoints")
+
+    _run_and_log(sim, logger, full_config, run_name=f"rerun_{source_exp_id}",
+                 title="RERUN", notes=[f"Rerun of: {source_exp_id}"])
+    return sim
 
-    print(f"=== Running {n_rounds} rounds ===\n")
+
+def _run_and_log(sim, logger, full_config, run_name, title, notes):
+    """Run sim from its current round to config.n_rounds and write all outputs.
+
+    Shared by fresh reruns and resumed runs; the experiment folder is the one
+    the logger currently has open.
+    """
+    from experiment_logger import generate_summary
+    from game_log import generate_game_log_from_history
+
+    sim_config = sim.config
+    n_rounds = sim_config.n_rounds
+    start_round = sim.current_round
+
+    if start_round:
+        print(f"=== Resuming at round {start_round} of {n_rounds} ===\n")
+    else:
+        print(f"=== Running {n_rounds} rounds ===\n")
 
     start = time.time()
     round_times = []
 
-    for i in range(n_rounds):
+    for i in range(start_round, n_rounds):
         round_start = time.time()
 
         elapsed = round_start - start
@@ -199,7 +242,7 @@ def run_from_config(config, source_exp_id):
                   f"Elapsed: {_format_duration(elapsed)} | "
                   f"ETA: {_format_duration(eta)} | "
                   f"Avg/round: {_format_duration(avg_round_time)}")
-        elif i == 0:
+        elif i == start_round:
             print(f"[Round {i}/{n_rounds}] Starting...")
 
         round_data = sim.run_round()
@@ -214,11 +257,19 @@ def run_from_config(config, source_exp_id):
 
     print()
     print("=" * 70)
-    print(f"RERUN COMPLETE - Total time: {_format_duration(total_elapsed)}")
+    print(f"{title} COMPLETE - Total time: {_format_duration(total_elapsed)}")
     if round_times:
         print(f"  Avg round: {_format_duration(sum(round_times) / len(round_times))}")
         print(f"  Fastest:   {_format_duration(min(round_times))}")
         print(f"  Slowest:   {_format_duration(max(round_times))}")
+    cache_stats = None
+    if sim_config.llm_mode:
+        from llm import get_provider
+        cache = get_provider().response_cache
+        if cache is not None:
+            cache_stats = cache.stats()
+            print(f"  LLM cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses "
+                  f"({cache_stats['hit_rate']:.0%} hit rate)")
     print("=" * 70)
 
     # Log results
@@ -246,8 +297,8 @@ def run_from_config(config, source_exp_id):
     game_log_content = generate_game_log_from_history(
         history=sim.history,
         providers=sim.providers,
-        experiment_name=f"rerun_{source_exp_id}",
-        experiment_id=exp_id,
+        experiment_name=run_name,
+        experiment_id=logger.current_experiment,
         llm_mode=sim_config.llm_mode,
         benchmark_params={
             "validity": sim_config.benchmark_validity,
@@ -280,13 +331,62 @@ def run_from_config(config, source_exp_id):
         print(f"Could not create plots: {e}")
 
     # Finalize
-    logger.add_note(f"Rerun of: {source_exp_id}")
+    for note in notes:
+        logger.add_note(note)
     logger.add_note(f"Total runtime: {_format_duration(total_elapsed)}")
     if round_times:
         logger.add_note(f"Avg round time: {_format_duration(sum(round_times) / len(round_times))}")
+    if cache_stats:
+        logger.add_note(f"LLM cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses")
     logger.finalize()
 
     print(f"\nExperiment saved to: {logger.get_experiment_dir()}")
+
+
+def resume_experiment(exp_id, use_cache=False):
+    """Continue an interrupted experiment in place from its latest checkpoint.
+
+    The simulation state (actors, evaluator, RNG state, history) comes from
+    experiments/<exp_id>/checkpoints/round_NNNN.ckpt. rounds.jsonl is rewound
+    to the checkpoint's history, and the remaining rounds are run and logged
+    into the same folder. In heuristic mode (or with --cache) the result is
+    identical to an uninterrupted run.
+    """
+    experiments_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "experiments")
+    heuristic = exp_id.startswith("heur_")
+    base_dir = os.path.join(experiments_dir, "heuristic") if heuristic else experiments_dir
+
+    with open(os.path.join(base_dir, exp_id, "config.json")) as f:
+        full_config = json.load(f)
+    _prepare_environment(full_config, use_cache)
+
+    from simulation import EvalEcosystemSimulation, latest_checkpoint
+    from experiment_logger import ExperimentLogger
+
+    checkpoint = latest_checkpoint(os.path.join(base_dir, exp_id, "checkpoints"))
+    if checkpoint is None:
+        print(f"ERROR: no checkpoints found for {exp_id}. "
+              f"Was it run with checkpoint_every > 0?")
+        sys.exit(1)
+    sim = EvalEcosystemSimulation.load_checkpoint(checkpoint, resume_in_place=True)
+    sim.config.checkpoint_dir = os.path.dirname(checkpoint)
+    resumed_at = sim.current_round
+
+    print()
+    print("=" * 70)
+    print(f"RESUME of: {exp_id} at round {resumed_at}/{sim.config.n_rounds}")
+    print(f"Checkpoint: {checkpoint}")
+    print("=" * 70)
+    print()
+
+    logger = ExperimentLogger(experiments_dir, use_heuristic_subdir=heuristic)
+    logger.open_experiment(exp_id)
+    logger.rewind_rounds(sim.history)
+
+    if resumed_at >= sim.config.n_rounds:
+        print("All rounds already completed; rewriting outputs only.")
+    _run_and_log(sim, logger, full_config, run_name=logger.current_metadata.name, title="RESUME",
+                 notes=[f"Resumed from checkpoint at round {resumed_at}"])
     return sim
 
 
@@ -300,9 +400,20 @@ if __name__ == "__main__":
         list_experiments(experiments_dir)
         sys.exit(0)
 
+    use_cache = "--cache" in sys.argv[2:]
+    resume = "--resume" in sys.argv[2:]
     query = sys.argv[1]
     experiments_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "experiments")
 
+    if resume:
+        if query.startswith("heur"):
+            exp_entry = find_experiment(os.path.join(experiments_dir, "heuristic"), query,
+                                        index_name="heuristic_index.json")
+        else:
+            exp_entry = find_experiment(experiments_dir, query)
+        resume_experiment(exp_entry["id"], use_cache=use_cache)
+        sys.exit(0)
+
     # Find the experiment
     exp_entry = find_experiment(experiments_dir, query)
     exp_id = exp_entry["id"]
@@ -317,4 +428,4 @@ if __name__ == "__main__":
         config = json.load(f)
 
     print(f"Loaded config from: {exp_id}")
-    run_from_config(config, exp_id)
+    run_from_config(config, exp_id, use_cache=use_cache)
@@ -39,14 +39,19 @@ EXPERIMENT = {
 }
 
 LLM = {
-    "provider": "ollama",       # openai | anthropic | ollama | gemini
+    "provider": "ollama",       # openai | anthropic | ollama | gemini | mock
     "llm_mode": True,          # True = LLM planning, False = heuristic
+    "max_planning_workers": 4, # Concurrent provider plan/reflect calls per round
+    "prompt_budget": None,     # Estimated-token cap per prompt, e.g. 1024; oldest history trimmed first (None = off)
+    "deadline_s": None,        # Per-decision LLM time budget; heuristic plan used past it (None = wait)
 }
 
 SIMULATION = {
     "n_rounds": 30,
     "seed": 42,
     "verbose": True,
+    "profile": False,          # Per-phase timings + LLM usage -> perf_report.json
+    "checkpoint_every": 5,     # Rounds between resumable checkpoints (0 = off)
     "rnd_efficiency": 0.01,
     # S-curve
     "capability_ceiling": 1.0,
@@ -169,6 +174,10 @@ def run():
     )
     from experiment_logger import ExperimentLogger, generate_summary
     from game_log import generate_game_log_from_history
+    from llm import set_prompt_budget
+
+    if LLM.get("prompt_budget") is not None:
+        set_prompt_budget(LLM["prompt_budget"])
 
     # --- Resolve provider configs ---
     if isinstance(PROVIDERS, str):
@@ -209,6 +218,8 @@ def run():
         max_benchmarks=SIMULATION.get("max_benchmarks", 6),
         benchmark_sequence=SIMULATION.get("benchmark_sequence"),
         llm_mode=LLM["llm_mode"],
+        max_planning_workers=LLM.get("max_planning_workers", 4),
+        llm_deadline_s=LLM.get("deadline_s"),
         enable_consumers=CONSUMERS["enabled"],
         enable_policymakers=POLICYMAKERS["enabled"],
         enable_funders=FUNDERS["enabled"],
@@ -217,6 +228,8 @@ def run():
         n_funders=n_funders,
         use_case_profiles=SIMULATION.get("use_case_profiles"),
         verbose=SIMULATION.get("verbose", True),
+        profile=SIMULATION.get("profile", False),
+        checkpoint_every=SIMULATION.get("checkpoint_every", 0),
     )
 
     # --- Print banner ---
@@ -260,6 +273,8 @@ def run():
     if funder_configs:
         full_config["funder_configs"] = funder_configs
     logger.log_config(full_config)
+    # Resume with: python rerun_experiment.py <exp_id> --resume
+    config.checkpoint_dir = os.path.join(logger.get_experiment_dir(), "checkpoints")
 
     print(f"Experiment: {exp_id}")
     print(f"Logging to: {logger.get_experiment_dir()}")
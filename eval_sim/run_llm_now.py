@@ -56,12 +56,13 @@ def run_quick_test(
     n_providers: int = 3,
     n_benchmarks: int = 1,
     enable_funders: bool = False,
+    profile: bool = False,
 ):
     """Run a quick LLM test with optional trace logging and experiment logging.
 
     Args:
         n_rounds: Number of rounds to run
-        provider: LLM provider (openai, anthropic, ollama, gemini)
+        provider: LLM provider (openai, anthropic, ollama, gemini, mock)
         verbose_llm: If True, print raw LLM prompts and responses
         enable_ecosystem: If True, enable consumers and policymakers
         save_traces: If set, save full LLM reasoning traces to this file path
@@ -70,6 +71,7 @@ def run_quick_test(
         n_providers: Number of providers (2 or 3)
         n_benchmarks: Number of benchmarks (1 or 2)
         enable_funders: If True, enable funder actors
+        profile: If True, record per-phase timings and LLM usage per round
     """
     os.environ["LLM_PROVIDER"] = provider
 
@@ -144,6 +146,7 @@ def run_quick_test(
         n_policymakers=1 if enable_ecosystem else 0,
         n_funders=len(funder_configs) if funder_configs else 0,
         verbose=True,
+        profile=profile,
     )
 
     # --- Experiment logging setup ---
@@ -340,7 +343,7 @@ def _collect_all_traces(sim) -> dict:
     # Per-provider full memory (includes all planning + reflection reasoning)
     for provider in sim.providers:
         insights = []
-        for entry in provider.memory:
+        for entry in provider.memory.to_list():
             if entry.get("type") in ("planning", "reflection") and entry.get("reasoning"):
                 insights.append({
                     "round": entry.get("round"),
@@ -376,7 +379,7 @@ Examples:
     )
     parser.add_argument("--rounds", "-r", type=int, default=5, help="Number of rounds")
     parser.add_argument("--provider", "-p", default="openai",
-                        choices=["openai", "anthropic", "ollama", "gemini"])
+                        choices=["openai", "anthropic", "ollama", "gemini", "mock"])
     parser.add_argument("--providers", type=int, default=3, choices=[2, 3],
                         help="Number of model providers (2 or 3)")
     parser.add_argument("--benchmarks", type=int, default=1, choices=[1, 2],
@@ -393,6 +396,8 @@ Examples:
                         help="Disable experiment logging to experiments/")
     parser.add_argument("--name", type=str, default=None,
                         help="Custom experiment name")
+    parser.add_argument("--profile", action="store_true",
+                        help="Record per-phase timings and LLM usage (perf_report.json)")
     args = parser.parse_args()
 
     run_quick_test(
@@ -406,4 +411,5 @@ Examples:
         n_providers=args.providers,
         n_benchmarks=args.benchmarks,
         enable_funders=args.funders,
+        profile=args.profile,
     )
@@ -9,13 +9,19 @@ Key visibility design:
 - Actors only have access to public_state and private_state
 - Ground truth is passed to evaluator for scoring, never to actors
 """
+import glob
+import gzip
 import json
 import os
-from dataclasses import dataclass, field, asdict
+import pickle
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field, asdict, replace
 from typing import Optional
 
 from actors.model_provider import ModelProvider
 from actors.evaluator import Evaluator, Regulation
+from llm import LLMUsageStats, get_usage_stats, llm_actor
 from visibility import ProviderGroundTruth, ConsumerGroundTruth, PolicymakerGroundTruth, FunderGroundTruth
 
 
@@ -39,6 +45,30 @@ def r4(x):
         return x
 
 
+# Bumped when the pickled simulation layout changes incompatibly
+CHECKPOINT_VERSION = 1
+
+
+class PhaseTimer:
+    """Lap timer for the phases of run_round (no-op unless enabled)."""
+
+    def __init__(self, enabled: bool):
+        self.enabled = enabled
+        self.phases: dict[str, float] = {}
+        self._start = self._last = time.perf_counter() if enabled else 0.0
+
+    def lap(self, phase: str):
+        """Charge the time since the previous lap to `phase`."""
+        if self.enabled:
+            now = time.perf_counter()
+            self.phases[phase] = self.phases.get(phase, 0.0) + (now - self._last)
+            self._last = now
+
+    def total(self) -> float:
+        """Seconds from construction to the last lap."""
+        return self._last - self._start
+
+
 @dataclass
 class SimulationConfig:
     """Configuration for a simulation run."""
@@ -77,6 +107,8 @@ class SimulationConfig:
 
     # Planning mode
     llm_mode: bool = False  # If True, use LLM for planning; if False, use heuristics
+    max_planning_workers: int = 4  # Concurrent provider plan/reflect calls in LLM mode (1 = serial)
+    llm_deadline_s: Optional[float] = None  # LLM planning time budget; heuristic used past it (None = wait)
 
     # New actor settings
     enable_consumers: bool = False  # Enable consumer market
@@ -93,6 +125,17 @@ class SimulationConfig:
     # Output
     output_dir: Optional[str] = None
     verbose: bool = True
+    profile: bool = False  # Record per-phase timings and LLM usage in round_data["perf"]
+
+    # Actor memory retention (providers, policymakers, funders; None = unbounded)
+    memory_max_entries: Optional[int] = None  # Entries kept in RAM per actor
+    memory_spill_rounds: Optional[int] = None  # Spill entries older than this many rounds
+    memory_spill_dir: Optional[str] = None  # Spill directory (default: <output_dir>/memory_spill)
+
+    # Checkpointing (resume an interrupted run; see save_checkpoint)
+    checkpoint_every: int = 0  # Write a checkpoint every K rounds (0 = off)
+    checkpoint_dir: Optional[str] = None  # Default: <output_dir>/checkpoints
+    checkpoint_keep: int = 2  # Most recent checkpoints kept on disk (0 = all)
 
     def to_dict(self) -> dict:
         """Convert config to dict for serialization."""
@@ -250,6 +293,8 @@ class EvalEcosystemSimulation:
             benchmark_names = [bm.name for bm in self.evaluator.benchmarks]
             self.consumer_market.resolve_benchmark_weights(benchmark_names)
 
+        self._configure_actor_memory()
+
         self.current_round = 0
         self.history = []
 
@@ -371,6 +416,32 @@ class EvalEcosystemSimulation:
                 funding_efficiency=fc.get("funding_efficiency", 1.0),
             )
 
+    def _configure_actor_memory(self):
+        """
+        Apply the config's memory retention limits to providers, policymakers and funders.
+
+        Spilling needs a directory (memory_spill_dir, or output_dir/memory_spill);
+        without one, memory_spill_rounds has no effect. Spilled entries are still
+        written to each actor's memory.json on save.
+        """
+        cfg = self.config
+        if cfg.memory_max_entries is None and cfg.memory_spill_rounds is None:
+            return
+        spill_dir = cfg.memory_spill_dir
+        if spill_dir is None and cfg.output_dir:
+            spill_dir = os.path.join(cfg.output_dir, "memory_spill")
+
+        for actor in self.providers + self.policymakers + self.funders:
+            spill_path = None
+            if spill_dir:
+                safe_name = actor.name.replace(" ", "_").replace("/", "_")
+                spill_path = os.path.join(spill_dir, f"{safe_name}_memory.jsonl")
+            actor.memory.configure(
+                max_entries=cfg.memory_max_entries,
+                spill_path=spill_path,
+                spill_after_rounds=cfg.memory_spill_rounds,
+            )
+
     def _update_ground_truth(self, provider_name: str, capability_gain: float):
         """
         Update ground truth for a provider after R&D execution.
@@ -421,6 +492,42 @@ class EvalEcosystemSimulation:
                 context["regulatory_pressure"] = last["policymaker_data"].get("interventions", [])
         return context
 
+    def _llm_deadline(self) -> Optional[float]:
+        """Absolute time.monotonic() deadline for an LLM planning decision starting now."""
+        if not self.config.llm_mode or self.config.llm_deadline_s is None:
+            return None
+        return time.monotonic() + self.config.llm_deadline_s
+
+    def _map_providers(self, fn, *args_per_provider) -> list:
+        """
+        Apply fn(provider, *args) to every provider, returning results in provider order.
+
+        In LLM mode each call blocks on an LLM round-trip, so calls are fanned
+        out over a bounded thread pool. Heuristic mode (or max_planning_workers
+        <= 1) runs serially.
+
+        Args:
+            fn: Callable taking a provider followed by its per-provider args
+            *args_per_provider: Lists aligned with self.providers
+
+        Returns:
+            List of fn results, aligned with self.providers
+        """
+        calls = list(zip(self.providers, *args_per_provider))
+
+        def call_fn(call):
+            # LLM usage from this call is attributed to the provider
+            with llm_actor(call[0].name):
+                return fn(*call)
+
+        n_workers = min(self.config.max_planning_workers, len(calls))
+        if not self.config.llm_mode or n_workers <= 1:
+            return [call_fn(call) for call in calls]
+
+        with ThreadPoolExecutor(max_workers=n_workers) as pool:
+            # map() yields results in submission order, keeping merges deterministic
+            return list(pool.map(call_fn, calls))
+
     def run_round(self) -> dict:
         """
         Run a single simulation round.
@@ -439,16 +546,29 @@ class EvalEcosystemSimulation:
             Dict with round results
         """
         round_num = self.current_round
+        timer = PhaseTimer(self.config.profile)
+        llm_before = get_usage_stats().snapshot() if self.config.profile else None
 
         # Get funding multipliers from previous round's funder decisions
         funding_multipliers = self._current_funder_data.get("funding_multipliers", {})
 
         # 1. Providers plan investment portfolios (for round > 0, they've seen previous scores)
         if round_num > 0:
-            for provider in self.providers:
-                ecosystem_context = self._get_provider_ecosystem_context(provider.name)
-                portfolio = provider.plan(ecosystem_context)
+            # Plans only touch each provider's own state, so they can be fanned
+            # out concurrently. Capability updates (and the shared RNG draws for
+            # breakthroughs) then run serially in provider order.
+            contexts = [
+                self._get_provider_ecosystem_context(provider.name)
+                for provider in self.providers
+            ]
+            # All provider plans share one deadline, so the phase is bounded
+            # by llm_deadline_s however many providers queue for workers
+            deadline = self._llm_deadline()
+            portfolios = self._map_providers(
+                lambda provider, ctx: provider.plan(ctx, deadline=deadline), contexts
+            )
 
+            for provider, portfolio in zip(self.providers, portfolios):
                 # Calculate capability gain with S-curve dynamics
                 base_efficiency = self.config.rnd_efficiency
 
@@ -488,6 +608,7 @@ class EvalEcosystemSimulation:
                     "new_true_capability": self.ground_truth[provider.name].true_capability,
                     "portfolio": portfolio,
                 })
+        timer.lap("provider_planning")
 
         # 2. Evaluator scores all providers using ground truth
         scores = self.evaluator.evaluate_all(
@@ -513,6 +634,7 @@ class EvalEcosystemSimulation:
         # 3. Publish scores
         published_scores = self.evaluator.publish_scores(scores)
         leaderboard = self.evaluator.get_leaderboard(scores)
+        timer.lap("evaluation")
 
         # 4. Providers observe scores and reflect
         for provider in self.providers:
@@ -523,7 +645,8 @@ class EvalEcosystemSimulation:
                 if name != provider.name
             }
             provider.observe(own_score, competitor_scores, round_num)
-            provider.reflect()
+        self._map_providers(lambda provider: provider.reflect())
+        timer.lap("provider_reflection")
 
         # 5. Media observes and publishes (if enabled)
         media_coverage = None
@@ -545,11 +668,13 @@ class EvalEcosystemSimulation:
                 per_benchmark_scores=per_bm_scores,
                 consumer_data=prev_consumer_data,
             )
+        timer.lap("media")
 
         # 6. Consumer actions (if enabled)
         consumer_data = {}
         if self.consumer_market:
             consumer_data = self._run_consumer_round(leaderboard, round_num, media_coverage)
+        timer.lap("consumers")
 
         # 7. Policymaker actions (if enabled)
         policymaker_data = {}
@@ -557,6 +682,7 @@ class EvalEcosystemSimulation:
             policymaker_data = self._run_policymaker_round(
                 leaderboard, consumer_data, round_num, media_coverage
             )
+        timer.lap("policymakers")
 
         # 8. Funder actions (if enabled)
         funder_data = {}
@@ -567,6 +693,7 @@ class EvalEcosystemSimulation:
             )
             # Store for next round's capability gain calculation
             self._current_funder_data = funder_data
+        timer.lap("funders")
 
         # Record round data
         round_data = {
@@ -630,47 +757,63 @@ class EvalEcosystemSimulation:
         actor_traces = {}
 
         for provider in self.providers:
-            for entry in reversed(provider.memory):
-                if entry.get("type") == "planning":
-                    trace = entry.get("reasoning") or entry.get("reason")
-                    if trace:
-                        actor_traces[provider.name] = trace
-                    break
+            entry = provider.memory.latest("planning")
+            if entry:
+                trace = entry.get("reasoning") or entry.get("reason")
+                if trace:
+                    actor_traces[provider.name] = trace
 
         for policymaker in self.policymakers:
-            for entry in reversed(policymaker.memory):
-                if entry.get("type") == "planning":
-                    decision = entry.get("decision", "")
-                    reason = entry.get("reason", "")
-                    intervention = entry.get("intervention")
-                    if intervention:
-                        reason = intervention.get("reason", reason)
-                        decision = intervention.get("type", decision)
-                    trace = f"{decision}: {reason}" if reason else decision
-                    if trace:
-                        actor_traces[policymaker.name] = trace
-                    break
+            entry = policymaker.memory.latest("planning")
+            if entry:
+                decision = entry.get("decision", "")
+                reason = entry.get("reason", "")
+                intervention = entry.get("intervention")
+                if intervention:
+                    reason = intervention.get("reason", reason)
+                    decision = intervention.get("type", decision)
+                trace = f"{decision}: {reason}" if reason else decision
+                if trace:
+                    actor_traces[policymaker.name] = trace
 
         for funder in self.funders:
-            for entry in reversed(funder.memory):
-                if entry.get("type") in ("planning", "planning_llm"):
-                    trace = entry.get("reasoning") or entry.get("reason")
-                    if trace:
-                        actor_traces[funder.name] = trace
-                    break
+            entry = funder.memory.latest("planning", "planning_llm")
+            if entry:
+                trace = entry.get("reasoning") or entry.get("reason")
+                if trace:
+                    actor_traces[funder.name] = trace
 
         if actor_traces:
             round_data["actor_traces"] = actor_traces
+        timer.lap("recording")
 
         # Apply numeric precision (4 decimal places) to stored data
         round_data = r4(round_data)
 
+        # Optional profiling block (per-phase wall time, per-actor LLM usage),
+        # kept at microsecond precision since heuristic phases take well under 1ms
+        if self.config.profile:
+            llm_usage = LLMUsageStats.diff(llm_before, get_usage_stats().snapshot())
+            for usage in llm_usage.values():
+                usage["latency_s"] = round(usage["latency_s"], 6)
+                usage["max_latency_s"] = round(usage["max_latency_s"], 6)
+            round_data["perf"] = {
+                "total_s": round(timer.total(), 6),
+                "phases": {phase: round(t, 6) for phase, t in timer.phases.items()},
+                "llm": llm_usage,
+            }
+
         self.history.append(round_data)
 
         if self.config.verbose:
             self._print_round_summary(round_data)
 
         self.current_round += 1
+
+        every = self.config.checkpoint_every
+        if every and self.current_round % every == 0:
+            self.save_checkpoint()
+
         return round_data
 
     def _run_consumer_round(self, leaderboard: list, round_num: int,
@@ -774,7 +917,8 @@ class EvalEcosystemSimulation:
             policymaker.reflect()
 
             # Policymaker plans intervention
-            intervention = policymaker.plan()
+            with llm_actor(policymaker.name):
+                intervention = policymaker.plan()
 
             # Policymaker executes intervention
             if intervention:
@@ -883,7 +1027,8 @@ class EvalEcosystemSimulation:
             funder.reflect()
 
             # Funder plans funding allocations
-            allocations = funder.plan()
+            with llm_actor(funder.name):
+                allocations = funder.plan(deadline=self._llm_deadline())
 
             # Funder executes allocations
             funder.execute(allocations)
@@ -969,15 +1114,14 @@ class EvalEcosystemSimulation:
         # Print LLM reasoning traces if available
         if self.config.llm_mode:
             for provider in self.providers:
-                # Find the most recent planning entry with reasoning
-                for entry in reversed(provider.memory):
-                    if entry.get("type") == "planning" and entry.get("round") == round_data["round"]:
-                        reasoning = entry.get("reasoning", "")
-                        if reasoning:
-                            # Truncate to first 200 chars for readability
-                            display = reasoning[:200] + ("..." if len(reasoning) > 200 else "")
-                            print(f"  [{provider.name} thinking] {display}")
-                        break
+                # Most recent planning entry, if it is from this round
+                entry = provider.memory.latest("planning")
+                if entry and entry.get("round") == round_data["round"]:
+                    reasoning = entry.get("reasoning", "")
+                    if reasoning:
+                        # Truncate to first 200 chars for readability
+                        display = reasoning[:200] + ("..." if len(reasoning) > 200 else "")
+                        print(f"  [{provider.name} thinking] {display}")
 
         # Print consumer summary if present
         if "consumer_data" in round_data:
@@ -1112,6 +1256,189 @@ class EvalEcosystemSimulation:
         if self.config.verbose:
             print(f"\nSimulation saved to: {output_dir}")
 
+    # --- Checkpointing ---
+
+    def snapshot(self) -> bytes:
+        """
+        Serialize the full simulation state to a compressed binary blob.
+
+        Covers everything run_round reads: config, history, ground truth,
+        every actor (memory, beliefs, evaluator best-published scores and
+        validity statistics) and the numpy Generators held by the evaluator,
+        consumer market and media, so a restored simulation continues
+        bit-identically in heuristic mode.
+        """
+        state = {
+            "version": CHECKPOINT_VERSION,
+            "round": self.current_round,
+            "state": self.__dict__,
+        }
+        return gzip.compress(pickle.dumps(state, protocol=pickle.HIGHEST_PROTOCOL), compresslevel=6)
+
+    @classmethod
+    def restore(cls, data: bytes, resume_in_place: bool = False) -> "EvalEcosystemSimulation":
+        """
+        Rebuild a simulation from a snapshot() blob.
+
+        Memory spill files may still be in use by the simulation that took
+        the snapshot, so by default each restored actor memory gets its own
+        copy (<spill>_restoreN.jsonl) holding the entries spilled up to the
+        snapshot.
+
+        Args:
+            data: Bytes returned by snapshot()
+            resume_in_place: Keep writing to the original spill files,
+                truncated back to the snapshot. Only for resuming the run that
+                wrote them (rerun_experiment --resume).
+
+        Returns:
+            Simulation positioned at the snapshot's round
+        """
+        state = pickle.loads(gzip.decompress(data))
+        if state.get("version") != CHECKPOINT_VERSION:
+            raise ValueError(
+                f"Unsupported checkpoint version {state.get('version')} "
+                f"(expected {CHECKPOINT_VERSION})"
+            )
+        sim = cls.__new__(cls)
+        sim.__dict__.update(state["state"])
+        for actor in sim.providers + sim.policymakers + sim.funders:
+            memory = actor.memory
+            if not memory.spill_path or resume_in_place:
+                memory.adopt_spill()
+                continue
+            root, ext = os.path.splitext(memory.spill_path)
+            n = 0
+            while os.path.exists(f"{root}_restore{n}{ext}"):
+                n += 1
+            memory.adopt_spill(f"{root}_restore{n}{ext}")
+        return sim
+
+    def save_checkpoint(self, path: Optional[str] = None) -> str:
+        """
+        Write a snapshot to disk.
+
+        Args:
+            path: Checkpoint file. Defaults to round_NNNN.ckpt in
+                config.checkpoint_dir (or <output_dir>/checkpoints), named
+                after the number of completed rounds; older checkpoints
+                beyond config.checkpoint_keep are removed.
+
+        Returns:
+            Path written
+        """
+        prune_dir = None
+        if path is None:
+            checkpoint_dir = self.config.checkpoint_dir
+            if checkpoint_dir is None:
+                checkpoint_dir = os.path.join(self.config.output_dir or "./simulation_output", "checkpoints")
+            os.makedirs(checkpoint_dir, exist_ok=True)
+            path = os.path.join(checkpoint_dir, f"round_{self.current_round:04d}.ckpt")
+            prune_dir = checkpoint_dir
+
+        # Write then rename, so a crash mid-write never leaves a truncated checkpoint
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(self.snapshot())
+        os.replace(tmp_path, path)
+
+        if prune_dir and self.config.checkpoint_keep > 0:
+            for old in _list_checkpoints(prune_dir)[:-self.config.checkpoint_keep]:
+                os.remove(old)
+        return path
+
+    @classmethod
+    def load_checkpoint(cls, path: str, resume_in_place: bool = False) -> "EvalEcosystemSimulation":
+        """
+        Restore a simulation from a checkpoint file (or the latest one in a directory).
+
+        Args:
+            path: A .ckpt file, or a directory of round_NNNN.ckpt files
+            resume_in_place: See restore()
+        """
+        if os.path.isdir(path):
+            latest = latest_checkpoint(path)
+            if latest is None:
+                raise FileNotFoundError(f"No checkpoints in {path}")
+            path = latest
+        with open(path, "rb") as f:
+            return cls.restore(f.read(), resume_in_place=resume_in_place)
+
+    # --- Branching ---
+
+    def fork(
+        self,
+        n_children: int = 1,
+        config_overrides=None,
+        names: Optional[list[str]] = None,
+    ) -> list["EvalEcosystemSimulation"]:
+        """
+        Branch this simulation into independent children at the current round.
+
+        Children start from an exact copy of the live state (actors, evaluator,
+        RNG state), so unmodified branches replay the same random draws and
+        differences between branches come only from the modification. The
+        recorded history is shared rather than copied: each child gets a new
+        list holding the same round_data dicts, which are never mutated once
+        recorded. Spill files and checkpoint directories are given
+        per-child names so branches do not write over each other.
+
+        Only config fields read during run_round take effect when overridden
+        (e.g. rnd_efficiency, capability_ceiling, breakthrough_probability,
+        verbose, profile, checkpoint_*). Setup-time parameters live on the
+        actors (e.g. child.evaluator.benchmarks[i].validity_decay_rate,
+        child.policymakers[0].risk_tolerance) and can be changed on the child
+        directly.
+
+        Args:
+            n_children: Number of children
+            config_overrides: SimulationConfig field overrides, either one dict
+                applied to every child or a list with one dict (or None) per child
+            names: Optional branch names, used as the suffix of each child's
+                spill files and checkpoint directory (default: fork0, fork1, ...)
+
+        Returns:
+            List of child simulations, positioned at self.current_round
+        """
+        if config_overrides is None or isinstance(config_overrides, dict):
+            config_overrides = [config_overrides] * n_children
+        if len(config_overrides) != n_children:
+            raise ValueError(
+                f"config_overrides has {len(config_overrides)} entries for {n_children} children"
+            )
+        names = names or [f"fork{k}" for k in range(n_children)]
+
+        state = dict(self.__dict__)
+        history = state.pop("history")
+        blob = pickle.dumps(state, protocol=pickle.HIGHEST_PROTOCOL)
+
+        children = []
+        for k, overrides in enumerate(config_overrides):
+            child = self.__class__.__new__(self.__class__)
+            child.__dict__.update(pickle.loads(blob))
+            child.history = list(history)
+            if overrides:
+                unknown = sorted(set(overrides) - set(SimulationConfig.__dataclass_fields__))
+                if unknown:
+                    raise ValueError(f"Unknown SimulationConfig field(s): {unknown}")
+                child.config = replace(child.config, **overrides)
+            child._rebase_branch_paths(names[k])
+            children.append(child)
+        return children
+
+    def _rebase_branch_paths(self, suffix: str):
+        """Give a forked child its own memory spill files and checkpoint directory."""
+        for actor in self.providers + self.policymakers + self.funders:
+            memory = actor.memory
+            if memory.spill_path:
+                root, ext = os.path.splitext(memory.spill_path)
+                memory.adopt_spill(f"{root}_{suffix}{ext}")
+        if self.config.checkpoint_every:
+            checkpoint_dir = self.config.checkpoint_dir or os.path.join(
+                self.config.output_dir or "./simulation_output", "checkpoints"
+            )
+            self.config = replace(self.config, checkpoint_dir=os.path.join(checkpoint_dir, suffix))
+
     def get_analysis_data(self) -> dict:
         """
         Extract data in a format suitable for analysis/plotting.
@@ -1164,6 +1491,17 @@ class EvalEcosystemSimulation:
         return data
 
 
+def _list_checkpoints(checkpoint_dir: str) -> list[str]:
+    """round_NNNN.ckpt files in a directory, oldest first."""
+    return sorted(glob.glob(os.path.join(checkpoint_dir, "round_*.ckpt")))
+
+
+def latest_checkpoint(checkpoint_dir: str) -> Optional[str]:
+    """Path of the most recent checkpoint in a directory, or None."""
+    checkpoints = _list_checkpoints(checkpoint_dir) if os.path.isdir(checkpoint_dir) else []
+    return checkpoints[-1] if checkpoints else None
+
+
 def get_default_provider_configs() -> list[dict]:
     """
     Get default provider configurations modeled after real AI companies.
@@ -0,0 +1,453 @@
+"""
+Parameter Sweep Runner for Evaluation Ecosystem Simulation
+
+Runs a grid or random sample over SimulationConfig fields (e.g.
+benchmark_validity × benchmark_exploitability_growth_rate × rnd_efficiency)
+across a process pool, one simulation per (point, seed) task.
+
+- Every task gets a seed derived from (base_seed, point_index, replicate),
+  so results do not depend on worker count or scheduling order.
+- OMP/MKL/BLAS are pinned to a single thread when this module is imported
+  (before numpy is), and forked workers inherit that; parallelism comes
+  from the pool, not from numpy.
+- Finished tasks are appended to sweep_results.jsonl inside an
+  ExperimentLogger experiment as they complete. An interrupted sweep can be
+  resumed with --resume <experiment_id>; completed tasks are skipped.
+- When all tasks are done, one consolidated columnar table is written
+  (sweep_results.npz, plus sweep_results.csv for quick inspection).
+
+Usage:
+    python sweep.py                     # run the SWEEP defined below
+    python sweep.py --resume exp_042    # continue an interrupted sweep
+"""
+import csv
+import itertools
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import fields
+from typing import Optional
+
+# BLAS libraries read these once, when numpy is first imported, so they must
+# be set before anything here imports numpy (directly or via simulation).
+for _var in ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS"):
+    os.environ[_var] = "1"
+
+
+# =============================================================================
+# SWEEP DEFINITION — edit these
+# =============================================================================
+
+SWEEP = {
+    "name": "goodhart_phase_diagram",
+    "description": "Validity x exploitability growth x R&D efficiency phase diagram",
+    "mode": "grid",  # grid | random
+    # grid: list of values per field
+    # random: list = sample from choices, {"low": a, "high": b} = uniform range
+    "params": {
+        "benchmark_validity": [0.3, 0.5, 0.7, 0.9],
+        "benchmark_exploitability_growth_rate": [0.0, 0.004, 0.008, 0.016],
+        "rnd_efficiency": [0.005, 0.01, 0.02],
+    },
+    "n_samples": 64,     # random mode only
+    "n_seeds": 3,        # replicates per point
+    "base_seed": 42,
+    "max_workers": None,  # default: all cores
+}
+
+BASE_CONFIG = {
+    "n_rounds": 30,
+    "enable_consumers": True,
+    "llm_mode": False,
+}
+
+
+# =============================================================================
+# Point Generation
+# =============================================================================
+
+def _config_field_names() -> set:
+    from simulation import SimulationConfig
+    return {f.name for f in fields(SimulationConfig)}
+
+
+def _validate_params(params: dict):
+    """Raise ValueError for parameters that are not SimulationConfig fields."""
+    unknown = sorted(set(params) - _config_field_names())
+    if unknown:
+        raise ValueError(f"Unknown SimulationConfig field(s) in sweep: {unknown}")
+
+
+def grid_points(params: dict) -> list[dict]:
+    """
+    Full cartesian product of parameter values.
+
+    Args:
+        params: {field_name: [value, ...]}
+
+    Returns:
+        List of {field_name: value} override dicts
+    """
+    _validate_params(params)
+    names = list(params.keys())
+    return [dict(zip(names, values)) for values in itertools.product(*params.values())]
+
+
+def random_points(params: dict, n_samples: int, seed: Optional[int] = None) -> list[dict]:
+    """
+    Random sample of parameter values.
+
+    Args:
+        params: {field_name: [choice, ...] or {"low": a, "high": b}}
+        n_samples: Number of points to draw
+        seed: Sampling seed (the points themselves are reproducible)
+
+    Returns:
+        List of {field_name: value} override dicts
+    """
+    import numpy as np
+
+    _validate_params(params)
+    rng = np.random.default_rng(seed)
+    points = []
+    for _ in range(n_samples):
+        point = {}
+        for name, spec in params.items():
+            if isinstance(spec, dict):
+                point[name] = float(rng.uniform(spec["low"], spec["high"]))
+            else:
+                point[name] = spec[int(rng.integers(len(spec)))]
+        points.append(point)
+    return points
+
+
+def derive_seed(base_seed: int, point_index: int, replicate: int) -> int:
+    """Deterministic per-task seed, independent of scheduling order."""
+    import numpy as np
+    return int(np.random.SeedSequence([base_seed, point_index, replicate]).generate_state(1)[0])
+
+
+# =============================================================================
+# Worker
+# =============================================================================
+
+def _init_worker():
+    """Make the simulation modules importable in a worker process."""
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+
+def summarize_run(sim) -> dict:
+    """
+    Flatten a finished simulation into scalar metrics for the results table.
+
+    Args:
+        sim: EvalEcosystemSimulation after run()
+
+    Returns:
+        Dict of metric name -> float
+    """
+    history = sim.history
+    final = history[-1]
+    true_caps = list(final["true_capabilities"].values())
+    scores = list(final["scores"].values())
+    eval_eng = [s["evaluation_engineering"] for s in final["strategies"].values()]
+    correlation = sim.evaluator.compute_validity_correlation()
+
+    row = {
+        "final_mean_true_capability": sum(true_caps) / len(true_caps),
+        "final_mean_score": sum(scores) / len(scores),
+        "final_score_inflation": (sum(scores) - sum(true_caps)) / len(scores),
+        "final_mean_eval_engineering": sum(eval_eng) / len(eval_eng),
+        "validity_correlation": float(correlation) if correlation is not None else float("nan"),
+        "final_benchmark_validity": sim.evaluator.benchmark.validity,
+        "final_benchmark_exploitability": sim.evaluator.benchmark.exploitability,
+        "n_benchmarks": len(sim.evaluator.benchmarks),
+    }
+    if "consumer_data" in final:
+        row["final_avg_satisfaction"] = final["consumer_data"].get("avg_satisfaction", float("nan"))
+        switching = [h["consumer_data"].get("switching_rate", 0.0) for h in history if "consumer_data" in h]
+        row["mean_switching_rate"] = sum(switching) / len(switching)
+    return row
+
+
+def run_point(task: dict) -> dict:
+    """
+    Run one (point, replicate) task. Executed in a worker process.
+
+    Args:
+        task: Dict with point_index, replicate, seed, overrides,
+            base_config and provider_configs
+
+    Returns:
+        Result row: task identifiers, parameter values and metrics
+    """
+    from simulation import EvalEcosystemSimulation, SimulationConfig
+
+    config_kwargs = dict(task["base_config"])
+    config_kwargs.update(task["overrides"])
+    config_kwargs["seed"] = task["seed"]
+    config_kwargs["verbose"] = False
+    config = SimulationConfig(**config_kwargs)
+
+    start = time.time()
+    sim = EvalEcosystemSimulation(config)
+    sim.setup(
+        provider_configs=task["provider_configs"],
+        funder_configs=task.get("funder_configs"),
+    )
+    sim.run()
+
+    row = {
+        "point_index": task["point_index"],
+        "replicate": task["replicate"],
+        "seed": task["seed"],
+    }
+    row.update(task["overrides"])
+    row.update(summarize_run(sim))
+    row["wall_time"] = time.time() - start
+    return row
+
+
+# =============================================================================
+# Results Table
+# =============================================================================
+
+RESULTS_JSONL = "sweep_results.jsonl"
+RESULTS_NPZ = "sweep_results.npz"
+RESULTS_CSV = "sweep_results.csv"
+
+
+def _read_completed_rows(path: str) -> list[dict]:
+    """Read result rows, ignoring a truncated final line from a crash."""
+    rows = []
+    if not os.path.exists(path):
+        return rows
+    with open(path) as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                rows.append(json.loads(line))
+            except json.JSONDecodeError:
+                continue
+    return rows
+
+
+def rows_to_columns(rows: list[dict]) -> dict:
+    """
+    Convert result rows into a columnar table.
+
+    Numeric columns become float64 arrays (NaN where missing); anything else
+    becomes a string array. Rows are ordered by (point_index, replicate).
+
+    Returns:
+        Dict of column name -> numpy array
+    """
+    import numpy as np
+
+    rows = sorted(rows, key=lambda r: (r["point_index"], r["replicate"]))
+    columns = []
+    for row in rows:
+        for key in row:
+            if key not in columns:
+                columns.append(key)
+
+    table = {}
+    for key in columns:
+        values = [row.get(key) for row in rows]
+        numeric = all(v is None or isinstance(v, (int, float, bool)) for v in values)
+        if numeric:
+            table[key] = np.array(
+                [float("nan") if v is None else float(v) for v in values], dtype=np.float64
+            )
+        else:
+            table[key] = np.array(["" if v is None else str(v) for v in values])
+    return table
+
+
+def write_results_table(rows: list[dict], exp_dir: str) -> dict:
+    """Write the consolidated NPZ (columnar) and CSV tables; return the columns."""
+    import numpy as np
+
+    table = rows_to_columns(rows)
+    np.savez(os.path.join(exp_dir, RESULTS_NPZ), **table)
+
+    with open(os.path.join(exp_dir, RESULTS_CSV), "w", newline="") as f:
+        writer = csv.writer(f)
+        names = list(table.keys())
+        writer.writerow(names)
+        for i in range(len(rows)):
+            writer.writerow([table[name][i] for name in names])
+    return table
+
+
+def load_results(exp_dir: str) -> dict:
+    """Load a sweep's columnar results table as {column: array}."""
+    import numpy as np
+    with np.load(os.path.join(exp_dir, RESULTS_NPZ)) as data:
+        return {key: data[key] for key in data.files}
+
+
+# =============================================================================
+# Sweep Driver
+# =============================================================================
+
+def run_sweep(
+    points: Optional[list[dict]] = None,
+    base_config: Optional[dict] = None,
+    provider_configs: Optional[list[dict]] = None,
+    funder_configs: Optional[list[dict]] = None,
+    n_seeds: int = 1,
+    base_seed: int = 42,
+    max_workers: Optional[int] = None,
+    name: str = "sweep",
+    description: str = "",
+    resume_id: Optional[str] = None,
+    experiments_dir: Optional[str] = None,
+) -> dict:
+    """
+    Run every (point, replicate) task across a process pool.
+
+    Args:
+        points: List of SimulationConfig override dicts (see grid_points /
+            random_points). Ignored when resuming (taken from config.json).
+        base_config: SimulationConfig kwargs shared by all points
+        provider_configs: Provider configs (default: get_default_provider_configs())
+        funder_configs: Optional funder configs
+        n_seeds: Replicates per point
+        base_seed: Base for derived per-task seeds
+        max_workers: Pool size (default: os.cpu_count())
+        name: Experiment name
+        description: Experiment description
+        resume_id: Existing sweep experiment to resume
+        experiments_dir: Experiments directory (default: eval_sim/experiments)
+
+    Returns:
+        Consolidated columnar results {column: array}
+    """
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    from experiment_logger import ExperimentLogger
+
+    experiments_dir = experiments_dir or os.path.join(
+        os.path.dirname(os.path.abspath(__file__)), "experiments"
+    )
+    logger = ExperimentLogger(experiments_dir)
+
+    if resume_id:
+        logger.open_experiment(resume_id)
+        with open(os.path.join(logger.get_experiment_dir(), "config.json")) as f:
+            saved = json.load(f)
+        points = saved["points"]
+        base_config = saved["base_config"]
+        provider_configs = saved["provider_configs"]
+        funder_configs = saved.get("funder_configs")
+        n_seeds = saved["n_seeds"]
+        base_seed = saved["base_seed"]
+    else:
+        if points is None:
+            raise ValueError("points is required unless resuming")
+        from simulation import get_default_provider_configs
+        base_config = dict(base_config or {})
+        _validate_params(base_config)
+        provider_configs = provider_configs or get_default_provider_configs()
+        logger.create_experiment(
+            name=name,
+            description=description,
+            tags=["sweep"],
+            seed=base_seed,
+            llm_mode=base_config.get("llm_mode", False),
+        )
+        logger.log_config({
+            "sweep": True,
+            "points": points,
+            "base_config": base_config,
+            "provider_configs": provider_configs,
+            "funder_configs": funder_configs,
+            "n_seeds": n_seeds,
+            "base_seed": base_seed,
+        })
+
+    exp_dir = logger.get_experiment_dir()
+    results_path = os.path.join(exp_dir, RESULTS_JSONL)
+    rows = _read_completed_rows(results_path)
+    done = {(r["point_index"], r["replicate"]) for r in rows}
+    if rows:
+        # Rewrite without any partial line so new rows start on a clean line
+        with open(results_path, "w") as f:
+            for row in rows:
+                f.write(json.dumps(row) + "\n")
+
+    tasks = [
+        {
+            "point_index": i,
+            "replicate": rep,
+            "seed": derive_seed(base_seed, i, rep),
+            "overrides": point,
+            "base_config": base_config,
+            "provider_configs": provider_configs,
+            "funder_configs": funder_configs,
+        }
+        for i, point in enumerate(points)
+        for rep in range(n_seeds)
+        if (i, rep) not in done
+    ]
+    n_total = len(points) * n_seeds
+    print(f"Sweep {logger.current_experiment}: {n_total} tasks "
+          f"({len(done)} already done, {len(tasks)} to run)")
+
+    start = time.time()
+    failures = 0
+    if tasks:
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker) as pool, \
+                open(results_path, "a") as results_file:
+            futures = {pool.submit(run_point, task): task for task in tasks}
+            for n_finished, future in enumerate(as_completed(futures), start=1):
+                task = futures[future]
+                try:
+                    row = future.result()
+                except Exception as e:
+                    failures += 1
+                    print(f"  Task (point {task['point_index']}, rep {task['replicate']}) failed: {e}")
+                    continue
+                results_file.write(json.dumps(row) + "\n")
+                results_file.flush()
+                rows.append(row)
+                if n_finished % 10 == 0 or n_finished == len(tasks):
+                    print(f"  [{len(done) + n_finished}/{n_total}] "
+                          f"elapsed {time.time() - start:.0f}s")
+
+    table = write_results_table(rows, exp_dir)
+    logger.add_note(
+        f"Sweep: {len(rows)}/{n_total} tasks complete, {failures} failed this session, "
+        f"{time.time() - start:.0f}s"
+    )
+    if failures:
+        print(f"{failures} task(s) failed; rerun with --resume {logger.current_experiment}")
+    logger.finalize()
+    return table
+
+
+if __name__ == "__main__":
+    if len(sys.argv) >= 3 and sys.argv[1] == "--resume":
+        run_sweep(resume_id=sys.argv[2])
+        sys.exit(0)
+
+    if SWEEP["mode"] == "grid":
+        sweep_points = grid_points(SWEEP["params"])
+    elif SWEEP["mode"] == "random":
+        sweep_points = random_points(SWEEP["params"], SWEEP["n_samples"], seed=SWEEP["base_seed"])
+    else:
+        raise ValueError(f"Unknown sweep mode: {SWEEP['mode']}. Use 'grid' or 'random'.")
+
+    run_sweep(
+        points=sweep_points,
+        base_config=BASE_CONFIG,
+        n_seeds=SWEEP["n_seeds"],
+        base_seed=SWEEP["base_seed"],
+        max_workers=SWEEP["max_workers"],
+        name=SWEEP["name"],
+        description=SWEEP["description"],
+    )
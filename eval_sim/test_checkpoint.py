@@ -0,0 +1,87 @@
+"""
+Checkpoint round-trip tests: a run checkpointed at round k and resumed from
+the checkpoint must match an uninterrupted run, memory spill files included.
+
+Run from eval_sim/:
+    python -m pytest -q test_checkpoint.py
+"""
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from simulation import (
+    EvalEcosystemSimulation,
+    SimulationConfig,
+    get_default_provider_configs,
+    latest_checkpoint,
+)
+
+N_ROUNDS = 20
+CHECKPOINT_EVERY = 5
+CRASH_AT = 13  # rounds run before the "crash"; the last checkpoint is at 10
+
+
+def _make_sim(tmp_path, name: str, **overrides) -> EvalEcosystemSimulation:
+    config = SimulationConfig(
+        n_rounds=N_ROUNDS,
+        seed=7,
+        enable_consumers=True,
+        enable_policymakers=True,
+        enable_funders=True,
+        enable_media=True,
+        verbose=False,
+        memory_spill_rounds=2,
+        memory_spill_dir=str(tmp_path / name / "memory_spill"),
+        **overrides,
+    )
+    sim = EvalEcosystemSimulation(config)
+    sim.setup(get_default_provider_configs())
+    return sim
+
+
+def _memories(sim: EvalEcosystemSimulation) -> list:
+    return [actor.memory.to_list() for actor in sim.providers + sim.policymakers + sim.funders]
+
+
+def _as_json(value):
+    return json.loads(json.dumps(value))
+
+
+def test_resume_in_place_matches_uninterrupted_run(tmp_path):
+    full = _make_sim(tmp_path, "full")
+    full.run()
+
+    checkpoint_dir = tmp_path / "resumed" / "checkpoints"
+    sim = _make_sim(tmp_path, "resumed", checkpoint_every=CHECKPOINT_EVERY,
+                    checkpoint_dir=str(checkpoint_dir), checkpoint_keep=2)
+    for _ in range(CRASH_AT):
+        sim.run_round()
+    assert any(actor.memory.n_spilled for actor in sim.providers)
+
+    # Rotation keeps only the checkpoint_keep (default 2) most recent
+    assert sorted(os.listdir(checkpoint_dir)) == ["round_0005.ckpt", "round_0010.ckpt"]
+    checkpoint = latest_checkpoint(str(checkpoint_dir))
+    resumed = EvalEcosystemSimulation.load_checkpoint(checkpoint, resume_in_place=True)
+    assert resumed.current_round == 10
+    resumed.run(N_ROUNDS - resumed.current_round)
+
+    assert _as_json(resumed.history) == _as_json(full.history)
+    assert _memories(resumed) == _memories(full)
+
+
+def test_restore_leaves_live_simulation_untouched(tmp_path):
+    sim = _make_sim(tmp_path, "live")
+    sim.run(8)
+    blob = sim.snapshot()
+    at_snapshot = _memories(sim)
+    sim.run(8)
+    live = _memories(sim)
+
+    restored = EvalEcosystemSimulation.restore(blob)
+
+    assert _memories(sim) == live
+    assert _memories(restored) == at_snapshot
+    for old, new in zip(sim.providers, restored.providers):
+        assert new.memory.spill_path != old.memory.spill_path
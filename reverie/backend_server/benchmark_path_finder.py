@@ -0,0 +1,77 @@
+"""
+File: benchmark_path_finder.py
+Description: Compares Maze.find_path (a wavefront over the prebuilt NumPy
+collision grid, with the distance field of each start tile cached) against
+path_finder (path_finder_v2 on the collision maze) on the_ville. It checks
+that both return the same path for random tile pairs, and times them in two
+patterns: one path per start tile, and execute's pattern of several targets
+(four sampled action tiles) from the same start tile.
+
+Usage:
+  python benchmark_path_finder.py
+  python benchmark_path_finder.py --pairs 500 --seed 3
+"""
+import argparse
+import random
+import time
+
+from maze import Maze
+from path_finder import path_finder
+from utils import collision_block_id
+
+
+def main():
+  parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+  parser.add_argument("--maze", default="the_ville")
+  parser.add_argument("--pairs", type=int, default=200)
+  parser.add_argument("--targets", type=int, default=4,
+                      help="Targets per start tile in the execute pattern")
+  parser.add_argument("--seed", type=int, default=0)
+  args = parser.parse_args()
+
+  maze = Maze(args.maze)
+  rng = random.Random(args.seed)
+  free_tiles = [(x, y) for y in range(maze.maze_height)
+                for x in range(maze.maze_width)
+                if not maze.collision_grid[y, x]]
+  # Mostly free tiles, plus a few arbitrary ones (blocked or unreachable
+  # targets must behave the same way too).
+  def sample_tile():
+    if rng.random() < 0.9:
+      return rng.choice(free_tiles)
+    return (rng.randrange(maze.maze_width), rng.randrange(maze.maze_height))
+  starts = [sample_tile() for _ in range(args.pairs)]
+  targets = [[sample_tile() for _ in range(args.targets)] for _ in starts]
+
+  timings = {}
+  for name, find in [
+      ("path_finder", lambda a, b: path_finder(maze.collision_maze, a, b,
+                                               collision_block_id)),
+      ("find_path", maze.find_path)]:
+    maze.grid_path_finder.fields.clear()
+    start_time = time.perf_counter()
+    single = [find(a, ends[0]) for a, ends in zip(starts, targets)]
+    single_s = time.perf_counter() - start_time
+
+    maze.grid_path_finder.fields.clear()
+    start_time = time.perf_counter()
+    multi = [[find(a, b) for b in ends] for a, ends in zip(starts, targets)]
+    multi_s = time.perf_counter() - start_time
+    timings[name] = (single, multi, single_s, multi_s)
+
+  reference, found = timings["path_finder"], timings["find_path"]
+  mismatches = sum(a != b for a, b in zip(reference[1], found[1]))
+  mismatches += sum(a != b for a, b in zip(reference[0], found[0]))
+  print(f"{args.maze}: {maze.maze_width}x{maze.maze_height} tiles, "
+        f"{len(free_tiles)} free, {args.pairs} start tiles")
+  print(f"{'':>12} {'ms/path':>10} {f'ms/{args.targets} targets':>16}")
+  for name, (_, _, single_s, multi_s) in timings.items():
+    print(f"{name:>12} {single_s * 1000 / args.pairs:>10.2f} "
+          f"{multi_s * 1000 / args.pairs:>16.2f}")
+  print(f"speedup: {reference[2] / found[2]:.0f}x single, "
+        f"{reference[3] / found[3]:.0f}x execute pattern; "
+        f"mismatched paths: {mismatches}")
+
+
+if __name__ == "__main__":
+  main()
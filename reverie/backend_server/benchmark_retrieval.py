@@ -0,0 +1,131 @@
+"""
+File: benchmark_retrieval.py
+Description: Recall-vs-latency benchmark of new_retrieve with and without the
+approximate nearest-neighbour index (persona/memory_structures/ann_index.py).
+It fills an associative memory with synthetic clustered embeddings (topics
+plus noise, standing in for a long run's event and thought nodes), then for
+each memory size times exact retrieval and ANN retrieval at several n_probe
+settings, and reports recall@k: the share of the exact top-k nodes the
+approximate path also retrieves.
+
+Usage:
+  python benchmark_retrieval.py
+  python benchmark_retrieval.py --sizes 5000 20000 --n-probe 4 8 16 --dim 1536
+"""
+import argparse
+import datetime
+import json
+import os
+import tempfile
+import time
+from types import SimpleNamespace
+
+import numpy as np
+
+from persona.memory_structures.associative_memory import AssociativeMemory
+from persona.cognitive_modules.retrieve import retrieve_by_embeddings
+
+
+def make_memory(n_nodes, dim, n_topics, rng):
+  """
+  Builds an <AssociativeMemory> with n_nodes synthetic event and thought
+  nodes, one minute apart, with embeddings drawn around n_topics topics.
+
+  OUTPUT:
+    (a_mem, topics): the memory and the 2-D array of topic vectors.
+  """
+  folder = tempfile.mkdtemp()
+  for name, content in [("nodes.json", {}), ("embeddings.json", {}),
+                        ("kw_strength.json", {"kw_strength_event": {},
+                                              "kw_strength_thought": {}})]:
+    with open(os.path.join(folder, name), "w") as outfile:
+      json.dump(content, outfile)
+  a_mem = AssociativeMemory(folder)
+
+  topics = rng.standard_normal((n_topics, dim)).astype(np.float32)
+  start = datetime.datetime(2023, 2, 13, 7, 0, 0)
+  for count in range(n_nodes):
+    topic = rng.integers(n_topics)
+    embedding = topics[topic] + 0.8 * rng.standard_normal(dim)
+    created = start + datetime.timedelta(minutes=count)
+    description = f"synthetic memory {count} about topic {topic}"
+    args = (created, None, "someone", "is", f"topic {topic}", description,
+            {f"topic {topic}"}, int(rng.integers(1, 11)),
+            (description, embedding.astype(np.float32).tolist()))
+    if rng.random() < 0.8:
+      a_mem.add_event(*args, [])
+    else:
+      a_mem.add_thought(*args, None)
+  return a_mem, topics
+
+
+def run_queries(persona, queries, n_count):
+  """
+  Retrieves n_count nodes for each query (one focal point per call), and
+  restores every node's last access afterwards so runs are comparable.
+
+  OUTPUT:
+    (results, seconds): the list of retrieved node_id lists and the mean
+    time per query.
+  """
+  nodes = list(persona.a_mem.id_to_node.values())
+  last_accessed = [node.last_accessed for node in nodes]
+  last_accessed_rows = persona.a_mem.node_last_accessed.copy()
+  results = []
+  start = time.perf_counter()
+  for count, query in enumerate(queries):
+    focal_pt = f"query {count}"
+    retrieved = retrieve_by_embeddings(persona, [focal_pt], [query], n_count)
+    results += [[node.node_id for node in retrieved[focal_pt]]]
+  seconds = (time.perf_counter() - start) / len(queries)
+  for node, accessed in zip(nodes, last_accessed):
+    node.last_accessed = accessed
+  persona.a_mem.node_last_accessed = last_accessed_rows
+  return results, seconds
+
+
+def main():
+  parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+  parser.add_argument("--sizes", type=int, nargs="+",
+                      default=[5000, 10000, 30000])
+  parser.add_argument("--n-probe", type=int, nargs="+", default=[2, 4, 8, 16])
+  parser.add_argument("--dim", type=int, default=1536,
+                      help="Embedding size (1536 for text-embedding-ada-002)")
+  parser.add_argument("--topics", type=int, default=300)
+  parser.add_argument("--queries", type=int, default=50)
+  parser.add_argument("--n-count", type=int, default=30)
+  parser.add_argument("--seed", type=int, default=0)
+  args = parser.parse_args()
+
+  print(f"{'nodes':>7} {'mode':>10} {'ms/query':>9} {'speedup':>8} "
+        f"{'recall@k':>9}")
+  for n_nodes in args.sizes:
+    rng = np.random.default_rng(args.seed)
+    a_mem, topics = make_memory(n_nodes, args.dim, args.topics, rng)
+    scratch = SimpleNamespace(
+      recency_decay=0.99, recency_w=1, relevance_w=1, importance_w=1,
+      curr_time=datetime.datetime(2023, 3, 1, 0, 0, 0))
+    persona = SimpleNamespace(a_mem=a_mem, scratch=scratch)
+    queries = (topics[rng.integers(len(topics), size=args.queries)]
+               + 0.8 * rng.standard_normal((args.queries, args.dim)))
+
+    exact, exact_s = run_queries(persona, queries, args.n_count)
+    print(f"{n_nodes:>7} {'exact':>10} {exact_s * 1000:>9.2f} "
+          f"{1:>8.1f} {1:>9.3f}")
+
+    start = time.perf_counter()
+    index = a_mem.enable_ann_index(min_rows=0)
+    print(f"{n_nodes:>7} {'train':>10} "
+          f"{(time.perf_counter() - start) * 1000:>9.1f} ms, "
+          f"{len(index.centroids)} lists")
+    for n_probe in args.n_probe:
+      index.n_probe = n_probe
+      approx, approx_s = run_queries(persona, queries, args.n_count)
+      recall = np.mean([len(set(a) & set(e)) / len(e)
+                        for a, e in zip(approx, exact)])
+      print(f"{n_nodes:>7} {f'probe={n_probe}':>10} {approx_s * 1000:>9.2f} "
+            f"{exact_s / approx_s:>8.1f} {recall:>9.3f}")
+
+
+if __name__ == "__main__":
+  main()
@@ -0,0 +1,84 @@
+"""
+File: convert_memory.py
+Description: Converts saved associative memories between the JSON layout
+(nodes.json + embeddings.json) and the binary layout of
+persona/memory_structures/binary_memory.py (nodes.jsonl + embeddings.npy).
+Takes simulation folders, persona folders or associative_memory folders, and
+converts every associative_memory folder found under them in place.
+
+AssociativeMemory loads the binary layout whenever nodes.jsonl is present, so
+after converting to binary the JSON files are only kept (unless
+--remove-json) for older tools; they are not updated by later saves.
+Converting back to JSON removes the binary files.
+
+Usage:
+  python convert_memory.py ../../environment/frontend_server/storage/base_the_ville_isabella_maria_klaus
+  python convert_memory.py --to json <folder> ...
+"""
+import argparse
+import os
+import time
+
+from persona.memory_structures.associative_memory import AssociativeMemory
+
+
+JSON_FILES = ["nodes.json", "embeddings.json"]
+BINARY_FILES = ["nodes.jsonl", "embeddings.npy"]
+
+
+def find_memory_folders(folder):
+  """
+  Returns every associative_memory folder at or under the given folder.
+  """
+  if os.path.exists(os.path.join(folder, "kw_strength.json")):
+    return [folder]
+  found = []
+  for root, dirs, files in os.walk(folder):
+    if (os.path.basename(root) == "associative_memory"
+        and "kw_strength.json" in files):
+      found += [root]
+  return sorted(found)
+
+
+def convert_memory_folder(folder, storage_format="binary", remove_old=False):
+  """
+  Loads one associative_memory folder and saves it again in the other
+  layout, in the same folder.
+
+  INPUT:
+    folder: The associative_memory folder.
+    storage_format: The layout to convert to ("binary" or "json").
+    remove_old: Delete the files of the other layout afterwards.
+  OUTPUT:
+    The number of nodes converted.
+  """
+  a_mem = AssociativeMemory(folder)
+  a_mem.save(folder, storage_format)
+  if remove_old:
+    for name in JSON_FILES if storage_format == "binary" else BINARY_FILES:
+      if os.path.exists(os.path.join(folder, name)):
+        os.remove(os.path.join(folder, name))
+  return len(a_mem.id_to_node)
+
+
+def main():
+  parser = argparse.ArgumentParser(
+    description="Convert saved associative memories between layouts")
+  parser.add_argument("folders", nargs="+")
+  parser.add_argument("--to", choices=["binary", "json"], default="binary")
+  parser.add_argument("--remove-json", action="store_true",
+                      help="Delete nodes.json and embeddings.json after "
+                           "converting to binary")
+  args = parser.parse_args()
+
+  for folder in args.folders:
+    for memory_folder in find_memory_folders(folder):
+      start = time.time()
+      n_nodes = convert_memory_folder(
+        memory_folder, args.to, args.to == "json" or args.remove_json)
+      print(f"{memory_folder}: {n_nodes} nodes -> {args.to} "
+            f"({time.time() - start:.2f}s)")
+
+
+if __name__ == "__main__":
+  main()
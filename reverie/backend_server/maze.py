@@ -13,6 +13,7 @@ import time
 import math
 
 from global_methods import *
+from path_finder import collision_grid, GridPathFinder
 from utils import *
 
 class Maze: 
@@ -109,6 +110,12 @@ class Maze:
       game_object_maze += [game_object_maze_raw[i:i+tw]]
       spawning_location_maze += [spawning_location_maze_raw[i:i+tw]]
 
+    # A boolean NumPy version of the collision maze, built once, that 
+    # find_path searches (True where the tile is a collision block). 
+    self.collision_grid = collision_grid(self.collision_maze, 
+                                         collision_block_id)
+    self.grid_path_finder = GridPathFinder(self.collision_grid)
+
     # Once we are done loading in the maze, we now set up self.tiles. This is
     # a matrix accessed by row:col where each access point is a dictionary
     # that contains all the things that are taking place in that tile. 
@@ -246,6 +253,22 @@ class Maze:
     return self.tiles[y][x]
 
 
+  def find_path(self, start, end): 
+    """
+    Returns the shortest path between two tiles, the same path that 
+    path_finder(self.collision_maze, start, end, collision_block_id) 
+    returns, without rebuilding the grid on every call. 
+
+    INPUT
+      start: The start tile coordinate in (x, y) form. 
+      end: The end tile coordinate in (x, y) form. 
+    OUTPUT
+      A list of (x, y) tile coordinates from start to end (just [end] if 
+      there is no path within path_finder's 151 steps). 
+    """
+    return self.grid_path_finder.find_path(start, end)
+
+
   def get_tile_path(self, tile, level): 
     """
     Get the tile string address given its coordinate. You designate the level
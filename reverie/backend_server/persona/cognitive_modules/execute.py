@@ -49,21 +49,17 @@ def execute(persona, maze, personas, plan):
       # Executing persona-persona interaction.
       target_p_tile = (personas[plan.split("<persona>")[-1].strip()]
                        .scratch.curr_tile)
-      potential_path = path_finder(maze.collision_maze, 
-                                   persona.scratch.curr_tile, 
-                                   target_p_tile, 
-                                   collision_block_id)
+      potential_path = maze.find_path(persona.scratch.curr_tile, 
+                                      target_p_tile)
       if len(potential_path) <= 2: 
         target_tiles = [potential_path[0]]
       else: 
-        potential_1 = path_finder(maze.collision_maze, 
-                                persona.scratch.curr_tile, 
-                                potential_path[int(len(potential_path)/2)], 
-                                collision_block_id)
-        potential_2 = path_finder(maze.collision_maze, 
-                                persona.scratch.curr_tile, 
-                                potential_path[int(len(potential_path)/2)+1], 
-                                collision_block_id)
+        potential_1 = maze.find_path(
+                        persona.scratch.curr_tile, 
+                        potential_path[int(len(potential_path)/2)])
+        potential_2 = maze.find_path(
+                        persona.scratch.curr_tile, 
+                        potential_path[int(len(potential_path)/2)+1])
         if len(potential_1) <= len(potential_2): 
           target_tiles = [potential_path[int(len(potential_path)/2)]]
         else: 
@@ -125,14 +121,11 @@ def execute(persona, maze, personas, plan):
     closest_target_tile = None
     path = None
     for i in target_tiles: 
-      # path_finder takes a collision_mze and the curr_tile coordinate as 
-      # an input, and returns a list of coordinate tuples that becomes the
-      # path. 
+      # find_path takes the curr_tile coordinate and a target tile as an 
+      # input, and returns a list of coordinate tuples that becomes the
+      # path (the same path as path_finder on the collision maze). 
       # e.g., [(0, 1), (1, 1), (1, 2), (1, 3), (1, 4)...]
-      curr_path = path_finder(maze.collision_maze, 
-                              curr_tile, 
-                              i, 
-                              collision_block_id)
+      curr_path = maze.find_path(curr_tile, i)
       if not closest_target_tile: 
         closest_target_tile = i
         path = curr_path
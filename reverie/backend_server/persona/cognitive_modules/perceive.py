@@ -102,6 +102,23 @@ def perceive(persona, maze):
   for dist, event in percept_events_list[:persona.scratch.att_bandwidth]: 
     perceived_events += [event]
 
+  # Embedding the descriptions of the events that look new in one batched 
+  # request, so the loop below finds them in the embedding cache. 
+  latest_events = persona.a_mem.get_summarized_latest_events(
+                                  persona.scratch.retention)
+  new_descs = []
+  for s, p, o, desc in perceived_events: 
+    if not p: 
+      p, o, desc = "is", "idle", "idle"
+    if (s, p, o) not in latest_events: 
+      desc = f"{s.split(':')[-1]} is {desc}"
+      if "(" in desc: 
+        desc = desc.split("(")[1].split(")")[0].strip()
+      if desc not in persona.a_mem.embeddings: 
+        new_descs += [desc]
+  if new_descs: 
+    get_embeddings(new_descs)
+
   # Storing events. 
   # <ret_events> is a list of <ConceptNode> instances from the persona's 
   # associative memory. 
@@ -10,6 +10,7 @@ sys.path.append('../../')
 from global_methods import *
 from persona.prompt_template.gpt_structure import *
 
+import numpy as np
 from numpy import dot
 from numpy.linalg import norm
 
@@ -67,6 +68,47 @@ def cos_sim(a, b):
   return dot(a, b)/(norm(a)*norm(b))
 
 
+def cos_sim_matrix(queries, matrix, matrix_norms): 
+  """
+  This function calculates the cosine similarity between every query vector
+  and every row of a matrix in one pass. 
+
+  INPUT: 
+    queries: 2-D array of shape (n_queries, dim) 
+    matrix: 2-D array of shape (n_rows, dim) 
+    matrix_norms: 1-D array of the (precomputed) norms of the matrix rows 
+  OUTPUT: 
+    A 2-D array of shape (n_queries, n_rows) with the cosine similarities. 
+  """
+  queries = np.asarray(queries, dtype=np.float32)
+  query_norms = np.linalg.norm(queries, axis=1)
+  with np.errstate(divide="ignore", invalid="ignore"): 
+    return ((queries @ matrix.T) 
+            / (query_norms[:, None] * matrix_norms[None, :]))
+
+
+def normalize_floats(values, target_min, target_max): 
+  """
+  Array version of normalize_dict_floats: scales the values to the target 
+  range, or sets all of them to (target_max - target_min)/2 if they are all 
+  equal. 
+
+  INPUT: 
+    values: 1-D array of floats. 
+    target_min: Integer or float. The minimum of the target range. 
+    target_max: Integer or float. The maximum of the target range. 
+  OUTPUT: 
+    A new 1-D float64 array of the normalized values. 
+  """
+  values = np.asarray(values, dtype=np.float64)
+  min_val = values.min()
+  range_val = values.max() - min_val
+  if range_val == 0: 
+    return np.full(len(values), (target_max - target_min)/2)
+  return ((values - min_val) * (target_max - target_min) 
+          / range_val + target_min)
+
+
 def normalize_dict_floats(d, target_min, target_max):
   """
   This function normalizes the float values of a given dictionary 'd' between 
@@ -196,12 +238,56 @@ def extract_relevance(persona, nodes, focal_pt):
   return relevance_out
 
 
+def extract_relevance_matrix(a_mem, focal_embeddings, rows, n_count): 
+  """
+  Relevance (cosine similarity) of the given memory rows to every focal 
+  point. Without a trained ANN index on the memory this is exact. With one, 
+  only the rows in the clusters closest to each focal point (at least 
+  4 * n_count of them) are scored exactly; the other rows get the index's 
+  coarse estimate, which keeps the normalization range close to the exact 
+  one while those rows can still rank on recency and importance. 
+
+  INPUT: 
+    a_mem: The persona's <AssociativeMemory>. 
+    focal_embeddings: List of focal point embedding vectors. 
+    rows: 1-D array of embedding matrix rows to score. 
+    n_count: Number of nodes retrieved per focal point. 
+  OUTPUT: 
+    A 2-D array of shape (len(focal_embeddings), len(rows)). 
+  """
+  matrix = a_mem.embedding_matrix
+  norms = a_mem.embedding_norms
+  masks = None
+  if a_mem.ann_index is not None: 
+    masks = a_mem.ann_index.search(focal_embeddings, 
+                                   min_candidates=4 * n_count)
+  if masks is None: 
+    # Scoring every row in use and then picking the columns avoids copying 
+    # the (large) matrix rows. 
+    n = a_mem.n_rows
+    return cos_sim_matrix(focal_embeddings, matrix[:n], norms[:n])[:, rows]
+
+  relevance_all = a_mem.ann_index.estimate(focal_embeddings)[:, rows]
+  for count, mask in enumerate(masks): 
+    candidates = rows[mask[rows]]
+    relevance_all[count, mask[rows]] = cos_sim_matrix(
+      focal_embeddings[count:count + 1], 
+      matrix[candidates], norms[candidates])[0]
+  return relevance_all
+
+
 def new_retrieve(persona, focal_points, n_count=30): 
   """
   Given the current persona and focal points (focal points are events or 
   thoughts for which we are retrieving), we retrieve a set of nodes for each
   of the focal points and return a dictionary. 
 
+  Scoring runs on the associative memory's embedding matrix: relevance for
+  all focal points is one matrix product (or, with an ANN index enabled on 
+  the memory, exact only for the nodes near each focal point; see 
+  extract_relevance_matrix), and recency, importance and the top-k 
+  selection are array operations over all the candidate nodes. 
+
   INPUT: 
     persona: The current persona object whose memory we are retrieving. 
     focal_points: A list of focal points (string description of the events or
@@ -215,70 +301,79 @@ def new_retrieve(persona, focal_points, n_count=30):
     persona = <persona> object 
     focal_points = ["How are you?", "Jane is swimming in the pond"]
   """
+  focal_embeddings = get_embeddings(focal_points)
+  return retrieve_by_embeddings(persona, focal_points, focal_embeddings, 
+                                n_count)
+
+
+def retrieve_by_embeddings(persona, focal_points, focal_embeddings, 
+                           n_count=30): 
+  """
+  new_retrieve with the focal point embeddings already computed. 
+
+  INPUT: 
+    persona: The current persona object whose memory we are retrieving. 
+    focal_points: A list of focal points (strings). 
+    focal_embeddings: The embedding vector of each focal point. 
+    n_count: Number of nodes retrieved per focal point. 
+  OUTPUT: 
+    retrieved: A dictionary whose keys are a string focal point, and whose 
+               values are a list of Node object in the agent's associative 
+               memory.
+  """
   # <retrieved> is the main dictionary that we are returning
   retrieved = dict() 
-  for focal_pt in focal_points: 
-    # Getting all nodes from the agent's memory (both thoughts and events) and
-    # sorting them by the datetime of creation.
-    # You could also imagine getting the raw conversation, but for now. 
-    nodes = [[i.last_accessed, i]
-              for i in persona.a_mem.seq_event + persona.a_mem.seq_thought
-              if "idle" not in i.embedding_key]
-    nodes = sorted(nodes, key=lambda x: x[0])
-    nodes = [i for created, i in nodes]
-
-    # Calculating the component dictionaries and normalizing them.
-    recency_out = extract_recency(persona, nodes)
-    recency_out = normalize_dict_floats(recency_out, 0, 1)
-    importance_out = extract_importance(persona, nodes)
-    importance_out = normalize_dict_floats(importance_out, 0, 1)  
-    relevance_out = extract_relevance(persona, nodes, focal_pt)
-    relevance_out = normalize_dict_floats(relevance_out, 0, 1)
+  a_mem = persona.a_mem
+
+  # Getting all nodes from the agent's memory (both thoughts and events). 
+  # You could also imagine getting the raw conversation, but for now. 
+  rows = a_mem.retrieval_rows()
+  if not len(rows) or not focal_points: 
+    for focal_pt in focal_points: 
+      retrieved[focal_pt] = []
+    return retrieved
+  last_accessed = a_mem.node_last_accessed[rows]
+
+  # Component scores that do not depend on the focal point. Recency is 
+  # assigned by position once the nodes are sorted by last access. 
+  recency_sorted = normalize_floats(
+    persona.scratch.recency_decay ** np.arange(1, len(rows) + 1), 0, 1)
+  importance = normalize_floats(a_mem.node_poignancy[rows], 0, 1)
+
+  # Relevance of every node to every focal point in one pass. 
+  focal_embeddings = np.asarray(focal_embeddings, dtype=np.float32)
+  relevance_all = extract_relevance_matrix(a_mem, focal_embeddings, rows, 
+                                           n_count)
+
+  # Note to self: test out different weights. [1, 1, 1] tends to work
+  # decently, but in the future, these weights should likely be learned, 
+  # perhaps through an RL-like process.
+  # gw = [1, 1, 1]
+  # gw = [1, 2, 1]
+  gw = [0.5, 3, 2]
+  for count, focal_pt in enumerate(focal_points): 
+    # Sorting the nodes by the datetime of last access (stable, so ties keep
+    # the seq_event + seq_thought order). Earlier focal points update the 
+    # last access of the nodes they retrieve. 
+    order = np.argsort(last_accessed, kind="stable")
+    recency = np.empty(len(rows))
+    recency[order] = recency_sorted
+    relevance = normalize_floats(relevance_all[count], 0, 1)
 
     # Computing the final scores that combines the component values. 
-    # Note to self: test out different weights. [1, 1, 1] tends to work
-    # decently, but in the future, these weights should likely be learned, 
-    # perhaps through an RL-like process.
-    # gw = [1, 1, 1]
-    # gw = [1, 2, 1]
-    gw = [0.5, 3, 2]
-    master_out = dict()
-    for key in recency_out.keys(): 
-      master_out[key] = (persona.scratch.recency_w*recency_out[key]*gw[0] 
-                     + persona.scratch.relevance_w*relevance_out[key]*gw[1] 
-                     + persona.scratch.importance_w*importance_out[key]*gw[2])
-
-    master_out = top_highest_x_values(master_out, len(master_out.keys()))
-    for key, val in master_out.items(): 
-      print (persona.a_mem.id_to_node[key].embedding_key, val)
-      print (persona.scratch.recency_w*recency_out[key]*1, 
-             persona.scratch.relevance_w*relevance_out[key]*1, 
-             persona.scratch.importance_w*importance_out[key]*1)
-
-    # Extracting the highest x values.
-    # <master_out> has the key of node.id and value of float. Once we get the 
-    # highest x values, we want to translate the node.id into nodes and return
-    # the list of nodes.
-    master_out = top_highest_x_values(master_out, n_count)
-    master_nodes = [persona.a_mem.id_to_node[key] 
-                    for key in list(master_out.keys())]
+    master_out = (persona.scratch.recency_w*recency*gw[0] 
+                  + persona.scratch.relevance_w*relevance*gw[1] 
+                  + persona.scratch.importance_w*importance*gw[2])
+
+    # Extracting the highest x values, ties broken by last-access order.
+    top = order[np.argsort(-master_out[order], kind="stable")[:n_count]]
+    master_nodes = [a_mem.id_to_node[f"node_{row + 1}"] for row in rows[top]]
 
     for n in master_nodes: 
       n.last_accessed = persona.scratch.curr_time
+    last_accessed[top] = np.datetime64(persona.scratch.curr_time, "us")
+    a_mem.node_last_accessed[rows[top]] = last_accessed[top]
       
     retrieved[focal_pt] = master_nodes
 
   return retrieved
-
-
-
-
-
-
-
-
-
-
-
-
-
@@ -0,0 +1,180 @@
+"""
+File: ann_index.py
+Description: An optional approximate nearest-neighbour index (IVF: inverted
+file over spherical k-means centroids) for the embedding matrix of
+<AssociativeMemory>. Retrieval uses it to compute relevance exactly only for
+the nodes in the few clusters closest to a focal point, and a coarse
+per-cluster estimate for the rest. The estimate still touches every row (one
+gather and multiply instead of a dot product over the full embedding), so
+the index does not shrink the set of candidate nodes; it only makes scoring
+each of them cheaper, which pays off only on large memories of large
+embeddings.
+
+The index is kept up to date by AssociativeMemory.add_* (new rows are
+assigned to their closest centroid, and the centroids are retrained each
+time the memory doubles). Enable it with AssociativeMemory.enable_ann_index;
+benchmark_retrieval.py measures recall and latency against the exact path.
+"""
+import numpy as np
+
+
+class IVFIndex:
+  def __init__(self, n_lists=None, n_probe=8, min_rows=20000,
+               train_iters=10, seed=0):
+    """
+    INPUT:
+      n_lists: Number of clusters (None: about sqrt of the rows at training)
+      n_probe: Number of closest clusters searched per query
+      min_rows: The index stays untrained (searches return None, so callers
+                use the exact path) until the memory has this many rows.
+                In benchmark_retrieval.py recall@k only nears 1.0 from about
+                20k rows; on smaller memories the index loses a good share
+                of the true top-k for little speedup.
+      train_iters: k-means iterations per (re)training
+      seed: Seed for the k-means initialization
+    """
+    self.n_lists = n_lists
+    self.n_probe = n_probe
+    self.min_rows = min_rows
+    self.train_iters = train_iters
+    self.seed = seed
+
+    self.centroids = None
+    self.assignment = np.zeros(0, dtype=np.int32)  # row -> cluster id
+    self.centroid_sim = np.zeros(0, dtype=np.float32)  # row . its centroid
+    self.n_assigned = 0
+    self.n_trained = 0
+
+
+  @property
+  def is_trained(self):
+    return self.centroids is not None
+
+
+  def add(self, a_mem, row):
+    """
+    Assigns a new row of the memory's embedding matrix to its closest
+    cluster. Trains the index once the memory reaches min_rows rows, and
+    retrains it whenever the memory has doubled since the last training.
+
+    INPUT:
+      a_mem: The <AssociativeMemory> whose matrix holds the row.
+      row: Row index (node_count - 1) of the new node.
+    OUTPUT:
+      None
+    """
+    if a_mem.n_rows >= max(self.min_rows, 2 * self.n_trained):
+      self.train(a_mem)
+      return
+    if not self.is_trained:
+      return
+
+    if row >= len(self.assignment):
+      capacity = max(64, 2 * len(self.assignment), row + 1)
+      for name in ["assignment", "centroid_sim"]:
+        old = getattr(self, name)
+        new = np.zeros(capacity, dtype=old.dtype)
+        new[:self.n_assigned] = old[:self.n_assigned]
+        setattr(self, name, new)
+    vec = _unit_rows(a_mem.embedding_matrix[row:row + 1],
+                     a_mem.embedding_norms[row:row + 1])
+    sims = (vec @ self.centroids.T)[0]
+    self.assignment[row] = int(np.argmax(sims))
+    self.centroid_sim[row] = sims.max()
+    self.n_assigned = max(self.n_assigned, row + 1)
+
+
+  def train(self, a_mem):
+    """
+    Runs spherical k-means over the memory's embeddings (on a sample when the
+    memory is large) and assigns every row to its closest centroid.
+
+    INPUT:
+      a_mem: The <AssociativeMemory> to index.
+    OUTPUT:
+      None
+    """
+    n = a_mem.n_rows
+    vectors = _unit_rows(a_mem.embedding_matrix[:n], a_mem.embedding_norms[:n])
+    n_lists = self.n_lists or max(1, int(np.sqrt(n)))
+    n_lists = min(n_lists, n)
+
+    rng = np.random.default_rng(self.seed)
+    sample = vectors
+    if n > 64 * n_lists:
+      sample = vectors[rng.choice(n, 64 * n_lists, replace=False)]
+    centroids = sample[rng.choice(len(sample), n_lists, replace=False)].copy()
+    for _ in range(self.train_iters):
+      labels = np.argmax(sample @ centroids.T, axis=1)
+      sums = np.zeros_like(centroids)
+      np.add.at(sums, labels, sample)
+      counts = np.bincount(labels, minlength=n_lists)
+      # Empty clusters are re-seeded from random sample points.
+      empty = counts == 0
+      sums[empty] = sample[rng.choice(len(sample), int(empty.sum()))]
+      centroids = _unit_rows(sums, np.linalg.norm(sums, axis=1))
+
+    self.centroids = centroids
+    self.assignment = np.zeros(max(64, 2 * n), dtype=np.int32)
+    self.centroid_sim = np.zeros(max(64, 2 * n), dtype=np.float32)
+    for start in range(0, n, 4096):
+      sims = vectors[start:start + 4096] @ centroids.T
+      self.assignment[start:start + len(sims)] = np.argmax(sims, axis=1)
+      self.centroid_sim[start:start + len(sims)] = sims.max(axis=1)
+    self.n_assigned = n
+    self.n_trained = n
+
+
+  def search(self, queries, min_candidates=0):
+    """
+    Finds the candidate rows for each query: the rows in its n_probe closest
+    clusters, probing further clusters until there are at least
+    min_candidates rows.
+
+    INPUT:
+      queries: 2-D array of shape (n_queries, dim).
+      min_candidates: Minimum number of rows returned per query.
+    OUTPUT:
+      A list with one boolean mask over the assigned rows per query, or None
+      if the index is not trained yet.
+    """
+    if not self.is_trained:
+      return None
+    queries = np.asarray(queries, dtype=np.float32)
+    queries = _unit_rows(queries, np.linalg.norm(queries, axis=1))
+    assignment = self.assignment[:self.n_assigned]
+    sizes = np.bincount(assignment, minlength=len(self.centroids))
+
+    masks = []
+    for closest in np.argsort(-(queries @ self.centroids.T), axis=1):
+      covered = np.cumsum(sizes[closest])
+      n_probe = max(self.n_probe,
+                    int(np.searchsorted(covered, min_candidates)) + 1)
+      probe = np.zeros(len(self.centroids), dtype=bool)
+      probe[closest[:n_probe]] = True
+      masks.append(probe[assignment])
+    return masks
+
+
+  def estimate(self, queries):
+    """
+    Coarse cosine similarity of every assigned row to each query, from the
+    query's similarity to the row's centroid times the row's similarity to
+    that centroid. Used for rows outside the searched clusters.
+
+    INPUT:
+      queries: 2-D array of shape (n_queries, dim).
+    OUTPUT:
+      A 2-D array of shape (n_queries, n_assigned rows).
+    """
+    queries = np.asarray(queries, dtype=np.float32)
+    queries = _unit_rows(queries, np.linalg.norm(queries, axis=1))
+    n = self.n_assigned
+    return ((queries @ self.centroids.T)[:, self.assignment[:n]]
+            * self.centroid_sim[:n])
+
+
+def _unit_rows(matrix, norms):
+  """Rows scaled to unit length (all-zero rows stay zero)."""
+  norms = np.where(norms > 0, norms, 1)
+  return (matrix / norms[:, None]).astype(np.float32, copy=False)
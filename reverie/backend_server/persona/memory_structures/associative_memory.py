@@ -12,8 +12,17 @@ sys.path.append('../../')
 
 import json
 import datetime
+import os
+
+import numpy as np
 
 from global_methods import *
+from persona.memory_structures.ann_index import IVFIndex
+from persona.memory_structures.binary_memory import *
+
+
+# Node type codes used in the per-node arrays of <AssociativeMemory>.
+NODE_TYPE_CODES = {"event": 0, "thought": 1, "chat": 2}
 
 
 class ConceptNode: 
@@ -48,7 +57,17 @@ class ConceptNode:
 
 
 class AssociativeMemory: 
-  def __init__(self, f_saved): 
+  def __init__(self, f_saved, ann_index=None): 
+    """
+    INPUT: 
+      f_saved: Folder with the saved memory: either nodes.json, 
+               embeddings.json and kw_strength.json, or the binary layout 
+               of binary_memory.py (nodes.jsonl, embeddings.npy and 
+               kw_strength.json), which is used when present. 
+      ann_index: Optional <IVFIndex>; when given, it is built up as the nodes
+                 are loaded and added, and new_retrieve uses it to score 
+                 relevance approximately (see enable_ann_index). 
+    """
     self.id_to_node = dict()
 
     self.seq_event = []
@@ -62,45 +81,47 @@ class AssociativeMemory:
     self.kw_strength_event = dict()
     self.kw_strength_thought = dict()
 
-    self.embeddings = json.load(open(f_saved + "/embeddings.json"))
-
-    nodes_load = json.load(open(f_saved + "/nodes.json"))
-    for count in range(len(nodes_load.keys())): 
-      node_id = f"node_{str(count+1)}"
-      node_details = nodes_load[node_id]
-
-      node_count = node_details["node_count"]
-      type_count = node_details["type_count"]
-      node_type = node_details["type"]
-      depth = node_details["depth"]
-
-      created = datetime.datetime.strptime(node_details["created"], 
-                                           '%Y-%m-%d %H:%M:%S')
-      expiration = None
-      if node_details["expiration"]: 
-        expiration = datetime.datetime.strptime(node_details["expiration"],
-                                                '%Y-%m-%d %H:%M:%S')
-
-      s = node_details["subject"]
-      p = node_details["predicate"]
-      o = node_details["object"]
-
-      description = node_details["description"]
-      embedding_pair = (node_details["embedding_key"], 
-                        self.embeddings[node_details["embedding_key"]])
-      poignancy =node_details["poignancy"]
-      keywords = set(node_details["keywords"])
-      filling = node_details["filling"]
-      
-      if node_type == "event": 
-        self.add_event(created, expiration, s, p, o, 
-                   description, keywords, poignancy, embedding_pair, filling)
-      elif node_type == "chat": 
-        self.add_chat(created, expiration, s, p, o, 
-                   description, keywords, poignancy, embedding_pair, filling)
-      elif node_type == "thought": 
-        self.add_thought(created, expiration, s, p, o, 
-                   description, keywords, poignancy, embedding_pair, filling)
+    # Per-node arrays aligned to node ids (row i belongs to node_{i+1}), so 
+    # retrieval can score every node with array operations. Rows are 
+    # allocated in blocks; only the first <n_rows> are in use. 
+    self.n_rows = 0
+    self.embedding_matrix = np.zeros((0, 0), dtype=np.float32)
+    self.embedding_norms = np.zeros(0, dtype=np.float32)
+    self.node_poignancy = np.zeros(0, dtype=np.float32)
+    self.node_type_code = np.zeros(0, dtype=np.int8)
+    self.node_is_idle = np.zeros(0, dtype=bool)
+    # Mirrors ConceptNode.last_accessed; retrieval updates both. 
+    self.node_last_accessed = np.zeros(0, dtype="datetime64[us]")
+    # Rows of <embedding_matrix> that are a memory map of a binary save 
+    # (their embeddings and norms are already in place). 
+    self.n_mapped_rows = 0
+    self.ann_index = ann_index
+
+    # "json" or "binary": the layout save() writes by default, which is the 
+    # layout the memory was loaded from. 
+    self.storage_format = "json"
+    if is_binary_memory(f_saved): 
+      self.storage_format = "binary"
+      self.embeddings = dict()
+      nodes_load = read_node_table(f_saved + "/nodes.jsonl")
+      matrix = load_embedding_matrix(f_saved + "/embeddings.npy")
+      if nodes_load: 
+        self._resize_rows(len(nodes_load), 0)
+        self.embedding_matrix = matrix
+        self.embedding_norms = np.array(
+          [details["embedding_norm"] for details in nodes_load], 
+          dtype=np.float32)
+        self.n_mapped_rows = len(nodes_load)
+      for count, node_details in enumerate(nodes_load): 
+        self._add_saved_node(node_details, matrix[count])
+
+    else: 
+      self.embeddings = json.load(open(f_saved + "/embeddings.json"))
+      nodes_load = json.load(open(f_saved + "/nodes.json"))
+      for count in range(len(nodes_load.keys())): 
+        node_details = nodes_load[f"node_{str(count+1)}"]
+        self._add_saved_node(
+          node_details, self.embeddings[node_details["embedding_key"]])
 
     kw_strength_load = json.load(open(f_saved + "/kw_strength.json"))
     if kw_strength_load["kw_strength_event"]: 
@@ -108,37 +129,82 @@ class AssociativeMemory:
     if kw_strength_load["kw_strength_thought"]: 
       self.kw_strength_thought = kw_strength_load["kw_strength_thought"]
 
+
+  def _add_saved_node(self, node_details, embedding): 
+    """
+    Adds a node loaded from a saved memory through add_event, add_chat or 
+    add_thought. 
+
+    INPUT: 
+      node_details: The node's dictionary (as in nodes.json). 
+      embedding: The node's embedding vector. 
+    OUTPUT: 
+      None
+    """
+    node_count = node_details["node_count"]
+    type_count = node_details["type_count"]
+    node_type = node_details["type"]
+    depth = node_details["depth"]
+
+    created = datetime.datetime.strptime(node_details["created"], 
+                                         '%Y-%m-%d %H:%M:%S')
+    expiration = None
+    if node_details["expiration"]: 
+      expiration = datetime.datetime.strptime(node_details["expiration"],
+                                              '%Y-%m-%d %H:%M:%S')
+
+    s = node_details["subject"]
+    p = node_details["predicate"]
+    o = node_details["object"]
+
+    description = node_details["description"]
+    embedding_pair = (node_details["embedding_key"], embedding)
+    poignancy =node_details["poignancy"]
+    keywords = set(node_details["keywords"])
+    filling = node_details["filling"]
     
-  def save(self, out_json): 
-    r = dict()
-    for count in range(len(self.id_to_node.keys()), 0, -1): 
-      node_id = f"node_{str(count)}"
-      node = self.id_to_node[node_id]
-
-      r[node_id] = dict()
-      r[node_id]["node_count"] = node.node_count
-      r[node_id]["type_count"] = node.type_count
-      r[node_id]["type"] = node.type
-      r[node_id]["depth"] = node.depth
-
-      r[node_id]["created"] = node.created.strftime('%Y-%m-%d %H:%M:%S')
-      r[node_id]["expiration"] = None
-      if node.expiration: 
-        r[node_id]["expiration"] = (node.expiration
-                                        .strftime('%Y-%m-%d %H:%M:%S'))
-
-      r[node_id]["subject"] = node.subject
-      r[node_id]["predicate"] = node.predicate
-      r[node_id]["object"] = node.object
-
-      r[node_id]["description"] = node.description
-      r[node_id]["embedding_key"] = node.embedding_key
-      r[node_id]["poignancy"] = node.poignancy
-      r[node_id]["keywords"] = list(node.keywords)
-      r[node_id]["filling"] = node.filling
-
-    with open(out_json+"/nodes.json", "w") as outfile:
-      json.dump(r, outfile)
+    if node_type == "event": 
+      self.add_event(created, expiration, s, p, o, 
+                 description, keywords, poignancy, embedding_pair, filling)
+    elif node_type == "chat": 
+      self.add_chat(created, expiration, s, p, o, 
+                 description, keywords, poignancy, embedding_pair, filling)
+    elif node_type == "thought": 
+      self.add_thought(created, expiration, s, p, o, 
+                 description, keywords, poignancy, embedding_pair, filling)
+
+    
+  def save(self, out_json, storage_format=None): 
+    """
+    Saves the memory into a folder. 
+
+    INPUT: 
+      out_json: The associative_memory folder to save into. 
+      storage_format: "json" (nodes.json + embeddings.json, rewritten in 
+                      full) or "binary" (nodes.jsonl + embeddings.npy, only 
+                      appended to when the folder holds an earlier save of 
+                      this memory). Defaults to the layout the memory was 
+                      loaded from. 
+    OUTPUT: 
+      None
+    """
+    storage_format = storage_format or self.storage_format
+    if storage_format == "binary": 
+      self._save_binary(out_json)
+    else: 
+      r = dict()
+      for count in range(len(self.id_to_node.keys()), 0, -1): 
+        node_id = f"node_{str(count)}"
+        r[node_id] = self._node_details(self.id_to_node[node_id])
+
+      with open(out_json+"/nodes.json", "w") as outfile:
+        json.dump(r, outfile)
+
+      with open(out_json+"/embeddings.json", "w") as outfile:
+        # Embeddings loaded from a binary save are arrays, not lists. 
+        json.dump({key: (embedding if isinstance(embedding, list) 
+                         else np.asarray(embedding, dtype=float).tolist())
+                   for key, embedding in self.embeddings.items()}, outfile)
 
     r = dict()
     r["kw_strength_event"] = self.kw_strength_event
@@ -146,8 +212,53 @@ class AssociativeMemory:
     with open(out_json+"/kw_strength.json", "w") as outfile:
       json.dump(r, outfile)
 
-    with open(out_json+"/embeddings.json", "w") as outfile:
-      json.dump(self.embeddings, outfile)
+
+  def _save_binary(self, out_json): 
+    n_nodes = len(self.id_to_node.keys())
+    details_at = lambda row: self._node_details(
+      self.id_to_node[f"node_{str(row+1)}"], row)
+    dim = self.embedding_matrix.shape[1]
+    start = saved_node_count(out_json, details_at, dim)
+    try: 
+      write_embedding_rows(out_json + "/embeddings.npy", 
+                           self.embedding_matrix[start:n_nodes], start)
+    except ValueError: 
+      start = 0
+      write_embedding_rows(out_json + "/embeddings.npy", 
+                           self.embedding_matrix[:n_nodes])
+    write_node_table(out_json + "/nodes.jsonl", 
+                     [details_at(row) for row in range(start, n_nodes)], 
+                     start)
+
+
+  def _node_details(self, node, row=None): 
+    """
+    The node's dictionary as saved in nodes.json (with the norm of its 
+    embedding when a row of the embedding matrix is given, for nodes.jsonl).
+    """
+    r = dict()
+    r["node_count"] = node.node_count
+    r["type_count"] = node.type_count
+    r["type"] = node.type
+    r["depth"] = node.depth
+
+    r["created"] = node.created.strftime('%Y-%m-%d %H:%M:%S')
+    r["expiration"] = None
+    if node.expiration: 
+      r["expiration"] = node.expiration.strftime('%Y-%m-%d %H:%M:%S')
+
+    r["subject"] = node.subject
+    r["predicate"] = node.predicate
+    r["object"] = node.object
+
+    r["description"] = node.description
+    r["embedding_key"] = node.embedding_key
+    r["poignancy"] = node.poignancy
+    r["keywords"] = list(node.keywords)
+    r["filling"] = node.filling
+    if row is not None: 
+      r["embedding_norm"] = float(self.embedding_norms[row])
+    return r
 
 
   def add_event(self, created, expiration, s, p, o, 
@@ -192,6 +303,7 @@ class AssociativeMemory:
           self.kw_strength_event[kw] = 1
 
     self.embeddings[embedding_pair[0]] = embedding_pair[1]
+    self._index_node(node, embedding_pair[1])
 
     return node
 
@@ -236,6 +348,7 @@ class AssociativeMemory:
           self.kw_strength_thought[kw] = 1
 
     self.embeddings[embedding_pair[0]] = embedding_pair[1]
+    self._index_node(node, embedding_pair[1])
 
     return node
 
@@ -267,10 +380,95 @@ class AssociativeMemory:
     self.id_to_node[node_id] = node 
 
     self.embeddings[embedding_pair[0]] = embedding_pair[1]
+    self._index_node(node, embedding_pair[1])
         
     return node
 
 
+  def _index_node(self, node, embedding): 
+    """
+    Writes a new node's embedding, norm, poignancy, type and last access 
+    into the row aligned to its node id, growing the arrays when they are 
+    full. 
+
+    INPUT: 
+      node: The <ConceptNode> that was just added. 
+      embedding: The node's embedding vector (list of floats). 
+    OUTPUT: 
+      None
+    """
+    row = node.node_count - 1
+    vec = np.asarray(embedding, dtype=np.float32)
+    if row >= len(self.embedding_norms) or vec.shape[0] > self.embedding_matrix.shape[1]: 
+      self._resize_rows(max(64, 2 * len(self.embedding_norms), row + 1), 
+                        max(vec.shape[0], self.embedding_matrix.shape[1]))
+
+    if row >= self.n_mapped_rows: 
+      self.embedding_matrix[row, :vec.shape[0]] = vec
+      self.embedding_norms[row] = np.linalg.norm(vec)
+    self.node_poignancy[row] = node.poignancy
+    self.node_type_code[row] = NODE_TYPE_CODES[node.type]
+    self.node_is_idle[row] = "idle" in node.embedding_key
+    self.node_last_accessed[row] = np.datetime64(node.last_accessed, "us")
+    self.n_rows = max(self.n_rows, row + 1)
+    if self.ann_index is not None: 
+      self.ann_index.add(self, row)
+
+
+  def _resize_rows(self, capacity, dim): 
+    """
+    Reallocates the per-node arrays with room for <capacity> rows and an 
+    embedding width of <dim>, keeping the rows in use. A memory-mapped 
+    embedding matrix is copied into memory here. 
+    """
+    matrix = np.zeros((capacity, dim), dtype=np.float32)
+    width = min(dim, self.embedding_matrix.shape[1])
+    matrix[:self.n_rows, :width] = self.embedding_matrix[:self.n_rows, :width]
+    self.embedding_matrix = matrix
+    self.n_mapped_rows = 0
+    for name in ["embedding_norms", "node_poignancy", 
+                 "node_type_code", "node_is_idle", 
+                 "node_last_accessed"]: 
+      old = getattr(self, name)
+      new = np.zeros(capacity, dtype=old.dtype)
+      new[:self.n_rows] = old[:self.n_rows]
+      setattr(self, name, new)
+
+
+  def enable_ann_index(self, **kwargs): 
+    """
+    Attaches an approximate nearest-neighbour index to this memory, trained
+    right away if the memory is already large enough, and kept up to date by
+    add_event, add_thought and add_chat from then on. 
+
+    INPUT: 
+      **kwargs: <IVFIndex> parameters (n_lists, n_probe, min_rows, ...). 
+    OUTPUT: 
+      The <IVFIndex>. 
+    """
+    self.ann_index = IVFIndex(**kwargs)
+    if self.n_rows >= self.ann_index.min_rows: 
+      self.ann_index.train(self)
+    return self.ann_index
+
+
+  def retrieval_rows(self): 
+    """
+    Returns the rows of the event and thought nodes that retrieval scores 
+    (nodes whose embedding key mentions "idle" are left out), in the order 
+    of seq_event + seq_thought: events newest first, then thoughts newest 
+    first. 
+
+    OUTPUT: 
+      A 1-D int array of row indices (row i is node_{i+1}). 
+    """
+    types = self.node_type_code[:self.n_rows]
+    active = ~self.node_is_idle[:self.n_rows]
+    events = np.flatnonzero((types == NODE_TYPE_CODES["event"]) & active)
+    thoughts = np.flatnonzero((types == NODE_TYPE_CODES["thought"]) & active)
+    return np.concatenate([events[::-1], thoughts[::-1]])
+
+
   def get_summarized_latest_events(self, retention): 
     ret_set = set()
     for e_node in self.seq_event[:retention]: 
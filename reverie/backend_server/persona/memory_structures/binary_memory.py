@@ -0,0 +1,197 @@
+"""
+File: binary_memory.py
+Description: Binary on-disk layout for <AssociativeMemory>, as an alternative
+to nodes.json + embeddings.json. A saved associative_memory folder holds:
+
+  embeddings.npy    float32 matrix; row i is the embedding of node_{i+1}.
+                    Loaded as a read-only memory map, so rows are only read
+                    from disk when they are used.
+  nodes.jsonl       the node table: a first line with the field names, then
+                    one line per node (in node order) with the field values.
+  kw_strength.json  same as in the JSON layout.
+
+Both files are append-only: saving a memory into a folder that already holds
+an earlier save of it only appends the new nodes and rewrites the .npy
+header (numpy pads the header so its row count can grow in place).
+"""
+import io
+import json
+import os
+
+import numpy as np
+
+
+# Columns of nodes.jsonl: the fields of a nodes.json entry, plus the norm of
+# the node's embedding (so loading does not have to read the matrix).
+NODE_TABLE_FIELDS = ["node_count", "type_count", "type", "depth",
+                     "created", "expiration",
+                     "subject", "predicate", "object",
+                     "description", "embedding_key", "poignancy",
+                     "keywords", "filling", "embedding_norm"]
+
+
+def is_binary_memory(folder):
+  """
+  Returns True if the folder holds an associative memory in the binary
+  layout.
+  """
+  return os.path.exists(folder + "/nodes.jsonl")
+
+
+def read_node_table(f_table):
+  """
+  Reads nodes.jsonl into a list of node detail dictionaries (the same
+  dictionaries as the values of nodes.json), in node order.
+
+  INPUT:
+    f_table: Path of the nodes.jsonl file.
+  OUTPUT:
+    A list of dictionaries keyed by the table's field names.
+  """
+  with open(f_table) as infile:
+    fields = json.loads(infile.readline())
+    return [dict(zip(fields, json.loads(line))) for line in infile
+            if line.strip()]
+
+
+def node_table_line(node_details):
+  """
+  Serializes one node detail dictionary as a nodes.jsonl line.
+  """
+  return json.dumps([node_details[field] for field in NODE_TABLE_FIELDS]) + "\n"
+
+
+def load_embedding_matrix(f_npy):
+  """
+  Opens embeddings.npy as a read-only memory map (or returns an empty matrix
+  if it has no rows).
+  """
+  if npy_shape(f_npy)[0] == 0:
+    return np.zeros((0, 0), dtype=np.float32)
+  return np.load(f_npy, mmap_mode="r")
+
+
+def npy_shape(f_npy):
+  """
+  Reads the shape of the array in a .npy file from its header.
+  """
+  with open(f_npy, "rb") as infile:
+    shape, _, _ = _read_npy_header(infile)
+  return shape
+
+
+def _read_npy_header(infile):
+  """Reads a .npy header, leaving the file at the start of the data."""
+  version = np.lib.format.read_magic(infile)
+  if version == (1, 0):
+    return np.lib.format.read_array_header_1_0(infile)
+  return np.lib.format.read_array_header_2_0(infile)
+
+
+def write_node_table(f_table, rows_details, start=0):
+  """
+  Writes the node table, or appends to it.
+
+  INPUT:
+    f_table: Path of the nodes.jsonl file.
+    rows_details: Node detail dictionaries to write, in node order.
+    start: Number of nodes already in the file that are kept (0 writes a
+           new file, replacing any old one at once).
+  OUTPUT:
+    None
+  """
+  if start:
+    with open(f_table, "a") as outfile:
+      outfile.writelines(node_table_line(d) for d in rows_details)
+    return
+  with open(f_table + ".tmp", "w") as outfile:
+    outfile.write(json.dumps(NODE_TABLE_FIELDS) + "\n")
+    outfile.writelines(node_table_line(d) for d in rows_details)
+  os.replace(f_table + ".tmp", f_table)
+
+
+def write_embedding_rows(f_npy, matrix, start=0):
+  """
+  Writes rows of the embedding matrix to embeddings.npy, or appends them.
+
+  A new file replaces the old one atomically (so memory maps of the old file
+  stay valid). Appending truncates the file to its first <start> rows, writes
+  the new rows after them and then updates the row count in the header.
+
+  INPUT:
+    f_npy: Path of the embeddings.npy file.
+    matrix: 2-D float32 array of the rows to write.
+    start: Number of rows already in the file that are kept (0 writes a new
+           file).
+  OUTPUT:
+    None
+  """
+  matrix = np.ascontiguousarray(matrix, dtype=np.float32)
+  n_rows = start + matrix.shape[0]
+  header = {"descr": np.lib.format.dtype_to_descr(matrix.dtype),
+            "fortran_order": False,
+            "shape": (n_rows, matrix.shape[1])}
+  if not start:
+    with open(f_npy + ".tmp", "wb") as outfile:
+      np.lib.format.write_array_header_1_0(outfile, header)
+      outfile.write(matrix.tobytes())
+    os.replace(f_npy + ".tmp", f_npy)
+    return
+
+  new_header = io.BytesIO()
+  np.lib.format.write_array_header_1_0(new_header, header)
+  with open(f_npy, "r+b") as outfile:
+    _read_npy_header(outfile)
+    header_len = outfile.tell()
+    if len(new_header.getvalue()) != header_len:
+      raise ValueError(f"{f_npy}: the row count no longer fits the header")
+    outfile.truncate(header_len + start * matrix.shape[1] * 4)
+    outfile.seek(0, os.SEEK_END)
+    outfile.write(matrix.tobytes())
+    outfile.seek(0)
+    outfile.write(new_header.getvalue())
+
+
+def saved_node_count(folder, node_details_at, dim):
+  """
+  Counts the nodes a folder already holds from an earlier save of the same
+  memory, so a save can append only the rest.
+
+  INPUT:
+    folder: The associative_memory folder being saved into.
+    node_details_at: Function returning the node detail dictionary of the
+                     in-memory node at a given 0-based row.
+    dim: Width of the in-memory embedding matrix.
+  OUTPUT:
+    The number of nodes to keep (0 if the folder has no binary save, or one
+    that does not match this memory).
+  """
+  f_table = folder + "/nodes.jsonl"
+  f_npy = folder + "/embeddings.npy"
+  if not (os.path.exists(f_table) and os.path.exists(f_npy)):
+    return 0
+  with open(f_table) as infile:
+    if json.loads(infile.readline()) != NODE_TABLE_FIELDS:
+      return 0
+    count = 0
+    last = None
+    for line in infile:
+      if line.strip():
+        count += 1
+        last = line
+  if count == 0:
+    return 0
+  rows, saved_dim = npy_shape(f_npy)
+  if rows < count or saved_dim != dim:
+    return 0
+  try:
+    mine = node_details_at(count - 1)
+  except (KeyError, IndexError):
+    return 0
+  # Keywords are a set, so their order can differ between processes.
+  theirs = dict(zip(NODE_TABLE_FIELDS, json.loads(last)))
+  for field in ["node_count", "type", "created", "description",
+                "embedding_key"]:
+    if theirs[field] != mine[field]:
+      return 0
+  return count
@@ -0,0 +1,295 @@
+"""
+File: embedding_service.py
+Description: Process-wide embedding service behind gpt_structure's
+get_embedding and get_embeddings. It
+
+  - keeps one cache for every persona, keyed by the model and the text's
+    content hash, in memory (the most recently used <max_memory> entries)
+    and in an SQLite file on disk (shared by every simulation that uses the
+    same cache folder), so a description is only embedded once;
+  - sends the texts that are not cached in batched requests, and coalesces
+    the texts requested by other threads while a request is in flight into
+    the next one. When the API rejects a batch because of its input, the
+    batch is split in halves and retried, so only the calls that asked for
+    a rejected text raise (other errors fail the whole batch);
+  - can use a local, deterministic hashing embedding instead of the OpenAI
+    API, for offline runs.
+
+Optional settings in utils.py:
+  embedding_backend = "openai"   # or "local"
+  embedding_cache_dir = f"{fs_storage}/../embedding_cache"   # None: no disk
+"""
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import openai
+
+import utils
+
+
+DEFAULT_MODEL = "text-embedding-ada-002"
+LOCAL_MODEL = "local-hash-1536"
+
+
+def clean_embedding_text(text):
+  """
+  The text as it is embedded (newlines flattened, empty text replaced).
+  """
+  text = text.replace("\n", " ")
+  if not text:
+    text = "this is blank"
+  return text
+
+
+def local_embedding(text, dim=1536):
+  """
+  Deterministic stand-in for a text embedding: words and word pairs are
+  hashed into signed buckets of a unit vector, so texts sharing words have a
+  positive cosine similarity.
+
+  INPUT:
+    text: The text to embed.
+    dim: Size of the vector (1536, like text-embedding-ada-002).
+  OUTPUT:
+    A list of <dim> floats.
+  """
+  words = re.findall(r"[a-z0-9']+", text.lower())
+  features = words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+  vec = np.zeros(dim)
+  for feature in features or [text]:
+    digest = hashlib.blake2b(feature.encode(), digest_size=8).digest()
+    sign = 1 if digest[4] & 1 else -1
+    vec[int.from_bytes(digest[:4], "little") % dim] += sign
+  return (vec / np.linalg.norm(vec)).tolist()
+
+
+class EmbeddingService:
+  def __init__(self, backend="openai", cache_dir=None, max_batch=256,
+               max_memory=20000):
+    """
+    INPUT:
+      backend: "openai" (openai.Embedding.create) or "local"
+               (local_embedding; the model argument is ignored).
+      cache_dir: Folder of the persistent cache (embeddings.sqlite3), or
+                 None to cache in memory only.
+      max_batch: Most texts sent in one request.
+      max_memory: Most embeddings kept in memory (least recently used ones
+                  are dropped; with a cache_dir they are still on disk).
+    """
+    self.backend = backend
+    self.cache_dir = cache_dir
+    self.max_batch = max_batch
+    self.max_memory = max_memory
+
+    # cache key -> embedding (float64 array, so tolist() gives back the
+    # floats that were received), in least recently used order
+    self.memory = OrderedDict()
+    self.pending = dict()  # cache key -> (text, model), waiting to be sent
+    self.failed = dict()  # cache key -> exception of its last request
+    self.in_flight = set()
+    self.sending = False
+    self.cond = threading.Condition()
+    self.db = None
+    self.stats = {"memory_hits": 0, "disk_hits": 0, "requests": 0,
+                  "texts_sent": 0}
+
+
+  def embed(self, texts, model=DEFAULT_MODEL):
+    """
+    Embeds a list of texts, using the cache where possible and one request
+    per <max_batch> texts for the rest.
+
+    INPUT:
+      texts: List of strings.
+      model: Embedding model name.
+    OUTPUT:
+      A list with the embedding (list of floats) of each text.
+    """
+    if self.backend == "local":
+      model = LOCAL_MODEL
+    texts = [clean_embedding_text(text) for text in texts]
+    keys = [self._key(text, model) for text in texts]
+
+    with self.cond:
+      # Hold on to the embeddings found, as other threads may evict them.
+      found = dict()
+      for key in keys:
+        if key in self.memory:
+          self.memory.move_to_end(key)
+          found[key] = self.memory[key]
+        # A new call retries texts whose earlier request failed.
+        self.failed.pop(key, None)
+      self.stats["memory_hits"] += sum(key in found for key in keys)
+      found.update(self._load_from_disk([key for key in dict.fromkeys(keys)
+                                         if key not in found]))
+
+      while True:
+        missing = []
+        for key, text in zip(keys, texts):
+          if key not in found and key in self.memory:
+            found[key] = self.memory[key]
+          elif key not in found:
+            missing += [(key, text)]
+        if not missing:
+          return [found[key].tolist() for key in keys]
+        for key, _ in missing:
+          if key in self.failed:
+            raise self.failed[key]
+        # Queue what is neither queued nor being fetched.
+        for key, text in missing:
+          if key not in self.pending and key not in self.in_flight:
+            self.pending[key] = (text, model)
+        if self.sending:
+          self.cond.wait()
+        else:
+          self._send_pending()
+
+
+  def _send_pending(self):
+    """
+    Sends one batch of pending texts (all of one model). Called with the
+    lock held; the lock is released during the request. The texts of a
+    failed request are recorded in self.failed, for the calls that asked
+    for them to raise.
+    """
+    model = next(iter(self.pending.values()))[1]
+    batch = [(key, text) for key, (text, text_model) in self.pending.items()
+             if text_model == model][:self.max_batch]
+    for key, _ in batch:
+      del self.pending[key]
+      self.in_flight.add(key)
+    self.sending = True
+    self.cond.release()
+    results, errors = [], []
+    try:
+      self._request_split(batch, model, results, errors)
+    finally:
+      self.cond.acquire()
+      self.sending = False
+      self.in_flight.difference_update(key for key, _ in batch)
+      self.cond.notify_all()
+    for key, error in errors:
+      self.failed[key] = error
+    for key, embedding in results:
+      self._remember(key, np.asarray(embedding, dtype=np.float64))
+    self._save_to_disk([(key, model, embedding)
+                        for key, embedding in results])
+
+
+  def _request_split(self, batch, model, results, errors):
+    """
+    Requests the embeddings of a batch. If the API rejects the input
+    (InvalidRequestError), requests each half of it in turn, down to single
+    texts, so one bad text only fails itself. Any other error (rate limit,
+    authentication, network) fails the whole batch without more requests.
+
+    INPUT:
+      batch: List of (cache key, text).
+      model: Embedding model name.
+      results: List the (cache key, embedding) pairs are added to.
+      errors: List the (cache key, exception) pairs of failed texts are
+              added to.
+    """
+    self.stats["requests"] += 1
+    self.stats["texts_sent"] += len(batch)
+    try:
+      embeddings = self._request([text for _, text in batch], model)
+    except openai.error.InvalidRequestError as error:
+      if len(batch) == 1:
+        errors += [(batch[0][0], error)]
+        return
+      half = len(batch) // 2
+      self._request_split(batch[:half], model, results, errors)
+      self._request_split(batch[half:], model, results, errors)
+      return
+    except Exception as error:
+      errors += [(key, error) for key, _ in batch]
+      return
+    results += [(key, embedding)
+                for (key, _), embedding in zip(batch, embeddings)]
+
+
+  def _remember(self, key, embedding):
+    self.memory[key] = embedding
+    self.memory.move_to_end(key)
+    while len(self.memory) > self.max_memory:
+      self.memory.popitem(last=False)
+
+
+  def _request(self, texts, model):
+    if self.backend == "local":
+      return [local_embedding(text) for text in texts]
+    data = openai.Embedding.create(input=texts, model=model)["data"]
+    data = sorted(data, key=lambda item: item.get("index", 0))
+    return [item["embedding"] for item in data]
+
+
+  def _key(self, text, model):
+    return hashlib.sha256(f"{model}\n{text}".encode()).hexdigest()
+
+
+  def _connect(self):
+    if self.db is None and self.cache_dir and self.backend != "local":
+      os.makedirs(self.cache_dir, exist_ok=True)
+      self.db = sqlite3.connect(
+        os.path.join(self.cache_dir, "embeddings.sqlite3"),
+        timeout=30, check_same_thread=False)
+      self.db.execute("CREATE TABLE IF NOT EXISTS embeddings "
+                      "(key TEXT PRIMARY KEY, model TEXT, vector BLOB)")
+    return self.db
+
+
+  def _load_from_disk(self, keys):
+    """
+    Loads the given keys from the disk cache into memory, and returns a
+    dictionary of the embeddings found.
+    """
+    loaded = dict()
+    db = self._connect()
+    if not db or not keys:
+      return loaded
+    for start in range(0, len(keys), 500):
+      chunk = keys[start:start + 500]
+      rows = db.execute(
+        "SELECT key, vector FROM embeddings WHERE key IN (%s)"
+        % ",".join("?" * len(chunk)), chunk).fetchall()
+      for key, vector in rows:
+        loaded[key] = np.frombuffer(vector, dtype=np.float64)
+        self._remember(key, loaded[key])
+      self.stats["disk_hits"] += len(rows)
+    return loaded
+
+
+  def _save_to_disk(self, entries):
+    db = self._connect()
+    if not db:
+      return
+    with db:
+      db.executemany(
+        "INSERT OR IGNORE INTO embeddings (key, model, vector) VALUES (?,?,?)",
+        [(key, model, np.asarray(embedding, dtype=np.float64).tobytes())
+         for key, model, embedding in entries])
+
+
+_service = None
+_service_lock = threading.Lock()
+
+
+def get_embedding_service():
+  """
+  Returns the process-wide <EmbeddingService>, created on first use from
+  the settings in utils.py.
+  """
+  global _service
+  with _service_lock:
+    if _service is None:
+      cache_dir = getattr(utils, "embedding_cache_dir",
+                          f"{utils.fs_storage}/../embedding_cache")
+      _service = EmbeddingService(
+        getattr(utils, "embedding_backend", "openai"), cache_dir)
+    return _service
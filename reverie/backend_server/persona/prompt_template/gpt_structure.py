@@ -10,6 +10,7 @@ import openai
 import time 
 
 from utils import *
+from persona.prompt_template.embedding_service import get_embedding_service
 
 openai.api_key = openai_api_key
 
@@ -274,11 +275,22 @@ def safe_generate_response(prompt,
 
 
 def get_embedding(text, model="text-embedding-ada-002"):
-  text = text.replace("\n", " ")
-  if not text: 
-    text = "this is blank"
-  return openai.Embedding.create(
-          input=[text], model=model)['data'][0]['embedding']
+  return get_embedding_service().embed([text], model)[0]
+
+
+def get_embeddings(texts, model="text-embedding-ada-002"): 
+  """
+  Embeds several texts at once: cached texts (from any persona, or an 
+  earlier run sharing the cache folder) are not sent again, and the rest go 
+  out in batched requests. See embedding_service.py. 
+
+  INPUT: 
+    texts: List of strings. 
+    model: Embedding model name. 
+  OUTPUT: 
+    A list with the embedding (list of floats) of each text. 
+  """
+  return get_embedding_service().embed(texts, model)
 
 
 if __name__ == '__main__':